@@ -50,15 +50,40 @@ class Settings:
             'webdriver_poll_frequency': 0.5,
             'implicit_timeout': 10,
             'page_load_timeout': 30,
+            'test_time_budget': 600,  # Overall time budget of a test (seconds), None for no limit.
+            'element_cache': True,  # Reuse located elements until the page or its DOM changes.
+            'idle_quiet_ms': 500,  # Quiet period of wait_for_idle (milliseconds).
+            'sleep_mode': 'fixed',  # 'fixed', or 'idle' to end sleeps once the page is idle.
+            'sleep_idle_cap': None,  # Longest idle wait replacing a sleep in 'idle' mode (seconds), None for the requested time.
 
             # Download related configuration
             'downloads_dir': ensure_path_sep('\\datas\\downloads'),
             'clean_downloads': True,
+            'download_timeout': 30,
+
+            # Network control related configuration (Chromium only)
+            'network_mode': 'live',  # 'live', 'record' to capture a HAR per test, or 'replay' to serve it.
+            'network_blocked_urls': [],  # URL patterns blocked in every test, e.g.: ['*.png', '*.woff2'].
+            'har_dir': ensure_path_sep('\\datas\\har'),
 
             # Screenshot related configuration
             'screenshots_dir': ensure_path_sep('\\datas\\screenshots'),
             'clean_screenshots': True,
             'screenshot_format': 'png',
+            'screenshot_idle_timeout': 3,  # Longest wait for the page to settle before a screenshot (seconds).
+
+            # Captcha related configuration
+            'captcha_debug': False,  # Write the intermediate images of captcha processing.
+            'captcha_debug_dir': ensure_path_sep('\\datas\\debug'),
+            'ocr_cpu_threads': 4,  # Inference threads of the OCR engine, CPU only.
+            'ocr_sidecar': False,  # Load the OCR models once in a sidecar process shared by the xdist workers.
+            'ocr_cache_size': 128,  # Solved captcha images kept in the OCR result cache.
+            'captcha_corpus_dir': ensure_path_sep('\\datas\\captcha'),  # Labeled captcha images, one folder per kind.
+            'image_captcha_backend': 'onnx',  # Tile classifier of image captchas: 'onnx' or 'histogram'.
+            'image_captcha_model': ensure_path_sep('\\datas\\models\\image_captcha.onnx'),  # Or .npz centroids.
+            'image_captcha_threads': 4,  # Inference threads of the tile classifier, CPU only.
+            'captcha_solve_timeout': 30,  # Compute time of one captcha solver before falling back (seconds).
+            'captcha_solver_workers': 2,  # Threads computing captcha answers beside the test threads.
 
             # Log related configuration
             'logs_dir': ensure_path_sep('\\logs'),
@@ -71,10 +96,33 @@ class Settings:
             'report_dir': ensure_path_sep('\\report'),
             'report_tmp': ensure_path_sep('\\report\\tmp'),
             'report_html': ensure_path_sep('\\report\\html'),
+            'report_index_dir': ensure_path_sep('\\report\\index'),  # SQLite indexes of the Allure case results.
             'report_format': 'html',
             'report_title': 'UI自动化测试报告',
             'report_description': 'UI自动化测试执行结果',
 
+            # Performance metrics related configuration
+            'perf_dir': ensure_path_sep('\\report\\perf'),
+            'action_metrics': True,
+            'action_metrics_openmetrics': False,
+            'command_trace': True,
+            'command_trace_warn_threshold': 500,
+            'sleep_audit': True,
+            'live_dashboard_interval': 1.0,  # Seconds between two rewrites of live-dashboard.json.
+            'live_dashboard_slowest': 10,  # Slowest tests listed by the live dashboard.
+            'live_dashboard_abort_rate': None,  # Stop the run above this failure rate, e.g.: 0.5. None to never stop.
+            'live_dashboard_abort_min_tests': 20,  # Finished tests before the failure rate is checked.
+            'run_history': True,  # Store the results and action timings of every run.
+            'run_history_db': ensure_path_sep('\\datas\\history\\runs.sqlite'),
+            'run_history_keep': 200,  # Runs kept in the history.
+            'schedule_by_duration': True,  # Dispatch the xdist tests longest first, by their historical duration.
+            'schedule_history_window': 10,  # Recent runs used to predict the test durations.
+            'schedule_default_duration': 10.0,  # Predicted duration when there is no history at all (seconds).
+            'schedule_lookahead': 2,  # Tests held by each worker.
+            'schedule_profiles': {},  # Node id prefix -> session profile, defaults to the top test package.
+            'benchmark_dir': ensure_path_sep('\\datas\\benchmarks'),
+            'benchmark_threshold': 0.25,
+
             # Other configuration
             'config_dir': ensure_path_sep('\\common\\config.yaml'),
         }
@@ -6,13 +6,26 @@
 @ File        : conftest.py
 @ Description : Test fixture configuration file.
 """
+import json
 import os
-import time
+import shutil
+import subprocess
+import sys
 import pytest
-from common.setting import root_path
+from common.setting import root_path, Settings
+from utils.api_tool.deadline import time_budget
+from utils.perf_tool.action_metrics import action_metrics
+from utils.perf_tool.command_tracer import command_tracer
+from utils.perf_tool.live_dashboard import LiveDashboard
+from utils.perf_tool.run_history import RunHistory, RunRecorder
+from utils.perf_tool.sleep_audit import sleep_auditor
+from utils.captcha_tool.captcha_solver import solver_metrics
+from utils.captcha_tool.ocr_engine import SOCKET_ENV, default_socket_path, sidecar_supported
+from utils.perf_tool.benchmark import run_benchmark, load_results, save_results, check_regression
 from selenium import webdriver as WebDriver
 from appium import webdriver as AppDriver
 from selenium.webdriver.chrome.service import Service
+from utils.mock_tool.fake_webdriver import FakeWebDriverServer
 from appium.options.common.base import AppiumOptions
 from webdriver_manager.chrome import ChromeDriverManager
 
@@ -67,6 +80,164 @@ class DriverManager:
 
 # Initialize DriverManager class.
 driver_manager = DriverManager()
+settings = Settings()
+ocr_sidecar = None  # OCR sidecar process started by the controller.
+
+
+def _is_xdist_worker(config) -> bool:
+    """ Whether the current process is a pytest-xdist worker. """
+    return hasattr(config, 'workerinput')
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption('--bench-save', action='store_true', default=False,
+                    help="Save the benchmark results as the new baseline instead of comparing against it.")
+    group.addoption('--bench-threshold', type=float, default=None,
+                    help="Allowed median slowdown against the baseline, e.g.: 0.25. Defaults to 'benchmark_threshold'.")
+    group = parser.getgroup('run history')
+    group.addoption('--run-history', action='store_true', default=False,
+                    help="Store this run in the run history, run.py passes it so ad hoc and self-test runs stay out.")
+    group = parser.getgroup('live dashboard')
+    group.addoption('--live-dashboard', action='store_true', default=False,
+                    help="Aggregate the results of all workers while the run is going, into 'live-dashboard.json'.")
+    group.addoption('--live-dashboard-port', type=int, default=None,
+                    help="Also serve the live dashboard on http://127.0.0.1:<port>/, 0 for any free port.")
+
+
+def pytest_configure(config):
+    """
+    Register the live dashboard, the run history recorder and the duration-aware scheduler on the controller,
+    xdist forwards the reports of every worker to it.
+    """
+    if _is_xdist_worker(config):
+        return
+    if settings.get_global_config('run_history') and config.getoption('run_history'):
+        config.pluginmanager.register(RunRecorder(RunHistory()), 'run_recorder')
+    if settings.get_global_config('schedule_by_duration') and config.pluginmanager.hasplugin('xdist') \
+            and config.getoption('dist', 'no') == 'load':
+        from utils.perf_tool.duration_scheduler import DurationSchedulerPlugin
+        durations = RunHistory().durations(settings.get_global_config('schedule_history_window'))
+        config.pluginmanager.register(DurationSchedulerPlugin(durations), 'duration_scheduler')
+    if config.getoption('live_dashboard') or config.getoption('live_dashboard_port') is not None:
+        config.pluginmanager.register(LiveDashboard(config, port=config.getoption('live_dashboard_port')),
+                                      'live_dashboard')
+
+
+def pytest_sessionstart(session):
+    """ Remove the performance records, the live dashboard and the downloads of the previous run. """
+    if _is_xdist_worker(session.config):
+        return
+    start_ocr_sidecar()
+    downloads_dir = settings.get_global_config('downloads_dir')
+    if settings.get_global_config('clean_downloads') and os.path.isdir(downloads_dir):
+        shutil.rmtree(downloads_dir, ignore_errors=True)
+    perf_dir = settings.get_global_config('perf_dir')
+    if os.path.isdir(perf_dir):
+        for filename in os.listdir(perf_dir):
+            if filename.startswith(('action-metrics', 'commands-', 'sleep-audit', 'captcha-solvers',
+                                    'live-dashboard')):
+                os.remove(os.path.join(perf_dir, filename))
+
+
+def start_ocr_sidecar():
+    """
+    Start the shared OCR sidecar before the xdist workers are spawned, they inherit its socket path
+    and load no OCR models themselves. Platforms without Unix sockets fall back to an engine per process.
+    """
+    global ocr_sidecar
+    if not settings.get_global_config('ocr_sidecar') or not sidecar_supported():
+        return
+    socket_path = default_socket_path()
+    ocr_sidecar = subprocess.Popen(
+        [sys.executable, '-m', 'utils.captcha_tool.ocr_engine', 'serve', '--socket', socket_path,
+         '--threads', str(settings.get_global_config('ocr_cpu_threads'))],
+        cwd=root_path())
+    os.environ[SOCKET_ENV] = socket_path
+
+
+def stop_ocr_sidecar():
+    global ocr_sidecar
+    if ocr_sidecar is None:
+        return
+    ocr_sidecar.terminate()
+    try:
+        ocr_sidecar.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        ocr_sidecar.kill()
+    socket_path = os.environ.pop(SOCKET_ENV, None)
+    if socket_path and os.path.exists(socket_path):
+        os.remove(socket_path)
+    ocr_sidecar = None
+
+
+def pytest_sessionfinish(session):
+    """ Export the action metrics and sleep audit, the controller process also aggregates the records of all workers. """
+    perf_dir = settings.get_global_config('perf_dir')
+    is_controller = not _is_xdist_worker(session.config)
+    if is_controller:
+        stop_ocr_sidecar()
+    if action_metrics.enabled:
+        action_metrics.export_records(perf_dir)
+        if is_controller:
+            action_metrics.export_summary(perf_dir, settings.get_global_config('action_metrics_openmetrics'))
+    if sleep_auditor.enabled:
+        sleep_auditor.export_records(perf_dir)
+        if is_controller:
+            sleep_auditor.export_summary(perf_dir)
+    solver_metrics.export_records(perf_dir)
+    if is_controller:
+        solver_metrics.export_summary(perf_dir)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """ Report the time lost to fixed sleeps and the captcha solver outcomes of this run. """
+    if _is_xdist_worker(config):
+        return
+    perf_dir = settings.get_global_config('perf_dir')
+    summary_path = os.path.join(perf_dir, 'sleep-audit-summary.json')
+    if sleep_auditor.enabled and os.path.exists(summary_path):
+        with open(summary_path, 'r', encoding='utf-8') as file:
+            summary = json.load(file)
+        if summary['count']:
+            terminalreporter.write_sep('-', 'sleep audit')
+            terminalreporter.write_line(f"{summary['count']} sleeps, {summary['dead_time']:.1f}s dead time "
+                                        f"({summary['worker_hours']:.4f} worker-hours).")
+            for call_site, site in list(summary['call_sites'].items())[:5]:
+                terminalreporter.write_line(
+                    f"  {site['slept']:8.2f}s  {site['count']:>4}x  {call_site} ({site['function']})")
+    summary_path = os.path.join(perf_dir, 'captcha-solvers-summary.json')
+    if os.path.exists(summary_path):
+        with open(summary_path, 'r', encoding='utf-8') as file:
+            summary = json.load(file)
+        terminalreporter.write_sep('-', 'captcha solvers')
+        for solver, stats in summary.items():
+            terminalreporter.write_line(
+                f"  {solver:<28} {stats['successes']:>4}/{stats['attempts']:<4} solved  "
+                f"{stats['timeouts']:>3} timeouts  median {stats['median_ms']:.0f}ms  p95 {stats['p95_ms']:.0f}ms")
+
+
+@pytest.fixture(autouse=True)
+def deadline_scope(request):
+    """
+    Run each test under its time budget: @pytest.mark.time_budget(seconds), defaults to 'test_time_budget'.
+    Waits, retries, sleeps and downloads shrink to the remaining budget, so a hung test releases its worker.
+    """
+    marker = request.node.get_closest_marker('time_budget')
+    seconds = marker.args[0] if marker and marker.args else settings.get_global_config('test_time_budget')
+    with time_budget(seconds, 'test'):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def action_metrics_scope(request):
+    """ Tag the actions with the current test and attach their timings and WebDriver commands to the Allure report. """
+    action_metrics.current_test = request.node.nodeid
+    yield
+    action_metrics.attach_to_allure(request.node.nodeid)
+    action_metrics.flush_test(request.node.nodeid)
+    command_tracer.flush_test(request.node.nodeid)
+    action_metrics.current_test = None
 
 
 @pytest.fixture(scope='session')
@@ -86,11 +257,14 @@ def web_driver():
         options.add_argument('--disable-dev-shm-usage')
         options.add_argument('--verbose')
         options.add_argument('--log-level=3')
+        if settings.get_global_config('network_mode') == 'record':
+            # DevTools network events, read back to build the HAR of each test.
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
         driver = WebDriver.Chrome(service=service, options=options)
         print("Start initializing the WebDriver object, please wait...")
         print("Initialization completed, start executing test cases...")
-        time.sleep(0.5)
+        sleep_auditor.sleep(0.5)
         yield driver
     except Exception as e:
         print(f"WebDriver initialization failed: {str(e)}")
@@ -128,7 +302,7 @@ def app_driver():
         driver = AppDriver.Remote("http://127.0.0.1:4723", options=options)
         print("Start initializing the AppDriver object, please wait...")
         print("Initialization completed, start executing test cases...")
-        time.sleep(0.5)
+        sleep_auditor.sleep(0.5)
         yield driver
     except Exception as e:
         print(f"AppDriver initialization failed: {str(e)}")
@@ -137,3 +311,70 @@ def app_driver():
         if driver is not None:
             driver.quit()
             print("\nApp-related tests have been completed, please check the Allure report for details!")
+
+
+@pytest.fixture
+def perf_benchmark(request):
+    """
+    Run a benchmark and fail the test if its median regresses beyond the threshold against the stored baseline.
+    Results are written to 'benchmark_dir/latest.json', and to 'baseline.json' with --bench-save.
+    Baselines depend on the machine and are not committed, without one the results are only recorded.
+
+    :Usage:
+        def test_selector(perf_benchmark):
+            perf_benchmark("selector", lambda: SelectorUtil.get_selenium_locator("#id"), rounds=1000)
+    """
+    config = request.config
+    bench_dir = settings.get_global_config('benchmark_dir')
+    baseline_path = os.path.join(bench_dir, 'baseline.json')
+    baseline = load_results(baseline_path)
+    threshold = config.getoption('--bench-threshold') or settings.get_global_config('benchmark_threshold')
+
+    def bench(name, func, **kwargs):
+        result = run_benchmark(name, func, **kwargs)
+        print(f"\n[benchmark] {name}: median {result.median * 1000:.3f}ms, p95 {result.p95 * 1000:.3f}ms, "
+              f"rounds {result.rounds}.")
+        save_results(os.path.join(bench_dir, 'latest.json'), {name: result})
+        if config.getoption('--bench-save'):
+            save_results(baseline_path, {name: result})
+        elif name not in baseline:
+            print(f"[benchmark] {name}: no baseline in {baseline_path}, create one with --bench-save.")
+        else:
+            regression = check_regression(result, baseline.get(name), threshold)
+            if regression is not None:
+                pytest.fail(f"Performance regression: {regression}")
+        return result
+
+    return bench
+
+
+@pytest.fixture(scope='session')
+def fake_webdriver_server():
+    """ In-process fake W3C WebDriver/Appium server, shared by the whole session. """
+    server = FakeWebDriverServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_web_driver(fake_webdriver_server):
+    """ WebDriver session on the fake server, with a fresh browser model per test. """
+    fake_webdriver_server.reset()
+    driver = WebDriver.Remote(command_executor=fake_webdriver_server.url, options=WebDriver.ChromeOptions())
+    yield driver
+    driver.quit()
+
+
+@pytest.fixture
+def fake_app_driver(fake_webdriver_server):
+    """ AppDriver session on the fake server, with a fresh device model per test. """
+    fake_webdriver_server.reset()
+    options = AppiumOptions()
+    options.load_capabilities({
+        "platformName": "Android",
+        "appium:automationName": "uiautomator2",
+        "appium:deviceName": "fake",
+    })
+    driver = AppDriver.Remote(fake_webdriver_server.url, options=options)
+    yield driver
+    driver.quit()
@@ -14,7 +14,6 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
-import pyautogui
 
 
 class TestExample(BaseCaseWeb):
@@ -25,11 +24,10 @@ class TestExample(BaseCaseWeb):
         # 打开验证码页面
         self.open("https://captcha.ruijie.com.cn/")
         img_el = self.find_element("img")
-        self.sleep(0.5)
+        self.wait_for_idle()
 
-        # 下载验证码图片
-        captcha_path = self.download_image(img_el, "captcha1.png")
-        print(f"验证码图片保存路径: {captcha_path}")
+        # 直接在内存中获取验证码图片
+        captcha_image = self.element_image(img_el)
 
         # 获取验证码文本要求
         text_captcha = self.find_element("span.verify-msg").text
@@ -40,19 +38,18 @@ class TestExample(BaseCaseWeb):
 
         try:
             # 识别图片中的文字和位置
-            text_positions = captcha_tool.recognize_text(captcha_path)
+            text_positions = captcha_tool.recognize_text(captcha_image)
             print(f"识别到的文字和位置: {text_positions}")
 
             # 解析需要点击的文字序列
             text_sequence = captcha_tool.parse_captcha_text(text_captcha)
             print(f"需要点击的文字序列: {text_sequence}")
-            width, height = self.get_window_size().values()
-
-            # 点击文字
-            # captcha_tool.click_text_positions(text_positions, text_sequence)
+            # 点击文字, 识别坐标按截图尺寸换算到元素上
+            captcha_tool.click_text_positions(img_el, text_positions, text_sequence,
+                                              image_size=(captcha_image.shape[1], captcha_image.shape[0]))
             self.click(pos=(50, 380))
             # 截图记录结果
-            self.sleep(0.5)
+            self.wait_for_idle()
             img_path = self.take_screenshot("在线体验")
             print(f"结果截图保存路径: {img_path}")
 
@@ -71,10 +68,16 @@ class TestExample(BaseCaseWeb):
         self.scroll_to_top()
         self.switch_to_frame(0)
         self.switch_to_frame(self.find_element("iframe#tcaptcha_iframe_dy"))
-        self.sleep(2)
-        self.find_element('/html/body/div/div[3]/div[2]/div[1]/div[2]/div').screenshot("captcha.png")
-
+        self.wait_for_idle()
+        background_el = self.find_element('/html/body/div/div[3]/div[2]/div[1]/div[2]/div')
 
         # 在控制台中验证xpath元素：$x("/html/body/div/div[3]/div[2]/div[6]")
-        self.find_element('/html/body/div/div[3]/div[2]/div[6]', 'xpath')
-        self.sleep(3)
+        handle_el = self.find_element('/html/body/div/div[3]/div[2]/div[6]', 'xpath')
+
+        # 拼图块元素, 拖动距离为缺口与拼图块初始位置之差
+        piece_el = self.find_element('.tc-fg-item')
+
+        # 边缘检测+模板匹配在求解线程池中定位缺口, 拖动轨迹由浏览器一次执行
+        result = self.solve_captcha('slider', background_el, handle=handle_el, piece=piece_el)
+        print(f"滑块拖动距离: {result.answer}")
+        self.wait_for_idle()
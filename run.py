@@ -8,6 +8,8 @@
 """
 import os
 import shutil
+import subprocess
+import time
 import traceback
 import pyfiglet
 import pytest
@@ -16,6 +18,7 @@ from utils import config
 from utils.other_tool.models import NotificationType
 from utils.other_tool.allure_data.allure_report_data import AllureFileClean
 from utils.log_tool.log_control import INFO, ERROR
+from utils.perf_tool.run_history import RunHistory
 from utils.notify_tool.send_wechat import WeChatSend
 from utils.notify_tool.send_ding import DingTalkSendMsg
 from utils.notify_tool.send_mail import SendEmail
@@ -42,24 +45,36 @@ def run():
                 os.makedirs(dir_path, exist_ok=True)
                 INFO.logger.info("Report files cleanup completed.")
 
-        # Run test cases.
+        # Run test cases. The fake-driver self-tests and the overhead benchmarks of the framework stay out of
+        # the report, the notifications and the run history, run them with: pytest -m "framework or benchmark"
+        # Only the runs started here are stored in the run history, which feeds the scheduler and the trends.
         pytest_args = ['-s', '-W', 'ignore:Module already imported:pytest.PytestWarning',
-                       '--alluredir', './report/tmp', "--clean-alluredir"]
+                       '--alluredir', './report/tmp', "--clean-alluredir", '-m', 'not framework and not benchmark',
+                       '--run-history']
 
         try:
             pytest_args.extend(['-n', 'auto'])
         except ImportError:
             INFO.logger.warning("The pytest-xdist plugin is not installed, so the test cases will be executed serially.")
 
+        run_started = time.time()
         exit_code = pytest.main(pytest_args)
 
         if exit_code != 0:
             ERROR.logger.error(f"Test execution failed with exit code: {exit_code}.")
             # 不要在这里直接返回，继续尝试生成报告
 
-        # Generate Allure report.
+        # Feed the Allure trend widgets from the run history, the results directory only holds this run.
+        # Allure adds this run to the trends itself, so only the runs recorded before it are exported.
+        try:
+            RunHistory().export_allure_history(os.path.join(report_tmp, 'history'),
+                                               report_name=config.project_name, before=run_started)
+        except Exception as e:
+            ERROR.logger.error(f"Failed to export the run history to Allure: {str(e)}")
+
+        # Generate Allure report in the background, the notification is computed from the raw results.
         INFO.logger.info("Generating Allure report...")
-        os.system(f"allure generate ./report/tmp -o ./report/html --clean")
+        report_process = subprocess.Popen("allure generate ./report/tmp -o ./report/html --clean", shell=True)
 
         # Send notification.
         if config.notification_type != NotificationType.DEFAULT.value:
@@ -77,6 +92,9 @@ def run():
             except Exception as e:
                 ERROR.logger.error(f"Failed to send notification: {str(e)}")
 
+        if report_process.wait() != 0:
+            ERROR.logger.error(f"Failed to generate the Allure report, exit code: {report_process.returncode}.")
+
         # Start Allure report service.
         INFO.logger.info("Starting Allure report service...")
         os.system(f"allure serve ./report/tmp -p 53230")
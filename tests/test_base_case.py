@@ -24,6 +24,7 @@ class BaseCaseWeb(BaseCase):
         self.driver = web_driver
         self.setup_actions()
         yield
+        self.teardown_actions()
 
     def login(self):
         """ Web login implementation. """
@@ -43,7 +44,26 @@ class BaseCaseApp(BaseCase):
         self.driver = app_driver
         self.setup_actions()
         yield
+        self.teardown_actions()
 
     def login(self):
         """ App login implementation. """
         pass
+
+
+class BaseCaseFake(BaseCase):
+    """ Fake-driver test base class, for framework self-tests and benchmarks without a real browser. """
+
+    @pytest.fixture(autouse=True)
+    def setup_fake_test(self, fake_web_driver, fake_webdriver_server) -> None:
+        """
+        Set up the fake Web test environment.
+
+        :param fake_web_driver: WebDriver instance connected to the fake server.
+        :param fake_webdriver_server: Fake server, 'self.browser' is its scriptable browser model.
+        """
+        self.driver = fake_web_driver
+        self.browser = fake_webdriver_server.browser
+        self.setup_actions()
+        yield
+        self.teardown_actions()
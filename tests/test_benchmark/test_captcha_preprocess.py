@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 9:50 PM
+@ Author      : Poco Ray
+@ File        : test_captcha_preprocess.py
+@ Description : Captcha preprocessing benchmarks: single-LUT HSV mask against the former one-inRange-per-colour mask.
+"""
+import cv2
+import numpy as np
+import pytest
+from utils.captcha_tool.image_preprocess import (DEFAULT_HSV_RANGES, CaptchaPreprocessor, build_hsv_lut, hsv_mask,
+                                                 select_scale)
+
+
+def legacy_mask(hsv: np.ndarray) -> np.ndarray:
+    """ The mask as TextCaptcha built it before: one cv2.inRange per colour, OR-ed together. """
+    final_mask = np.zeros(hsv.shape[:2], dtype=np.uint8)
+    for hsv_range in DEFAULT_HSV_RANGES:
+        final_mask = cv2.bitwise_or(final_mask, cv2.inRange(hsv, np.array(hsv_range.lower), np.array(hsv_range.upper)))
+    return final_mask
+
+
+@pytest.fixture(scope='module')
+def captcha_hsv():
+    """ A 3x upscaled 160x320 captcha-sized image with random noise, covering every HSV value. """
+    rng = np.random.default_rng(39)
+    image = rng.integers(0, 256, size=(160, 320, 3), dtype=np.uint8)
+    image = cv2.resize(image, (960, 480))
+    return cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+
+
+@pytest.mark.benchmark
+class TestCaptchaPreprocess:
+
+    def test_lut_mask_matches_legacy(self, captcha_hsv):
+        assert np.array_equal(hsv_mask(captcha_hsv, build_hsv_lut(DEFAULT_HSV_RANGES)), legacy_mask(captcha_hsv))
+
+    def test_select_scale(self):
+        assert select_scale(40) == 3.0
+        assert select_scale(160) == 2.25
+        assert select_scale(1080) == 1.0
+
+    def test_preprocessor_output(self, captcha_hsv):
+        image = cv2.cvtColor(captcha_hsv[::3, ::3].copy(), cv2.COLOR_HSV2BGR)
+        binary = CaptchaPreprocessor(scale=3.0)(image)
+        assert binary.shape == (480, 960) and binary.dtype == np.uint8
+
+    def test_legacy_mask(self, perf_benchmark, captcha_hsv):
+        perf_benchmark("captcha.hsv_mask[legacy]", lambda: legacy_mask(captcha_hsv), rounds=100)
+
+    def test_lut_mask(self, perf_benchmark, captcha_hsv):
+        lut = build_hsv_lut(DEFAULT_HSV_RANGES)
+        perf_benchmark("captcha.hsv_mask[lut]", lambda: hsv_mask(captcha_hsv, lut), rounds=100)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 3:20 PM
+@ Author      : Poco Ray
+@ File        : test_framework_overhead.py
+@ Description : Framework-overhead benchmarks, run offline against fakes.
+                Save a baseline: pytest tests/test_benchmark --bench-save
+                Compare runs:    python -m utils.perf_tool.benchmark compare datas/benchmarks/baseline.json datas/benchmarks/latest.json
+"""
+import json
+import os
+import pytest
+from common.setting import Settings, ensure_path_sep
+from tests.test_base_case import BaseCaseFake
+from selenium.webdriver.common.action_chains import ActionChains
+from utils.api_tool.selector_util import SelectorUtil
+from utils.captcha_tool.behavior_captcha import generate_trajectory
+from utils.log_tool.log_control import INFO
+from utils.mock_tool.fake_webdriver import FakeElement
+from utils.other_tool.allure_data import allure_report_data
+from utils.other_tool.allure_data.allure_index import AllureIndex
+from utils.other_tool.allure_data.allure_report_data import AllureFileClean
+from utils.perf_tool.action_metrics import TimedWebDriverWait
+from utils.read_tool.read_file import YamlReader
+
+PAGE_URL = "http://fake.local/bench"
+
+
+@pytest.mark.benchmark
+class TestUtilityOverhead:
+    """工具类热点路径基准测试"""
+
+    def test_selector_css(self, perf_benchmark):
+        perf_benchmark("selector_util.css", lambda: SelectorUtil.get_selenium_locator("input[name='username']"),
+                       rounds=2000)
+
+    def test_selector_contains(self, perf_benchmark):
+        perf_benchmark("selector_util.contains", lambda: SelectorUtil.get_selenium_locator("li:contains('特殊作业')"),
+                       rounds=2000)
+
+    def test_settings_global_config(self, perf_benchmark):
+        settings = Settings()
+        perf_benchmark("settings.global_config", lambda: settings.global_config['webdriver_timeout'], rounds=2000)
+
+    def test_yaml_reader(self, perf_benchmark):
+        reader = YamlReader(ensure_path_sep('\\common\\config.yaml'))
+        perf_benchmark("yaml_reader.read_yaml", reader.read_yaml, rounds=50)
+
+    @staticmethod
+    def write_allure_cases(directory, count: int) -> None:
+        for i in range(count):
+            case = {"uid": str(i), "name": f"test_{i}", "fullName": f"tests.test_x#test_{i}",
+                    "status": "failed" if i % 10 == 0 else "passed", "time": {"duration": i},
+                    "steps": [{"name": f"step {j}", "status": "passed"} for j in range(20)]}
+            (directory / f"{i}.json").write_text(json.dumps(case), encoding='utf-8')
+
+    def test_allure_get_testcases(self, perf_benchmark, tmp_path, monkeypatch):
+        self.write_allure_cases(tmp_path, 200)
+        monkeypatch.setattr(allure_report_data, 'ensure_path_sep', lambda path: str(tmp_path))
+        monkeypatch.setitem(AllureFileClean._indexes, str(tmp_path), AllureIndex(str(tmp_path)))
+        perf_benchmark("allure.get_testcases[200]", AllureFileClean.get_testcases, rounds=20)
+
+    def test_allure_failed_cases(self, perf_benchmark, tmp_path, monkeypatch):
+        self.write_allure_cases(tmp_path, 2000)
+        monkeypatch.setattr(allure_report_data, 'ensure_path_sep', lambda path: str(tmp_path))
+        monkeypatch.setitem(AllureFileClean._indexes, str(tmp_path), AllureIndex(str(tmp_path)))
+        assert len(AllureFileClean().get_failed_case()) == 200
+        perf_benchmark("allure.get_failed_case[2000]", AllureFileClean().get_failed_case, rounds=20)
+
+    def test_allure_index_build(self, perf_benchmark, tmp_path):
+        self.write_allure_cases(tmp_path, 2000)
+        index = AllureIndex(str(tmp_path), parallel_threshold=1000)
+        perf_benchmark("allure.index_build[2000]", lambda: index.refresh(force=True), rounds=5)
+        assert index.status_counts() == {'failed': 200, 'passed': 1800}
+
+    def test_logging_path(self, perf_benchmark):
+        perf_benchmark("log.info", lambda: INFO.logger.info("benchmark log line"), rounds=500)
+
+
+@pytest.mark.benchmark
+class TestBaseCaseOverhead(BaseCaseFake):
+    """BaseCase动作开销基准测试"""
+
+    def use_fast_waits(self, timeout: float = 0.2, poll_frequency: float = 0.02):
+        """ Shorten the waits so that failure paths finish quickly. """
+        self._timeout = timeout
+        self._poll_frequency = poll_frequency
+        self._wait = TimedWebDriverWait(self.driver, timeout, poll_frequency=poll_frequency)
+
+    def test_click(self, perf_benchmark):
+        self.browser.add_page(PAGE_URL, "bench", [FakeElement("button", {"id": "submit"})])
+        self.open(PAGE_URL)
+        perf_benchmark("base_case.click", lambda: self.click("#submit"), rounds=30)
+
+    def test_click_intercepted(self, perf_benchmark):
+        self.browser.add_page(PAGE_URL, "bench", [FakeElement("button", {"id": "submit"}, fail_clicks=10 ** 6)])
+        self.open(PAGE_URL)
+        perf_benchmark("base_case.click[intercepted]", lambda: self.click("#submit"), rounds=30)
+
+    def test_click_missing(self, perf_benchmark):
+        self.browser.add_page(PAGE_URL, "bench")
+        self.open(PAGE_URL)
+        self.use_fast_waits()
+
+        def click_missing():
+            with pytest.raises(Exception):
+                self.click("#missing")
+
+        perf_benchmark("base_case.click[missing]", click_missing, rounds=3, warmup=0)
+
+    def test_find_element(self, perf_benchmark):
+        self.browser.add_page(PAGE_URL, "bench", [FakeElement("input", {"name": "username"})])
+        self.open(PAGE_URL)
+        perf_benchmark("base_case.find_element", lambda: self.find_element("input[name='username']"), rounds=50)
+
+    def test_take_screenshot(self, perf_benchmark):
+        self.browser.add_page(PAGE_URL, "bench")
+        self.open(PAGE_URL)
+        perf_benchmark("base_case.take_screenshot", lambda: os.remove(self.take_screenshot("bench")), rounds=20)
+
+    def test_drag_by_offset(self, perf_benchmark):
+        """ The whole trajectory goes out as one Actions request. """
+        self.browser.add_page(PAGE_URL, "bench", [FakeElement("div", {"class": "handle"})])
+        self.open(PAGE_URL)
+        handle = self.find_element(".handle")
+        self.browser.actions_log.clear()
+        perf_benchmark("base_case.drag_by_offset", lambda: self.drag_by_offset(handle, 180), rounds=20)
+        assert len(self.browser.actions_log) == 23  # 3 warmup + 20 rounds.
+
+    def test_drag_per_step(self, perf_benchmark):
+        """ Reference: the same trajectory sent as one request per move, as ActionChains.move_by_offset does. """
+        self.browser.add_page(PAGE_URL, "bench", [FakeElement("div", {"class": "handle"})])
+        self.open(PAGE_URL)
+        handle = self.find_element(".handle")
+        moves = generate_trajectory(180, 0).relative_moves()
+
+        def drag():
+            ActionChains(self.driver).click_and_hold(handle).perform()
+            for dx, dy, _ in moves.tolist():
+                ActionChains(self.driver, duration=0).move_by_offset(dx, dy).perform()
+            ActionChains(self.driver).release().perform()
+
+        self.browser.actions_log.clear()
+        perf_benchmark("base_case.drag[per_step]", drag, rounds=5, warmup=0)
+        assert len(self.browser.actions_log) == 5 * (len(moves) + 2)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 11:50 PM
+@ Author      : Poco Ray
+@ File        : test_image_captcha.py
+@ Description : Image captcha accuracy and latency over a generated fixture dataset of 3x3 grids,
+                batched tile inference against one inference call per tile.
+                Real corpora go to captcha_corpus_dir/image: python -m utils.captcha_tool.captcha_bench image
+"""
+import json
+import cv2
+import numpy as np
+import pytest
+from utils.captcha_tool.captcha_bench import bench_image, format_report, load_corpus
+from utils.captcha_tool.image_captcha import HistogramBackend, ImageCaptcha, load_backend, split_tiles
+
+COLORS = {'red': (40, 40, 210), 'green': (40, 180, 40), 'blue': (200, 60, 30)}
+TILE = 100
+
+
+def make_tile(rng: np.random.Generator, label: str) -> np.ndarray:
+    """ A noisy grey tile with a jittered object of the class colour. """
+    grey = rng.integers(90, 170, size=(TILE, TILE, 1))
+    tile = np.clip(grey + rng.integers(-12, 13, size=(TILE, TILE, 3)), 0, 255).astype(np.uint8)
+    color = tuple(int(np.clip(c + rng.integers(-25, 26), 0, 255)) for c in COLORS[label])
+    center = tuple(int(v) for v in rng.integers(35, 65, size=2))
+    cv2.circle(tile, center, int(rng.integers(22, 32)), color, -1)
+    return tile
+
+
+@pytest.fixture(scope='module')
+def image_fixture(tmp_path_factory):
+    """ Histogram backend fitted on training tiles, and a corpus of 15 labeled grids. """
+    rng = np.random.default_rng(44)
+    labels = list(COLORS)
+    backend = HistogramBackend.fit({label: [make_tile(rng, label) for _ in range(10)] for label in labels})
+
+    corpus_dir = tmp_path_factory.mktemp('image')
+    annotations = {}
+    for i in range(15):
+        tile_labels = rng.choice(labels, size=9)
+        tiles = [make_tile(rng, label) for label in tile_labels]
+        grid = np.vstack([np.hstack(tiles[row * 3:row * 3 + 3]) for row in range(3)])
+        target = labels[i % len(labels)]
+        cv2.imwrite(str(corpus_dir / f'grid_{i:03d}.png'), grid)
+        annotations[f'grid_{i:03d}.png'] = {'target': target, 'grid': [3, 3],
+                                            'tiles': [j for j, label in enumerate(tile_labels) if label == target]}
+    (corpus_dir / 'labels.json').write_text(json.dumps(annotations), encoding='utf-8')
+    backend.save(str(corpus_dir / 'centroids.npz'))
+    return backend, load_corpus(str(corpus_dir)), str(corpus_dir / 'centroids.npz')
+
+
+@pytest.mark.benchmark
+class TestImageCaptcha:
+
+    def test_split_tiles(self):
+        image = np.arange(6 * 9 * 3, dtype=np.uint8).reshape(6, 9, 3)
+        tiles = split_tiles(image, 2, 3)
+        assert tiles.shape == (6, 3, 3, 3)
+        assert np.array_equal(tiles[4], image[3:6, 3:6])
+
+    def test_backend_cached_per_process(self, image_fixture):
+        _, _, centroids = image_fixture
+        assert load_backend('histogram', path=centroids) is load_backend('histogram', path=centroids)
+
+    def test_corpus_accuracy(self, image_fixture):
+        backend, samples, _ = image_fixture
+        results = {stats.name: stats for stats in bench_image(samples, backend)}
+        print('\n' + format_report(list(results.values())))
+        assert results['batched'].accuracy >= 0.9
+        assert results['batched'].accuracy == results['per_tile'].accuracy
+
+    def test_select_batched(self, perf_benchmark, image_fixture):
+        backend, samples, _ = image_fixture
+        captcha = ImageCaptcha(backend)
+        perf_benchmark("image_captcha.select[batched]", lambda: captcha.select(samples[0].image, 'red'), rounds=50)
+
+    def test_select_per_tile(self, perf_benchmark, image_fixture):
+        backend, samples, _ = image_fixture
+        tiles = split_tiles(samples[0].image)
+        perf_benchmark("image_captcha.select[per_tile]", lambda: [backend.predict(tile[None]) for tile in tiles],
+                       rounds=50)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 11:10 PM
+@ Author      : Poco Ray
+@ File        : test_slider_captcha.py
+@ Description : Slider gap detection accuracy and per-solve latency over a generated corpus of gap images.
+                Real corpora go to captcha_corpus_dir/slider: python -m utils.captcha_tool.captcha_bench slider
+"""
+import json
+import cv2
+import numpy as np
+import pytest
+from utils.captcha_tool.captcha_bench import bench_slider, format_report, load_corpus
+from utils.captcha_tool.slider_captcha import SliderCaptcha
+
+PIECE_SIZE = 44
+
+
+def make_sample(rng: np.random.Generator, gap_x: int, gap_y: int):
+    """ A smooth textured 320x160 background with a brightened gap, and the piece cut from it on a transparent strip. """
+    noise = rng.integers(0, 256, size=(20, 40, 3), dtype=np.uint8)
+    background = cv2.GaussianBlur(cv2.resize(noise, (320, 160), interpolation=cv2.INTER_CUBIC), (9, 9), 0)
+    piece = np.zeros((160, PIECE_SIZE, 4), dtype=np.uint8)
+    piece[gap_y:gap_y + PIECE_SIZE, :, :3] = background[gap_y:gap_y + PIECE_SIZE, gap_x:gap_x + PIECE_SIZE]
+    piece[gap_y:gap_y + PIECE_SIZE, :, 3] = 255
+    region = background[gap_y:gap_y + PIECE_SIZE, gap_x:gap_x + PIECE_SIZE].astype(np.int16)
+    background[gap_y:gap_y + PIECE_SIZE, gap_x:gap_x + PIECE_SIZE] = np.clip(region // 2 + 110, 0, 255)
+    return background, piece
+
+
+@pytest.fixture(scope='module')
+def slider_corpus(tmp_path_factory):
+    corpus_dir = tmp_path_factory.mktemp('slider')
+    rng = np.random.default_rng(42)
+    labels = {}
+    for i in range(20):
+        gap_x, gap_y = int(rng.integers(80, 260)), int(rng.integers(10, 100))
+        background, piece = make_sample(rng, gap_x, gap_y)
+        cv2.imwrite(str(corpus_dir / f'bg_{i:03d}.png'), background)
+        cv2.imwrite(str(corpus_dir / f'piece_{i:03d}.png'), piece)
+        labels[f'bg_{i:03d}.png'] = {'x': gap_x, 'piece': f'piece_{i:03d}.png'}
+    (corpus_dir / 'labels.json').write_text(json.dumps(labels), encoding='utf-8')
+    return load_corpus(str(corpus_dir))
+
+
+@pytest.mark.benchmark
+class TestSliderCaptcha:
+
+    def test_corpus_accuracy(self, slider_corpus):
+        results = {stats.name: stats for stats in bench_slider(slider_corpus)}
+        print('\n' + format_report(list(results.values())))
+        assert results['piece'].accuracy >= 0.95
+        assert results['outline'].accuracy >= 0.7
+
+    def test_find_gap(self, perf_benchmark, slider_corpus):
+        slider = SliderCaptcha()
+        sample = slider_corpus[0]
+        piece = cv2.imread(sample.path.replace('bg_', 'piece_'), cv2.IMREAD_UNCHANGED)
+        perf_benchmark("slider.find_gap[piece]", lambda: slider.find_gap(sample.image, piece), rounds=50)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 9:30 AM
+@ Author      : Poco Ray
+@ File        : test_action_metrics.py
+@ Description : Action timing aggregation, OpenMetrics rendering and cross-worker merge self-tests.
+"""
+import json
+import pytest
+from utils.perf_tool.action_metrics import ActionMetrics, ActionRecord, percentile
+
+
+def collector(worker: str) -> ActionMetrics:
+    metrics = ActionMetrics()
+    metrics.worker = worker
+    return metrics
+
+
+@pytest.mark.framework
+def test_percentile():
+    """测试百分位线性插值及空样本"""
+    assert percentile([], 95) == 0.0
+    assert percentile([0.7], 99) == 0.7
+    assert percentile([4, 1, 3, 2], 50) == 2.5
+    assert percentile([1, 2, 3, 4], 95) == pytest.approx(3.85)
+    assert (percentile([1, 2, 3, 4], 0), percentile([1, 2, 3, 4], 100)) == (1, 4)
+
+
+@pytest.mark.framework
+def test_aggregate_and_openmetrics():
+    """测试按操作及选择器分别汇总, OpenMetrics输出"""
+    records = [ActionRecord('click', '#a', wall_time=0.1, round_trips=2),
+               ActionRecord('click', '#a', wall_time=0.3, round_trips=2, retries=1),
+               ActionRecord('click', 'a[title="x"]', wall_time=0.2, round_trips=1, status='failed'),
+               ActionRecord('open', wall_time=1.0, round_trips=1, wait_time=0.5)]
+    summary = ActionMetrics.aggregate(records)
+    assert list(summary['actions']) == ['click', 'open']
+    assert list(summary['selectors']) == ['click #a', 'click a[title="x"]']
+    click = summary['actions']['click']
+    assert (click['count'], click['failed'], click['round_trips'], click['retries']) == (3, 1, 5, 1)
+    assert (click['p50'], click['max'], click['sum']) == (0.2, 0.3, 0.6)
+    assert summary['selectors']['click #a']['count'] == 2
+
+    lines = ActionMetrics.to_openmetrics(summary).splitlines()
+    assert lines[-1] == '# EOF'
+    assert 'uiatf_action_duration_seconds{action="click",quantile="0.95"} 0.29' in lines
+    assert 'uiatf_action_duration_seconds{action="click",selector="a[title=\\"x\\"]",quantile="0.50"} 0.2' in lines
+    assert 'uiatf_action_duration_seconds_count{action="open"} 1' in lines
+    assert 'uiatf_action_round_trips_total{action="click",selector="#a"} 4' in lines
+    assert 'uiatf_action_wait_seconds_total{action="open"} 0.5' in lines
+    assert '# TYPE uiatf_action_retries counter' in lines
+
+
+@pytest.mark.framework
+def test_merge_worker_files(tmp_path):
+    """测试用例结束时写出并释放记录, 汇总合并各worker的记录文件"""
+    for worker, action in (('gw0', 'click'), ('gw1', 'type')):
+        metrics = collector(worker)
+        metrics.current_test = f't_{worker}'
+        with metrics.measure(action, '#name'):
+            metrics.add_round_trip(2)
+        metrics.current_test = None
+        with metrics.measure('open'):
+            pass
+        metrics.flush_test(f't_{worker}', str(tmp_path))
+        assert [r.action for r in metrics.records()] == ['open']
+        metrics.export_records(str(tmp_path))
+        assert metrics.records() == []
+
+    records = ActionMetrics.load_records(str(tmp_path))
+    assert sorted((r.worker, r.action) for r in records) == [
+        ('gw0', 'click'), ('gw0', 'open'), ('gw1', 'open'), ('gw1', 'type')]
+    summary_path = ActionMetrics.export_summary(str(tmp_path), openmetrics=True)
+    with open(summary_path, 'r', encoding='utf-8') as file:
+        summary = json.load(file)
+    assert summary['actions']['open']['count'] == 2 and summary['actions']['click']['round_trips'] == 2
+    assert set(summary['selectors']) == {'click #name', 'type #name'}
+    assert (tmp_path / 'action-metrics.prom').read_text(encoding='utf-8').endswith('# EOF\n')
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/20 上午1:40
+@ Author      : Poco Ray
+@ File        : test_allure_index.py
+@ Description : Allure 原始结果索引及用例指标自测.
+"""
+import json
+import pytest
+from utils.other_tool.allure_data import allure_report_data
+from utils.other_tool.allure_data.allure_index import AllureIndex
+from utils.other_tool.allure_data.allure_report_data import AllureFileClean
+
+
+def write_result(directory, name: str, history_id: str, status: str, start: int, stop: int):
+    result = {"uuid": name, "historyId": history_id, "name": history_id, "fullName": f"tests.test_x#{history_id}",
+              "status": status, "start": start, "stop": stop, "steps": []}
+    (directory / f"{name}-result.json").write_text(json.dumps(result), encoding='utf-8')
+
+
+@pytest.mark.framework
+def test_metrics_from_results(tmp_path, monkeypatch):
+    """测试由原始结果计算用例指标: 重试取最后一次结果, 运行时长为首尾时间差, 增量刷新"""
+    write_result(tmp_path, 'a1', 'test_a', 'failed', 1000, 2000)
+    write_result(tmp_path, 'a2', 'test_a', 'passed', 2500, 3000)  # 重试通过
+    write_result(tmp_path, 'b', 'test_b', 'broken', 1200, 4200)
+    write_result(tmp_path, 'c', 'test_c', 'skipped', 1500, 1500)
+    (tmp_path / 'x-container.json').write_text('{"children": []}', encoding='utf-8')
+    monkeypatch.setattr(allure_report_data, 'ensure_path_sep', lambda path: str(tmp_path))
+    monkeypatch.setitem(AllureFileClean._indexes, str(tmp_path), AllureIndex(str(tmp_path), suffix='-result.json'))
+
+    metrics = AllureFileClean.get_case_count()
+    assert (metrics.total, metrics.passed, metrics.failed, metrics.broken, metrics.skipped) == (3, 1, 0, 1, 1)
+    assert metrics.pass_rate == 66.67 and metrics.time == 3.0
+    assert AllureFileClean().get_failed_case() == [('test_b', 'tests.test_x#test_b')]
+
+    write_result(tmp_path, 'd', 'test_d', 'failed', 1300, 1400)
+    assert AllureFileClean.index().refresh() == 0  # index()已解析新增文件
+    assert AllureFileClean.get_case_count().failed == 1
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午11:30
+@ Author      : Poco Ray
+@ File        : test_behavior_captcha.py
+@ Description : 类人轨迹生成及滑块拖动自测.
+"""
+import numpy as np
+import pytest
+from selenium.webdriver.common.by import By
+from utils.captcha_tool.behavior_captcha import BehaviorCaptcha, generate_trajectory, minimum_jerk
+from utils.captcha_tool.slider_captcha import SliderCaptcha
+from utils.mock_tool.fake_webdriver import FakeElement
+
+
+@pytest.mark.framework
+def test_trajectory_shape():
+    """测试轨迹终点精确、首尾速度为0、固定种子可复现"""
+    trajectory = generate_trajectory(183, -7, duration=0.9, overshoot=0.05, rng=np.random.default_rng(1))
+    moves = trajectory.relative_moves()
+    assert moves[:, :2].sum(axis=0).tolist() == [183, -7]
+    assert moves[:, 2].sum() == 900
+    assert trajectory.points[:, 0].max() > 183  # 超调后回拉
+    speed = np.diff(minimum_jerk(50))
+    assert speed[0] < speed[24] and speed[-1] < speed[24]
+    again = generate_trajectory(183, -7, duration=0.9, overshoot=0.05, rng=np.random.default_rng(1))
+    assert np.array_equal(trajectory.points, again.points)
+
+
+@pytest.mark.framework
+def test_slider_drag_single_request(fake_webdriver_server, fake_web_driver):
+    """测试滑块拖动整条轨迹为一个W3C Actions请求"""
+    browser = fake_webdriver_server.browser
+    browser.add_page("http://fake.local/slider", "滑块", [FakeElement("div", {"class": "handle"})])
+    fake_web_driver.get("http://fake.local/slider")
+    handle = fake_web_driver.find_element(By.CSS_SELECTOR, ".handle")
+
+    SliderCaptcha(behavior=BehaviorCaptcha(seed=7)).drag(handle, 150)
+    assert len(browser.actions_log) == 1
+    pointer = next(a for a in browser.actions_log[0]['actions'] if a['type'] == 'pointer')['actions']
+    assert [a['type'] for a in pointer][:2] == ['pointerMove', 'pointerDown'] and pointer[-1]['type'] == 'pointerUp'
+    assert sum(a['x'] for a in pointer[2:] if a['type'] == 'pointerMove') == 150
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/20 上午12:50
+@ Author      : Poco Ray
+@ File        : test_captcha_solver.py
+@ Description : 验证码求解器注册表、回退及统计自测.
+"""
+import time
+import numpy as np
+import pytest
+from tests.test_base_case import BaseCaseFake
+from tests.test_benchmark.test_slider_captcha import PIECE_SIZE, make_sample
+from utils.api_tool.deadline import DeadlineExceeded
+from utils.captcha_tool.captcha_solver import SOLVERS, CaptchaSolveError, CaptchaSolver, CaptchaTask, \
+    _solver_executor, solver_metrics
+from utils.captcha_tool.FAQ_captcha import FAQCaptcha
+from utils.mock_tool.fake_webdriver import FakeElement
+
+CAPTCHA_URL = "http://fake.local/captcha"
+
+
+class SlowSolver(CaptchaSolver):
+    name = 'slow'
+
+    def capture(self, case, element, **kwargs):
+        return element.text
+
+    def compute(self, captured, **kwargs):
+        time.sleep(2)
+        return 'late'
+
+
+class EchoSolver(SlowSolver):
+    name = 'echo'
+
+    def compute(self, captured, **kwargs):
+        return captured
+
+    def act(self, case, element, answer, input=None, **kwargs):
+        input.send_keys(answer)
+
+
+@pytest.mark.framework
+def test_faq_arithmetic():
+    """测试数学题及知识库"""
+    assert FAQCaptcha().solve("3 + 5 = ?") == '8'
+    assert FAQCaptcha().solve("十二减三等于几？") == '9'
+    assert FAQCaptcha().solve("（2+3）x4=") == '20'
+    assert FAQCaptcha({'中国的首都是哪里': '北京'}).solve("中国的首都是哪里？") == '北京'
+    with pytest.raises(ValueError):
+        FAQCaptcha().solve("__import__('os')")
+
+
+@pytest.mark.framework
+def test_slider_piece_left():
+    """测试滑块拖动距离为缺口减去拼图块初始位置: 整条拼图块图片给出初始位置, 单独的拼图块图像须传入"""
+    background, piece = make_sample(np.random.default_rng(7), 200, 40)
+    strip = np.zeros((160, 320, 4), dtype=np.uint8)
+    strip[:, 12:12 + PIECE_SIZE] = piece
+    solver = SOLVERS['slider'][0]
+    assert abs(solver.compute((background, strip, 160, None)) - (200 - 12) / 2) <= 1
+    assert abs(solver.compute((background, piece, 160, None), piece_left=12) - (200 - 12) / 2) <= 1
+    assert abs(solver.compute((background, piece, 160, 6)) - (200 - 12) / 2) <= 1  # 拼图块元素偏移6个CSS像素
+    with pytest.raises(ValueError):
+        solver.compute((background, piece, 160, None))
+
+
+class TestCaptchaSolver(BaseCaseFake):
+    """验证码求解器自测类"""
+
+    def build_page(self, question: str):
+        self.browser.add_page(CAPTCHA_URL, "验证码", [
+            FakeElement("span", {"class": "question"}, text=question),
+            FakeElement("input", {"class": "answer"}),
+        ])
+        self.open(CAPTCHA_URL)
+
+    @pytest.mark.framework
+    def test_faq_solver(self):
+        """测试问答验证码的捕获、计算和输入, 非阻塞调用"""
+        self.build_page("十二加三十等于几？")
+        solver_metrics.reset()
+        task = self.solve_captcha('faq', self.find_element(".question"), wait=False,
+                                  input=self.find_element(".answer"))
+        result = task.result()
+        assert (result.solver, result.answer) == ('text', '42')
+        assert self.browser.find('css selector', '.answer')[0].value == '42'
+        assert solver_metrics.stats()['faq/text'].successes == 1
+
+    @pytest.mark.framework
+    def test_missing_arguments(self):
+        """测试缺少必需参数时在采集和计算之前抛出ValueError, 不计为求解器失败"""
+        self.build_page("1 + 1 = ?")
+        solver_metrics.reset()
+        for kind, kwargs, missing in (('faq', {}, 'input'), ('slider', {'piece': None}, 'handle'),
+                                      ('text', {}, 'prompt or targets')):
+            with pytest.raises(ValueError, match=missing):
+                CaptchaTask(kind, self, self.find_element(".question"), **kwargs)
+        assert solver_metrics.stats() == {}
+
+    @pytest.mark.framework
+    def test_timeout_fallback(self, monkeypatch):
+        """测试求解器超时后回退到下一个求解器"""
+        monkeypatch.setitem(SOLVERS, 'echo', [SlowSolver(), EchoSolver()])
+        self.build_page("pong")
+        solver_metrics.reset()
+        result = self.solve_captcha('echo', self.find_element(".question"), timeout=0.2,
+                                    input=self.find_element(".answer"))
+        assert (result.solver, result.answer) == ('echo', 'pong')
+        stats = solver_metrics.stats()
+        assert stats['echo/slow'].timeouts == 1 and stats['echo/echo'].successes == 1
+
+        monkeypatch.setitem(SOLVERS, 'echo', [SlowSolver()])
+        with pytest.raises(CaptchaSolveError):
+            self.solve_captcha('echo', self.find_element(".question"), timeout=0.2)
+
+    @pytest.mark.framework
+    def test_deadline_and_busy_pool(self, monkeypatch):
+        """测试时间预算用完时抛出DeadlineExceeded不再回退, 线程池被占满时改用独立线程计算"""
+        monkeypatch.setitem(SOLVERS, 'echo', [SlowSolver(), EchoSolver()])
+        self.build_page("pong")
+        solver_metrics.reset()
+        with pytest.raises(DeadlineExceeded):
+            with self.time_budget(0.3, 'captcha'):
+                self.solve_captcha('echo', self.find_element(".question"), timeout=5)
+        assert 'echo/echo' not in solver_metrics.stats()
+
+        blockers = [_solver_executor().submit(time.sleep, 1) for _ in range(_solver_executor()._max_workers)]
+        monkeypatch.setitem(SOLVERS, 'echo', [EchoSolver()])
+        started = time.perf_counter()
+        result = self.solve_captcha('echo', self.find_element(".question"), timeout=0.3,
+                                    input=self.find_element(".answer"))
+        assert result.answer == 'pong' and time.perf_counter() - started < 0.9
+        for blocker in blockers:
+            blocker.result()
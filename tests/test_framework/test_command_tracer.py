@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 11:05 AM
+@ Author      : Poco Ray
+@ File        : test_command_tracer.py
+@ Description : WebDriver command tracing hook, summary and folded stack self-tests.
+"""
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from utils.perf_tool.action_metrics import action_metrics
+from utils.perf_tool.command_tracer import CommandRecord, CommandTracer
+
+
+class StubExecutor:
+    """ RemoteConnection stand-in: 'findElement' answers a W3C error, 'boom' raises. """
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.commands = []
+
+    def execute(self, command, params=None):
+        self.commands.append(command)
+        time.sleep(self.latency)
+        if command == 'boom':
+            raise ConnectionError("connection refused")
+        if command == 'findElement':
+            return {'value': {'error': 'no such element', 'message': ''}}
+        return {'value': None}
+
+
+@pytest.mark.framework
+def test_traced_execute(monkeypatch):
+    """测试命令执行钩子记录命令、耗时、状态及所属操作"""
+    tracer, executor = CommandTracer(), StubExecutor()
+    tracer.enabled = True
+    driver = SimpleNamespace(command_executor=executor)
+    tracer.install(driver)
+    tracer.install(driver)  # 重复安装不会重复记录
+    monkeypatch.setattr(action_metrics, 'current_test', 't_trace')
+    try:
+        with action_metrics.measure('login'):
+            with action_metrics.measure('click', '#submit') as click:
+                driver.command_executor.execute('findElement', {'using': 'css selector', 'value': '#submit'})
+                driver.command_executor.execute('clickElement', {'id': 'e1'})
+        with pytest.raises(ConnectionError):
+            driver.command_executor.execute('boom')
+    finally:
+        action_metrics.pop_records('t_trace')
+
+    records = tracer.records('t_trace')
+    assert executor.commands == ['findElement', 'clickElement', 'boom'] and click.round_trips == 2
+    assert [(r.command, r.status, r.stack) for r in records] == [
+        ('findElement', 'no such element', ('login', 'click')),
+        ('clickElement', 'ok', ('login', 'click')),
+        ('boom', 'ConnectionError', ())]
+    assert all(r.latency >= executor.latency for r in records)
+    assert records[0].payload_size == len(json.dumps({'using': 'css selector', 'value': '#submit'}))
+    assert records[2].payload_size == 0
+
+
+@pytest.mark.framework
+def test_summary_and_folded(tmp_path, monkeypatch):
+    """测试按命令汇总、折叠栈格式及用例结束时写出"""
+    records = [CommandRecord('findElement', 40, 0.002, 'ok', 't;a', ('login', 'click')),
+               CommandRecord('findElement', 40, 0.003, 'no such element', 't;a', ('login', 'click')),
+               CommandRecord('clickElement', 10, 0.010, 'ok', 't;a', ('login', 'click')),
+               CommandRecord('get', 30, 0.5, 'ok', 't;a')]
+    summary = CommandTracer.summarize(records)
+    assert list(summary) == ['get', 'clickElement', 'findElement']
+    assert summary['findElement'] == {'count': 2, 'errors': 1, 'total_latency': 0.005, 'max_latency': 0.003,
+                                      'payload_bytes': 80}
+    assert CommandTracer.to_folded(records).splitlines() == [
+        "t:a;login;click;findElement 5000",
+        "t:a;login;click;clickElement 10000",
+        "t:a;get 500000",
+    ]
+    assert CommandTracer.to_folded(records[3:], 'root').splitlines() == ["root;get 500000"]
+
+    tracer = CommandTracer()
+    tracer._records.extend(records + [CommandRecord('get', 0, 0.1, 'ok', 'other')])
+    monkeypatch.setattr(action_metrics, 'worker', 'gw3')
+    assert tracer.flush_test('t;a', str(tmp_path)) == summary
+    assert [r.test_id for r in tracer.records()] == ['other']
+    lines = (tmp_path / 'commands-gw3.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['command'] for line in lines] == ['findElement', 'findElement', 'clickElement', 'get']
+    assert (tmp_path / 'commands-gw3.folded').read_text(encoding='utf-8') == CommandTracer.to_folded(records, 't;a')
+    assert tracer.flush_test('t;a', str(tmp_path)) == {}
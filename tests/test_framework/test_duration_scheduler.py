@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 4:30 AM
+@ Author      : Poco Ray
+@ File        : test_duration_scheduler.py
+@ Description : Duration-aware scheduling self-tests.
+"""
+import pytest
+from utils.perf_tool.duration_scheduler import (DispatchQueue, DurationScheduling, default_profile, plan_makespan,
+                                                predict)
+
+
+@pytest.mark.framework
+def test_profiles_and_prediction():
+    """测试会话分组及无历史用例的耗时预测"""
+    assert default_profile("tests/test_web/test_login.py::TestLogin::test_ok") == "tests/test_web"
+    assert default_profile("tests/test_web/admin/test_x.py::test_a",
+                           {"tests/test_web": "web", "tests/test_web/admin": "admin"}) == "admin"
+    assert predict(["a", "b", "c"], {"a": 1.0, "b": 3.0}, 10.0) == [1.0, 3.0, 2.0]
+    assert predict(["a"], {}, 10.0) == [10.0]
+
+
+@pytest.mark.framework
+def test_lpt_dispatch():
+    """测试最长优先分配: 同会话分组优先, 分组用完后取全局最长的用例"""
+    predicted = [1.0, 5.0, 2.0, 8.0, 3.0]
+    profiles = ["web", "web", "app", "app", "web"]
+    queue = DispatchQueue(range(5), predicted, profiles)
+    assert queue.pop() == 3  # 全局最长
+    assert queue.pop("web") == 1
+    assert queue.pop("app") == 2
+    assert queue.pop("app") == 4  # app已用完, 取最长的web用例
+    assert queue.pop("web") == 0 and not queue
+
+    # 两个worker: 最长优先为 [8, 2] 和 [5, 3, 1] -> 10, 按收集顺序轮流分配为 [1, 2, 3] 和 [5, 8] -> 13
+    assert plan_makespan(predicted, ["p"] * 5, 2) == 10.0
+
+
+class MockGateway:
+    def __init__(self, gateway_id: str):
+        self.id = gateway_id
+
+
+class MockNode:
+    """与xdist自身测试相同的模拟worker: 记录收到的用例和关闭请求"""
+
+    def __init__(self, gateway_id: str):
+        self.gateway = MockGateway(gateway_id)
+        self.sent = []
+        self._shutdown = False
+
+    @property
+    def shutting_down(self) -> bool:
+        return self._shutdown
+
+    def send_runtest_some(self, indices):
+        self.sent.extend(indices)
+
+    def send_runtest_all(self):
+        self.sent.append('ALL')
+
+    def shutdown(self):
+        self._shutdown = True
+
+
+class MockConfig:
+    """ LoadScheduling只读取tx和maxschedchunk选项 """
+
+    def __init__(self, workers: int):
+        self.values = {'tx': [f'{workers}*popen'], 'maxschedchunk': None, 'dist': 'load'}
+
+    def getvalue(self, name):
+        return self.values[name]
+
+    getoption = getvalue
+
+
+COLLECTION = ["tests/test_web/test_a.py::test_1", "tests/test_web/test_a.py::test_2",
+              "tests/test_web/test_a.py::test_3", "tests/test_app/test_b.py::test_4",
+              "tests/test_app/test_b.py::test_5", "tests/test_app/test_b.py::test_6"]
+DURATIONS = dict(zip(COLLECTION, [8.0, 2.0, 5.0, 7.0, 1.0, 3.0]))
+
+
+def start_scheduler(workers: int):
+    scheduler = DurationScheduling(MockConfig(workers), durations=DURATIONS)
+    nodes = [MockNode(f'gw{i}') for i in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+    for node in nodes:
+        scheduler.add_node_collection(node, COLLECTION)
+    assert scheduler.collection_is_completed
+    scheduler.schedule()
+    return scheduler, nodes
+
+
+@pytest.mark.framework
+def test_scheduler_lookahead_and_profiles():
+    """测试每个worker持有两个用例, 首个用例为全局最长, 之后保持同一会话分组"""
+    scheduler, (node1, node2) = start_scheduler(2)
+    assert node1.sent == [0, 2] and node2.sent == [3, 5]  # web: 8s, 5s; app: 7s, 3s
+    assert sorted(scheduler.pending) == [1, 4]
+    assert scheduler.predicted_makespan == 13.0 and scheduler.workers == 2
+
+    scheduler.mark_test_complete(node1, 0)
+    assert node1.sent == [0, 2, 1]  # web用例优先
+    scheduler.mark_test_complete(node2, 3)
+    assert node2.sent == [3, 5, 4] and not scheduler.pending
+    assert scheduler.actual_makespan is not None
+
+    scheduler.mark_test_complete(node1, 2)
+    assert node1.shutting_down and not node2.shutting_down  # 没有待分配的用例时关闭worker
+    for node, index in ((node1, 1), (node2, 5), (node2, 4)):
+        scheduler.mark_test_complete(node, index)
+    assert scheduler.tests_finished
+
+
+@pytest.mark.framework
+def test_scheduler_node_crash_requeue():
+    """测试worker崩溃后其未执行的用例重新排队, 重跑的崩溃用例按最长优先分配"""
+    scheduler, (node1, node2) = start_scheduler(2)
+    crash_item = scheduler.remove_node(node2)
+    assert crash_item == COLLECTION[3]
+    assert sorted(scheduler.pending) == [1, 4, 5]
+
+    scheduler.mark_test_pending(crash_item)  # 如pytest-rerunfailures重跑崩溃的用例
+    scheduler.mark_test_complete(node1, 0)
+    scheduler.mark_test_complete(node1, 2)
+    assert node1.sent == [0, 2, 1, 3]  # web用完后取最长的app用例
+    for index in (1, 3, 5):
+        scheduler.mark_test_complete(node1, index)
+    assert node1.sent == [0, 2, 1, 3, 5, 4] and node1.shutting_down
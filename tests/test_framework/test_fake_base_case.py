@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 1:40 PM
+@ Author      : Poco Ray
+@ File        : test_fake_base_case.py
+@ Description : BaseCase self-tests against the fake WebDriver server.
+"""
+import base64
+import os
+import time
+import cv2
+import numpy as np
+import pytest
+from selenium.common.exceptions import TimeoutException
+from tests.test_base_case import BaseCaseFake
+from utils.api_tool.base_case import BaseCase
+from pages.page_web.page_web_login import PageWebLogin
+from utils.api_tool.deadline import DeadlineExceeded
+from utils.api_tool.download_manager import unique_file_names
+from utils.api_tool.page_idle import install_idle_hook
+from utils.mock_tool.fake_webdriver import FakeElement
+from utils.perf_tool.action_metrics import action_metrics
+from utils.perf_tool.command_tracer import command_tracer
+from utils.perf_tool.sleep_audit import sleep_auditor
+
+LOGIN_URL = "http://fake.local/login"
+INDEX_URL = "http://fake.local/index"
+
+
+class TestFakeBaseCase(BaseCaseFake):
+    """BaseCase自测类"""
+
+    def build_login_pages(self):
+        """ Login page whose button navigates to the index page. """
+        self.browser.add_page(LOGIN_URL, "登录", [
+            FakeElement("input", {"placeholder": "账号"}),
+            FakeElement("input", {"placeholder": "密码", "type": "password"}),
+            FakeElement("button", {"type": "button"}, text="登录",
+                        on_click=lambda browser, element: browser.navigate(INDEX_URL)),
+        ])
+        self.browser.add_page(INDEX_URL, "首页", [FakeElement("li", text="特殊作业全过程")])
+
+    @pytest.mark.framework
+    def test_login_flow(self, request):
+        """测试登录流程及动作计时"""
+        self.build_login_pages()
+        PageWebLogin.login(self, LOGIN_URL, "admin", "yl123456")
+        assert self.current_url == INDEX_URL
+        self.click("li:contains('特殊作业全过程')")
+
+        records = action_metrics.records(request.node.nodeid)
+        assert [r.action for r in records if r.action in ('open', 'type', 'click')] == [
+            'open', 'type', 'type', 'click', 'click']
+        assert all(r.round_trips > 0 for r in records)
+
+        commands = command_tracer.records(request.node.nodeid)
+        assert [c.command for c in commands].count('get') == 1
+        assert any(c.stack[:1] == ('click',) and c.command == 'clickElement' for c in commands)
+
+    @pytest.mark.framework
+    def test_missing_element(self):
+        """测试元素不存在时的超时"""
+        self.browser.add_page(LOGIN_URL, "登录")
+        self.open(LOGIN_URL)
+        with pytest.raises(TimeoutException):
+            self.find_element("#missing", timeout=1)
+
+    @pytest.mark.framework
+    def test_delayed_element(self):
+        """测试元素延迟出现"""
+        self.browser.add_page(LOGIN_URL, "登录", [FakeElement("button", {"id": "submit"}, appear_after=0.3)])
+        self.open(LOGIN_URL)
+        assert self.find_element("#submit").tag_name == "button"
+
+    @pytest.mark.framework
+    def test_time_budget(self):
+        """测试时间预算耗尽后等待及驱动命令提前结束"""
+        self.browser.add_page(LOGIN_URL, "登录")
+        self.open(LOGIN_URL)
+        with pytest.raises(TimeoutException):
+            with self.time_budget(0.5, 'missing'):
+                self.find_element("#missing", timeout=10)
+        with pytest.raises(DeadlineExceeded):
+            with self.time_budget(0.2, 'sleep'):
+                self.sleep(5)
+
+        # 卡住的驱动命令同样受时间预算限制, 不等到HTTP客户端超时
+        self.browser.command_latency['get'] = 3
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            with self.time_budget(0.3, 'open'):
+                self.open(INDEX_URL)
+        assert time.monotonic() - started < 2
+        self.browser.command_latency.clear()
+
+    @pytest.mark.framework
+    def test_element_cache(self, request):
+        """测试元素缓存命中、DOM变化失效及过期元素重新定位"""
+        self.browser.add_page(LOGIN_URL, "登录", [FakeElement("button", {"id": "submit"}, text="登录")])
+        self.open(LOGIN_URL)
+        self.find_element("#submit")
+        element = self.find_element("#submit")
+        commands = [c.command for c in command_tracer.records(request.node.nodeid)]
+        assert commands.count('findElement') == 1
+
+        self.browser.dom_generation += 1
+        self.find_element("#submit")
+        commands = [c.command for c in command_tracer.records(request.node.nodeid)]
+        assert commands.count('findElement') == 2
+
+        self.browser.navigate(LOGIN_URL)
+        assert element.text == "登录"
+
+    @pytest.mark.framework
+    def test_element_cache_attribute_change(self):
+        """测试class或文本变化后缓存失效, 不返回已不匹配定位器的元素"""
+        self.browser.add_page(LOGIN_URL, "登录", [FakeElement("li", {"class": "active"}, text="首页"),
+                                                FakeElement("li", text="设置")])
+        self.open(LOGIN_URL)
+        assert self.find_element(".active").text == "首页"
+        first, second = self.browser.find('css selector', 'li')
+        self.browser.mutate(first, **{'class': ''})
+        self.browser.mutate(second, **{'class': 'active'})
+        assert self.find_element(".active").text == "设置"
+        self.browser.mutate(second, text="系统设置")
+        assert self.find_element("li:contains('系统设置')").text == "系统设置"
+
+    @pytest.mark.framework
+    def test_wait_for_idle(self):
+        """测试等待页面请求结束, 页面一直不空闲时默认只记录警告"""
+        self.browser.add_page(LOGIN_URL, "登录")
+        self.open(LOGIN_URL)
+        self.browser.network_idle_at = time.monotonic() + 0.4
+        started = time.monotonic()
+        assert self.wait_for_idle(quiet_ms=100)
+        assert 0.5 <= time.monotonic() - started < 2
+
+        self.browser.network_idle_at = time.monotonic() + 60  # 页面一直有请求, 如长轮询
+        assert not self.wait_for_idle(quiet_ms=100, timeout=0.3)
+        with pytest.raises(TimeoutException):
+            self.wait_for_idle(quiet_ms=100, timeout=0.3, strict=True)
+
+    @pytest.mark.framework
+    def test_sleep_audit(self, request, monkeypatch):
+        """测试固定等待记录及空闲模式"""
+        self.browser.add_page(LOGIN_URL, "登录")
+        self.open(LOGIN_URL)
+        self.sleep(0.2)
+        records = sleep_auditor.records(request.node.nodeid)
+        assert len(records) == 1 and records[0].call_site.startswith('tests')
+        assert records[0].slept >= 0.2
+
+        monkeypatch.setattr(sleep_auditor, 'mode', 'idle')
+        self.sleep(5)
+        assert sleep_auditor.records(request.node.nodeid)[-1].slept < 2
+
+        BaseCase.sleep(0.1)  # 兼容原staticmethod的调用方式, 始终固定等待
+        assert sleep_auditor.records(request.node.nodeid)[-1].mode == 'fixed'
+
+    @pytest.mark.framework
+    def test_har_record_replay(self, tmp_path):
+        """测试HAR录制与回放"""
+        self.browser.add_page(LOGIN_URL, "登录")
+        self.open(LOGIN_URL)
+        self.network.start_recording()
+        self.browser.record_request("http://fake.local/api/user", '{"name": "admin"}')
+        har_file = str(tmp_path / "login.har")
+        assert self.network.stop_recording(har_file) == 1
+
+        self.replay_har(har_file)
+        scripts = [params['source'] for cmd, params in self.browser.cdp_log
+                   if cmd == 'Page.addScriptToEvaluateOnNewDocument']
+        assert any('GET http://fake.local/api/user' in script for script in scripts)
+
+        self.block_urls(["*.png"])
+        self.teardown_actions()
+        assert self.browser.cdp_log[-1][0] == 'Network.disable'
+
+    @pytest.mark.framework
+    def test_downloads(self, request):
+        """测试用例独立下载目录及下载完成等待"""
+        assert request.node.name in self.downloads_path
+        self.browser.add_page(LOGIN_URL, "登录", [FakeElement("img", {"src": "data:image/png;base64,iVBORw0KGgo="})])
+        self.open(LOGIN_URL)
+        image_path = self.download_image(self.find_element("img"), "captcha.png")
+        assert open(image_path, 'rb').read() == b'\x89PNG\r\n\x1a\n'
+
+        with open(os.path.join(self.downloads_path, "report.xlsx.crdownload"), 'wb') as file:
+            file.write(b'data')
+        with pytest.raises(TimeoutException):
+            self.wait_for_download("report*", timeout=0.5)
+        os.replace(os.path.join(self.downloads_path, "report.xlsx.crdownload"),
+                   os.path.join(self.downloads_path, "report.xlsx"))
+        assert self.wait_for_download("report*").endswith("report.xlsx")
+
+    @pytest.mark.framework
+    def test_download_names(self):
+        """测试同名资源及data URI并发下载时文件名唯一"""
+        assert unique_file_names(["http://fake.local/a/report.xlsx", "http://fake.local/b/report.xlsx",
+                                  "http://fake.local/a/report.xlsx?page=2", "http://fake.local/",
+                                  "http://fake.local/%E6%8A%A5%E8%A1%A8.csv"]) == [
+            "report.xlsx", "report_1.xlsx", "report_2.xlsx", "file_3", "报表.csv"]
+        payloads = [bytes([i]) * 4096 for i in range(3)]
+        urls = ["data:image/png;base64," + base64.b64encode(p).decode() for p in payloads[:2]]
+        urls.append("data:text/plain," + "a" * 300)
+        paths = self.download_files(urls)
+        assert [os.path.basename(p) for p in paths] == ["file_0.png", "file_1.png", "file_2.txt"]
+        assert [open(p, 'rb').read() for p in paths] == [*payloads[:2], b"a" * 300]
+
+    @pytest.mark.framework
+    def test_element_image(self):
+        """测试元素图片内存解码"""
+        png = cv2.imencode('.png', np.full((4, 6, 3), 255, dtype=np.uint8))[1].tobytes()
+        src = "data:image/png;base64," + base64.b64encode(png).decode()
+        self.browser.add_page(LOGIN_URL, "登录", [FakeElement("img", {"src": src}), FakeElement("div", {"id": "box"})])
+        self.open(LOGIN_URL)
+        assert self.element_image(self.find_element("img")).shape == (4, 6, 3)
+        assert self.element_image(self.find_element("#box")).ndim == 3
+
+
+@pytest.mark.framework
+def test_idle_hook_chromium_only(fake_web_driver, fake_app_driver, fake_webdriver_server):
+    """测试空闲钩子只通过Chrome DevTools注入Chromium浏览器, App会话不发送CDP命令"""
+    assert install_idle_hook(fake_web_driver)
+    fake_webdriver_server.browser.cdp_log.clear()
+    assert not install_idle_hook(fake_app_driver)
+    assert fake_webdriver_server.browser.cdp_log == []
+
+
+class TestFakeAppCase(BaseCase):
+    """App会话初始化自测类"""
+
+    @pytest.mark.framework
+    def test_app_setup(self, fake_app_driver, fake_webdriver_server):
+        """测试App会话初始化及清理: 网络控制与浏览器下载不可用, 不发送Chrome DevTools命令"""
+        self.driver = fake_app_driver
+        self.setup_actions()
+        try:
+            assert not self.network.supported
+            assert not self.downloads.enable_browser_downloads()
+        finally:
+            self.teardown_actions()
+        assert fake_webdriver_server.browser.cdp_log == []
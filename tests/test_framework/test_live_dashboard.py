@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 2:30 AM
+@ Author      : Poco Ray
+@ File        : test_live_dashboard.py
+@ Description : Live dashboard aggregation and HTTP endpoint self-tests.
+"""
+import json
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+import pytest
+from utils.perf_tool.live_dashboard import DashboardServer, RunState
+
+
+def report(nodeid: str, when: str, outcome: str = 'passed', duration: float = 0.1, worker: str = 'gw0'):
+    """ Minimal TestReport as forwarded by xdist, 'node' is the worker controller. """
+    return SimpleNamespace(nodeid=nodeid, when=when, duration=duration, passed=outcome == 'passed',
+                           failed=outcome == 'failed', skipped=outcome == 'skipped',
+                           node=SimpleNamespace(gateway=SimpleNamespace(id=worker)))
+
+
+def run_test(state: RunState, nodeid: str, call: str = 'passed', duration: float = 0.1, worker: str = 'gw0',
+             teardown: str = 'passed'):
+    for when, outcome, seconds in (('setup', 'passed', 0.0), ('call', call, duration), ('teardown', teardown, 0.0)):
+        state.add_report(report(nodeid, when, outcome, seconds, worker))
+
+
+@pytest.mark.framework
+def test_run_state():
+    """测试计数、最慢用例堆及各worker统计"""
+    state = RunState(slowest=2)
+    state.set_total(5)
+    run_test(state, 't1', duration=0.5)
+    run_test(state, 't2', call='failed', duration=2.0, worker='gw1')
+    run_test(state, 't3', duration=1.0, teardown='failed')
+    state.add_report(report('t4', 'setup'))
+
+    snapshot = state.snapshot()
+    assert snapshot['done'] == 3 and snapshot['running'] == ['t4'] and snapshot['eta'] is not None
+    assert (snapshot['counts']['passed'], snapshot['counts']['failed'], snapshot['counts']['error']) == (1, 1, 1)
+    assert [t['nodeid'] for t in snapshot['slowest']] == ['t2', 't3']
+    assert snapshot['workers']['gw0']['tests'] == 2 and snapshot['workers']['gw1']['failed'] == 1
+    assert snapshot['failures'] == ['t2', 't3']
+
+
+@pytest.mark.framework
+def test_dashboard_server():
+    """测试状态接口及中止请求, 缺少令牌或跨域的中止请求被拒绝"""
+    state, reasons = RunState(), []
+    run_test(state, 't1')
+    server = DashboardServer(state, reasons.append, port=0).start()
+    try:
+        with urllib.request.urlopen(server.url + 'status.json', timeout=5) as response:
+            assert json.load(response)['counts']['passed'] == 1
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            assert server.abort_token in response.read().decode('utf-8')
+        for headers in ({}, {'X-Abort-Token': 'guess'},
+                        {'X-Abort-Token': server.abort_token, 'Origin': 'http://evil.example'},
+                        {'X-Abort-Token': server.abort_token, 'Origin': 'http://localhost:1'}):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(urllib.request.Request(server.url + 'abort', headers=headers, method='POST'),
+                                       timeout=5)
+            assert error.value.code == 403
+        assert reasons == []
+        port = server.server_address[1]
+        for origin in (server.url.rstrip('/'), f"http://localhost:{port}", f"http://[::1]:{port}"):
+            headers = {'X-Abort-Token': server.abort_token, 'Origin': origin}
+            urllib.request.urlopen(urllib.request.Request(server.url + 'abort', headers=headers, method='POST'),
+                                   timeout=5).close()
+        assert reasons == ['aborted from the live dashboard'] * 3
+        state.finish()
+        with urllib.request.urlopen(server.url + 'events', timeout=5) as response:
+            assert json.loads(response.readline().decode('utf-8')[len('data: '):])['status'] == 'finished'
+    finally:
+        server.close()
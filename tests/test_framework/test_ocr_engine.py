@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午9:10
+@ Author      : Poco Ray
+@ File        : test_ocr_engine.py
+@ Description : OCR sidecar协议自测.
+"""
+import threading
+import numpy as np
+import pytest
+from utils.captcha_tool.ocr_engine import OcrClient, OcrServer, sidecar_supported
+
+
+class ShapeEngine:
+    """按图像尺寸返回结果的引擎, 用于验证传输"""
+
+    def ocr_batch(self, images, **kwargs):
+        return [[[[[0, 0], [image.shape[1], 0], [image.shape[1], image.shape[0]], [0, image.shape[0]]],
+                  (kwargs.get('text', ''), np.float32(0.9))]] for image in images]
+
+
+@pytest.mark.framework
+@pytest.mark.skipif(not sidecar_supported(), reason="Unix sockets are not available")
+def test_sidecar_round_trip(tmp_path):
+    """测试sidecar批量识别及异步调用"""
+    server = OcrServer(str(tmp_path / "ocr.sock"), engine=ShapeEngine()).start()
+    try:
+        client = OcrClient(server.socket_path)
+        images = [np.zeros((30, 100, 3), dtype=np.uint8), np.zeros((40, 120), dtype=np.uint8)]
+        results = client.ocr_batch(images, text='送')
+        assert [r[0][0][2] for r in results] == [[100, 30], [120, 40]]
+        assert results[0][0][1][0] == '送'
+        assert client.submit(images[0]).result(timeout=5)[0][1][1] == pytest.approx(0.9)
+    finally:
+        server.stop()
+
+
+class HangingEngine(ShapeEngine):
+    """首次请求卡住的引擎, 模拟sidecar在请求中途挂起"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+
+    def ocr_batch(self, images, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            self.release.wait(5)
+        return super().ocr_batch(images, **kwargs)
+
+
+@pytest.mark.framework
+@pytest.mark.skipif(not sidecar_supported(), reason="Unix sockets are not available")
+def test_sidecar_timeout(tmp_path):
+    """测试sidecar请求中途卡住时客户端超时抛出TimeoutError, 之后重新连接"""
+    engine = HangingEngine()
+    server = OcrServer(str(tmp_path / "ocr.sock"), engine=engine).start()
+    try:
+        client = OcrClient(server.socket_path, timeout=0.3)
+        image = np.zeros((30, 100, 3), dtype=np.uint8)
+        with pytest.raises(TimeoutError, match="did not answer"):
+            client.ocr(image)
+        engine.release.set()
+        assert client.ocr(image)[0][0][2] == [100, 30]
+    finally:
+        engine.release.set()
+        server.stop()
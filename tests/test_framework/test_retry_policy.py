@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 10:20 AM
+@ Author      : Poco Ray
+@ File        : test_retry_policy.py
+@ Description : Failure classification, per-class retry budgets and click retries against the fake WebDriver server.
+"""
+import time
+import pytest
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSelectorException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from tests.test_base_case import BaseCaseFake
+from utils.api_tool.deadline import DeadlineExceeded
+from utils.api_tool.retry_policy import DEFAULT_BUDGETS, FailureKind, RetryBudget, RetryPolicy, classify_failure
+from utils.mock_tool.fake_webdriver import FakeElement, FakeWebDriverError
+from utils.perf_tool.action_metrics import action_metrics
+from utils.perf_tool.sleep_audit import sleep_auditor
+
+PAGE_URL = "http://fake.local/form"
+
+
+@pytest.mark.framework
+@pytest.mark.parametrize('exc, stage, kind', [
+    (DeadlineExceeded("budget"), 'presence', FailureKind.DEADLINE),
+    (StaleElementReferenceException(), None, FailureKind.STALE),
+    (ElementClickInterceptedException(), 'click', FailureKind.INTERCEPTED),
+    (ElementNotInteractableException(), 'click', FailureKind.NOT_VISIBLE),
+    (NoSuchElementException(), None, FailureKind.ABSENT),
+    (TimeoutException(), 'presence', FailureKind.ABSENT),
+    (TimeoutException(), 'clickable', FailureKind.NOT_VISIBLE),
+    (InvalidSessionIdException(), None, FailureKind.DRIVER_DEAD),
+    (ConnectionRefusedError(), None, FailureKind.DRIVER_DEAD),
+    (WebDriverException("chrome not reachable"), None, FailureKind.DRIVER_DEAD),
+    (InvalidSelectorException(), None, FailureKind.INVALID),
+    (ValueError("bad locator"), None, FailureKind.INVALID),
+    (WebDriverException("something else"), None, FailureKind.UNKNOWN),
+])
+def test_classify_failure(exc, stage, kind):
+    """测试按异常类型及失败阶段分类"""
+    assert classify_failure(exc, stage) is kind
+
+
+@pytest.mark.framework
+def test_retry_budgets():
+    """测试不可重试的失败立即放弃, 其它失败在各自预算及总次数内指数退避"""
+    for kind in (FailureKind.ABSENT, FailureKind.DRIVER_DEAD, FailureKind.INVALID, FailureKind.DEADLINE):
+        assert RetryPolicy().start().next_delay(kind) is None
+
+    state = RetryPolicy().start()
+    assert [state.next_delay(FailureKind.INTERCEPTED) for _ in range(3)] == [0.25, 0.5, None]
+    assert state.wait_timeout(FailureKind.INTERCEPTED) == DEFAULT_BUDGETS[FailureKind.INTERCEPTED].wait_timeout
+    assert state.next_delay(FailureKind.STALE) == 0.0
+    assert state.next_delay(FailureKind.STALE) is None  # max_retries of 3 reached across the kinds.
+    assert state.total == 3
+
+    state = RetryPolicy({FailureKind.ABSENT: RetryBudget(retries=1, backoff=1.0)}).start()
+    assert state.next_delay(FailureKind.ABSENT) == 1.0
+
+
+class TestClickRetry(BaseCaseFake):
+    """点击重试自测类"""
+
+    @pytest.mark.framework
+    def test_intercepted_click_retries(self, request):
+        """测试点击被遮挡时退避重试, 退避等待记录在固定等待审计中"""
+        clicked = []
+        self.browser.add_page(PAGE_URL, "表单", [
+            FakeElement("button", {"id": "submit"}, fail_clicks=2,
+                        on_click=lambda browser, element: clicked.append(element))])
+        self.open(PAGE_URL)
+        scripted = []
+
+        def script_click(browser, args):
+            # 遮罩层同样挡住第一次JavaScript点击
+            if not scripted:
+                scripted.append(args[0])
+                raise FakeWebDriverError('element click intercepted', 'Overlay', 400)
+            args[0].on_click(browser, args[0])
+
+        self.browser.on_script("arguments[0].click()", script_click)
+        self.click("#submit")
+        assert len(clicked) == 1
+        click_record = [r for r in action_metrics.records(request.node.nodeid) if r.action == 'click'][-1]
+        assert click_record.retries == 1
+        backoffs = sleep_auditor.records(request.node.nodeid)
+        assert len(backoffs) == 1 and backoffs[0].requested == DEFAULT_BUDGETS[FailureKind.INTERCEPTED].backoff
+
+    @pytest.mark.framework
+    def test_absent_element_fails_fast(self, request):
+        """测试元素不存在时不重试, 超时后立即失败"""
+        self.browser.add_page(PAGE_URL, "表单")
+        self.open(PAGE_URL)
+        self._timeout = 0.5
+        started = time.monotonic()
+        with pytest.raises(TimeoutException):
+            self.click("#missing")
+        assert time.monotonic() - started < 1.5
+        click_record = [r for r in action_metrics.records(request.node.nodeid) if r.action == 'click'][-1]
+        assert click_record.retries == 0
+        assert sleep_auditor.records(request.node.nodeid) == []
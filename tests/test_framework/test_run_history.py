@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 3:30 AM
+@ Author      : Poco Ray
+@ File        : test_run_history.py
+@ Description : Run history store and trend query self-tests.
+"""
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from utils.perf_tool.action_metrics import ActionRecord
+from utils.perf_tool.run_history import CaseResult, RunHistory, RunRecorder
+
+
+def record_runs(history: RunHistory, runs: int = 6) -> None:
+    for i in range(runs):
+        history.record_run(1000.0 + i * 100, [
+            CaseResult('t_stable', 'passed', 1.0, 'gw0'),
+            CaseResult('t_flaky', 'failed' if i % 2 else 'passed', 2.0, 'gw1'),
+            CaseResult('t_slower', 'passed', 1.0 + i * 0.5, 'gw0', retries=1 if i == 5 else 0),
+        ], [ActionRecord('click', test_id='t_stable', wall_time=0.2, round_trips=2)] * 2,
+            finished=1000.0 + i * 100 + 30)
+
+
+@pytest.mark.framework
+def test_trend_queries(tmp_path):
+    """测试不稳定度、耗时增长、耗时中位数及Allure趋势数据"""
+    history = RunHistory(':memory:')
+    record_runs(history)
+
+    assert history.flakiness(window=6) == [('t_flaky', 1.0, 6), ('t_slower', 0.2, 6)]
+    nodeid, growth, first, last = history.slowest_growing(window=6)[0]
+    assert (nodeid, growth, first, last) == ('t_slower', 0.5, 1.0, 3.5)
+    assert history.durations(window=2)['t_slower'] == 3.25
+    assert [d for _, _, d in history.duration_trend('t_slower', window=3)] == [2.5, 3.0, 3.5]
+    assert history.query("SELECT count, round_trips FROM actions WHERE run_id = 1") == [(2, 4)]
+
+    history.export_allure_history(str(tmp_path), limit=2)
+    trend = json.loads((tmp_path / 'history-trend.json').read_text(encoding='utf-8'))
+    assert [t['buildOrder'] for t in trend] == [6, 5] and trend[0]['data']['failed'] == 1
+    assert json.loads((tmp_path / 'duration-trend.json').read_text(encoding='utf-8'))[0]['data'] == {'duration': 30000}
+
+    history.prune(keep=2)
+    assert history.query("SELECT COUNT(DISTINCT run_id) FROM results") == [(2,)]
+
+
+@pytest.mark.framework
+def test_recorder_counts_reruns():
+    """测试重跑的用例只记录最后一次结果及重跑次数"""
+    recorder = RunRecorder(RunHistory(':memory:'))
+    for outcome in ('rerun', 'passed'):
+        for when in ('setup', 'call', 'teardown'):
+            result = outcome if when == 'call' else 'passed'
+            recorder.pytest_runtest_logreport(SimpleNamespace(
+                nodeid='t', when=when, outcome=result, duration=0.5, passed=result == 'passed', failed=False,
+                skipped=False, node=SimpleNamespace(gateway=SimpleNamespace(id='gw2'))))
+    assert recorder.results['t'] == CaseResult('t', 'passed', 1.5, 'gw2', retries=1)
+
+
+@pytest.mark.framework
+def test_export_skips_current_run(tmp_path):
+    """测试导出Allure趋势时不包含刚记录的本次运行, Allure会自行加入本次运行"""
+    history = RunHistory(':memory:')
+    record_runs(history, runs=2)
+    run_started = time.time()
+    recorder = RunRecorder(history)
+    recorder.results['t_stable'] = CaseResult('t_stable', 'failed', 1.0)
+    recorder.pytest_sessionfinish(SimpleNamespace())
+    assert history.runs(limit=1)[0]['counts'] == {'failed': 1}
+
+    history.export_allure_history(str(tmp_path), before=run_started)
+    for filename in ('history-trend.json', 'duration-trend.json', 'retry-trend.json'):
+        trend = json.loads((tmp_path / filename).read_text(encoding='utf-8'))
+        assert [t['buildOrder'] for t in trend] == [2, 1]
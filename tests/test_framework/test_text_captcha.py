@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午10:20
+@ Author      : Poco Ray
+@ File        : test_text_captcha.py
+@ Description : 文字验证码策略链、结果缓存、点击及评测工具自测, 使用假OCR引擎和假WebDriver.
+"""
+import numpy as np
+import pytest
+from selenium.webdriver.common.by import By
+from utils.captcha_tool.captcha_bench import LabeledSample, evaluate, text_score
+from utils.captcha_tool.text_captcha import TextCaptcha
+from utils.mock_tool.fake_webdriver import FakeElement
+
+
+class ScaleEngine:
+    """放大3倍的图像才能识别出'送'字, 任意图像都能识别出'公'字"""
+
+    def __init__(self):
+        self.calls = []
+
+    def ocr(self, image, **kwargs):
+        scale = image.shape[1] / 320
+        self.calls.append(round(scale, 2))
+        box = [[10 * scale, 10 * scale], [30 * scale, 10 * scale], [30 * scale, 30 * scale], [10 * scale, 30 * scale]]
+        lines = [[box, ('公', 0.9)]]
+        if scale >= 3:
+            lines.append([[[x + 40 * scale, y] for x, y in box], ('送', 0.8)])
+        return [lines]
+
+
+@pytest.fixture
+def captcha():
+    TextCaptcha.result_cache.clear()
+    return TextCaptcha(ocr=ScaleEngine())
+
+
+@pytest.mark.framework
+def test_strategy_chain_early_exit(captcha):
+    """测试策略链在找到全部目标文字后提前结束, 坐标换算回原图"""
+    image = np.full((160, 320, 3), 255, dtype=np.uint8)
+    positions = captcha.recognize_text(image, targets=['送', '公'])
+    assert dict(positions) == {'公': (20, 20), '送': (60, 20)}
+    assert captcha.last_strategies == ['preprocessed', 'original', 'preprocessed@3x']
+
+
+@pytest.mark.framework
+def test_result_cache(captcha):
+    """测试相同图像再次识别时命中缓存, 不再运行OCR"""
+    image = np.full((160, 320, 3), 255, dtype=np.uint8)
+    first = captcha.recognize_text(image)
+    calls = len(captcha.ocr.calls)
+    assert captcha.recognize_text(image.copy()) == first
+    assert len(captcha.ocr.calls) == calls and captcha.result_cache.hits == 1
+
+
+@pytest.mark.framework
+def test_failures_not_cached():
+    """测试OCR异常时不缓存结果, 重试时重新识别"""
+    class FlakyEngine(ScaleEngine):
+        def ocr(self, image, **kwargs):
+            if len(self.calls) < 4:
+                self.calls.append('error')
+                raise ConnectionError("sidecar unavailable")
+            return super().ocr(image, **kwargs)
+
+    TextCaptcha.result_cache.clear()
+    captcha = TextCaptcha(ocr=FlakyEngine())
+    image = np.full((160, 320, 3), 255, dtype=np.uint8)
+    hits = captcha.result_cache.hits
+    assert captcha.recognize_text(image) == []
+    assert dict(captcha.recognize_text(image)) == {'公': (20, 20)}
+    assert captcha.result_cache.hits == hits
+
+
+@pytest.mark.framework
+def test_evaluate_strategy(captcha):
+    """测试评测工具统计得分和异常"""
+    samples = [LabeledSample('a.png', np.full((160, 320, 3), 255, dtype=np.uint8), '送公'),
+               LabeledSample('b.png', np.zeros((0, 0, 3), dtype=np.uint8), '公')]
+    stats = evaluate('original', samples, lambda sample: captcha.run_strategy(sample.image, captcha.strategies[1])
+                     if sample.image.size else 1 / 0, text_score)
+    assert (stats.samples, stats.errors, stats.accuracy) == (2, 1, 0.25)
+    assert len(stats.latencies) == 2 and stats.to_dict()['accuracy'] == 0.25
+
+
+@pytest.mark.framework
+def test_click_text_positions(fake_webdriver_server, fake_web_driver):
+    """测试所有点击合并为一个W3C Actions请求, 图像坐标按元素尺寸换算为相对中心的偏移"""
+    browser = fake_webdriver_server.browser
+    browser.add_page("http://fake.local/captcha", "验证码",
+                     [FakeElement("img", rect={'x': 10, 'y': 20, 'width': 320, 'height': 160})])
+    fake_web_driver.get("http://fake.local/captcha")
+    element = fake_web_driver.find_element(By.CSS_SELECTOR, "img")
+
+    # 高分屏截图为CSS尺寸的2倍
+    clicked = TextCaptcha.click_text_positions(element, [('送', (40, 40)), ('公', (600, 300))],
+                                               ['公', '赶', '送'], image_size=(640, 320), delay=0.1)
+    assert clicked == ['公', '送']
+    assert len(browser.actions_log) == 1
+    pointer = next(a for a in browser.actions_log[0]['actions'] if a['type'] == 'pointer')['actions']
+    moves = [(a['x'], a['y']) for a in pointer if a['type'] == 'pointerMove']
+    assert moves == [(140, 70), (-140, -60)]
+    assert [a['type'] for a in pointer].count('pointerDown') == 2
@@ -19,7 +19,7 @@ class TestWebLogin(BaseCaseWeb):
             print(f"当前URL: {current}")
             print(f"当前窗口句柄: {handle}")
             self.click("li:contains('特殊作业全过程')")
-            self.sleep(1)
+            self.wait_for_idle()
 
         except Exception as e:
             ERROR.logger.error(f"测试执行失败: {str(e)}")
@@ -6,16 +6,28 @@
 @ File        : base_case.py
 @ Description : Test case base class.
 """
-import base64
+import functools
 import os
 import time
 import shutil
-import requests
+import numpy as np
 from datetime import datetime
 from common.setting import root_path, Settings
 from utils.api_tool.custom_webelement import CustomWebElement
-from utils.log_tool.log_control import INFO, ERROR
+from utils.captcha_tool.image_io import decode_data_uri, decode_image
+from utils.captcha_tool.behavior_captcha import compile_actions, generate_trajectory
+from utils.captcha_tool.captcha_solver import CaptchaTask, SolveResult
+from utils.api_tool.element_cache import ElementCache
+from utils.api_tool.page_idle import install_idle_hook, page_is_idle
+from utils.api_tool.network_control import NetworkControl, har_path_for
+from utils.api_tool.download_manager import DownloadManager, download_dir_for, unique_file_names
+from utils.log_tool.log_control import INFO, ERROR, WARNING
 from utils.api_tool.selector_util import SelectorUtil
+from utils.api_tool.retry_policy import RetryPolicy, classify_failure
+from utils.api_tool.deadline import DeadlineExceeded, bound_commands, cap_timeout, current_deadline, time_budget
+from utils.perf_tool.action_metrics import action_metrics, timed_action, TimedWebDriverWait
+from utils.perf_tool.command_tracer import command_tracer
+from utils.perf_tool.sleep_audit import sleep_auditor
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException, ElementClickInterceptedException
@@ -25,29 +37,68 @@ from appium.webdriver.webdriver import WebDriver as AppDriver
 from typing import Any, List, Optional, Self, Tuple, ClassVar, Union
 
 
+class _static_or_bound:
+    """ Method bound to the instance when called on one, and called with None when called on the class. """
+
+    def __init__(self, func):
+        self.func = func
+        functools.update_wrapper(self, func)
+
+    def __get__(self, instance, owner=None):
+        return functools.partial(self.func, instance)
+
+
 class BaseCase:
     """ Class variable declaration. """
     driver: WebDriver or AppDriver = None  # Test driver object.
     _settings: ClassVar[Settings] = Settings()
     _wait: Optional[WebDriverWait] = None
+    _element_cache: Optional[ElementCache] = None
+    network: Optional[NetworkControl] = None  # Network layer of Chromium sessions.
+    downloads: Optional[DownloadManager] = None  # Downloads of the current test.
     _timeout: int = _settings.global_config['webdriver_timeout']
     _poll_frequency: float = _settings.global_config['webdriver_poll_frequency']
+    _retry_policy: ClassVar[RetryPolicy] = RetryPolicy()
+    _download_timeout: float = _settings.global_config['download_timeout']
+    _idle_quiet_ms: int = _settings.global_config['idle_quiet_ms']
+    _screenshot_idle_timeout: float = _settings.global_config['screenshot_idle_timeout']
     screenshots_path = _settings.global_config['screenshots_dir']
     downloads_path = _settings.global_config['downloads_dir']
     logs_path = _settings.global_config['logs_dir']
+    har_path = _settings.global_config['har_dir']
 
     def setup_actions(self):
         """ Initialize the test environment. """
         if not hasattr(self, 'driver') or self.driver is None:
             raise ValueError("The driver object is not initialized!")
 
+        # Trace the WebDriver commands issued by each action, and bound them by the time budget.
+        command_tracer.install(self.driver)
+        bound_commands(self.driver)
+
         # Initialize the wait object.
-        self._wait = WebDriverWait(
+        self._wait = TimedWebDriverWait(
             self.driver,
             self._timeout,
             poll_frequency=self._poll_frequency
         )
 
+        # Count the requests of every new document, for wait_for_idle.
+        install_idle_hook(self.driver)
+
+        # Reuse located elements while the page is unchanged.
+        if self._settings.global_config.get('element_cache', True):
+            self._element_cache = ElementCache(self.driver)
+
+        # Block, record or replay the network traffic of the test.
+        self.network = NetworkControl(self.driver)
+        if self.network.supported:
+            self._setup_network()
+
+        # Each test downloads into its own folder, so that parallel workers never share one.
+        self.downloads_path = download_dir_for(
+            self._settings.global_config['downloads_dir'], action_metrics.current_test, action_metrics.worker)
+
         # Clean up historical data.
         if self._settings.global_config.get('clean_screenshots', True):
             self._clean_screenshots()
@@ -56,6 +107,84 @@ class BaseCase:
         if self._settings.global_config.get('clean_logs', True):
             self._clean_logs()
 
+        # Pooled downloads with the browser cookies, browser downloads land in the same folder.
+        self.downloads = DownloadManager(self.driver, self.downloads_path, timeout=self._download_timeout)
+        self.downloads.enable_browser_downloads()
+
+    def _setup_network(self) -> None:
+        """ Apply 'network_blocked_urls' and the 'network_mode' of the current test. """
+        try:
+            blocked_urls = self._settings.global_config.get('network_blocked_urls')
+            if blocked_urls:
+                self.network.block(blocked_urls)
+            mode, test_id = self._settings.global_config.get('network_mode', 'live'), action_metrics.current_test
+            if mode == 'record':
+                self.network.start_recording()
+            elif mode == 'replay' and test_id and os.path.exists(har_path_for(test_id, self.har_path)):
+                count = self.network.replay(har_path_for(test_id, self.har_path))
+                INFO.logger.info(f"Replaying {count} recorded responses for: {test_id}.")
+        except WebDriverException as e:
+            ERROR.logger.error(f"Failed to set up the network control, error message: {str(e)}")
+
+    def teardown_actions(self):
+        """ Clean up the test environment: save the recorded HAR and reset the network layer of the shared browser. """
+        if self.downloads is not None:
+            self.downloads.close()
+        if self.network is None or not self.network.supported:
+            return
+        try:
+            test_id = action_metrics.current_test
+            if self.network.recording and test_id:
+                file_path = har_path_for(test_id, self.har_path)
+                count = self.network.stop_recording(file_path)
+                INFO.logger.info(f"Recorded {count} requests to: {file_path}.")
+            self.network.reset()
+        except WebDriverException as e:
+            ERROR.logger.error(f"Failed to reset the network control, error message: {str(e)}")
+
+    def _build_wait(self, timeout: Optional[float] = None) -> WebDriverWait:
+        """
+        :param timeout: Wait timeout (seconds), defaults to the shared wait object.
+        :return: WebDriverWait object whose timeout does not exceed the current time budget.
+        :raise DeadlineExceeded: If the time budget is already used up.
+        """
+        if timeout is None and current_deadline() is None:
+            return self._wait
+        timeout = cap_timeout(self._timeout if timeout is None else timeout, 'wait')
+        return TimedWebDriverWait(self.driver, timeout, poll_frequency=self._poll_frequency)
+
+    def _locate(self, locator: Tuple[str, str], timeout: Optional[float] = None) -> CustomWebElement:
+        """
+        Locate an element, reusing the cached handle while the DOM token of the page is unchanged.
+        The returned element locates itself again if it goes stale.
+
+        :param locator: Resolved locator.
+        :param timeout: Wait timeout (seconds) of a fresh lookup.
+        :return: CustomWebElement object.
+        """
+        cache = self._element_cache
+        element_id = cache.get(locator) if cache is not None else None
+        if element_id is None:
+            element_id = self._build_wait(timeout).until(EC.presence_of_element_located(locator)).id
+            if cache is not None:
+                cache.put(locator, element_id)
+        return CustomWebElement(self.driver, element_id, resolver=lambda: self._locate(locator, timeout).id)
+
+    @staticmethod
+    def time_budget(seconds: float, label: str = 'step'):
+        """
+        Limit the total time of a step. Every wait, retry, sleep, download and WebDriver command inside
+        the step only gets the remaining budget, and DeadlineExceeded is raised once it is used up.
+        A step budget never extends the budget of the test.
+
+        :param seconds: Time budget (seconds).
+        :param label: Step name, used in error messages.
+        :Usage:
+            with self.time_budget(30, 'login'):
+                self.login()
+        """
+        return time_budget(seconds, label)
+
     def _clean_screenshots(self):
         """ Clean up the screenshot file. """
         if not os.path.exists(self.screenshots_path):
@@ -67,7 +196,7 @@ class BaseCase:
             INFO.logger.info("Screenshot files cleanup completed.")
 
     def _clean_downloads(self):
-        """ Clean up the download file. """
+        """ Clean up the download folder of the current test. """
         if not os.path.exists(self.downloads_path):
             os.makedirs(self.downloads_path, exist_ok=True)
             INFO.logger.info(f"Download directory created: {self.downloads_path}")
@@ -107,6 +236,7 @@ class BaseCase:
             except Exception as e:
                 ERROR.logger.error(f"Error occurred while cleaning log directory: {str(e)}")
 
+    @timed_action
     def take_screenshot(self, name: str) -> Union[str, None]:
         """
         Take a screenshot of the current screen.
@@ -117,12 +247,15 @@ class BaseCase:
             self.take_screenshot("screenshot_name")
         """
         try:
-            # Wait for the page to load.
-            # document.readyState: A property indicating the loading state of the document. It has the following possible values:
-            # "loading": Document still loading.
-            # "interactive": The document has finished loading, the document has been parsed, but Sub-resources such as images, stylesheets, and frames are still loading.
-            # "complete": The document and all Sub-resources are fully loaded.
-            self._wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+            # Wait briefly for the page to settle: document loaded, no pending requests, no DOM changes.
+            # document.readyState alone is "complete" long before the XHRs of an SPA page finish.
+            # Skip the wait if the time budget is used up, and capture a busy page anyway.
+            deadline = current_deadline()
+            if deadline is None or not deadline.expired:
+                try:
+                    self._build_wait(self._screenshot_idle_timeout).until(page_is_idle(200))
+                except TimeoutException:
+                    pass
 
             # Ensure the directory exists.
             screenshots_dir = os.path.join(root_path(), 'datas', 'screenshots')
@@ -143,6 +276,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to take screenshot: {str(e)}")
             return None
 
+    @timed_action
     def open(self, url: str) -> None:
         """
         Open the specified web page URL.
@@ -167,10 +301,13 @@ class BaseCase:
             self.take_screenshot("open_url_unknown_exception")
             raise
 
+    @timed_action
     def click(self, selector: str = None, by: str = 'css_selector', delay: int = 0,
               pos: Tuple[int, int] = None) -> None:
         """
         Click the specified element or position.
+        Failures are classified (stale, intercepted, not visible, absent, driver dead) and retried
+        according to the retry policy, failures that retrying cannot fix are raised immediately.
 
         :param selector: Element selector.
         :param by: Locator method.
@@ -183,7 +320,7 @@ class BaseCase:
         if pos:
             try:
                 if delay > 0:
-                    time.sleep(delay)  # Wait only if explicitly requested.
+                    self.sleep(delay)  # Wait only if explicitly requested.
 
                 # Use JavaScript to click to specify the position.
                 self.driver.execute_script(f"window.scrollTo({pos[0]}, {pos[1]});")
@@ -194,25 +331,23 @@ class BaseCase:
                 self.take_screenshot("click_pos_error")
                 raise
         else:
-            max_attempts = 3  # Maximum number of retries.
-            attempt = 0
+            retry_state = self._retry_policy.start()
+            timeout = self._timeout
             last_exception = None
 
-            while attempt < max_attempts:
+            while True:
+                stage = 'presence'
                 try:
-                    # Wait for the page to load.
-                    script = (
-                        "return (typeof jQuery !== 'undefined') ? "
-                        "jQuery.active == 0 : true"
-                    )
-                    self.driver.execute_script(script)
-
                     locator = SelectorUtil.get_selenium_locator(selector, by)
 
-                    # Wait for the element to appear.
-                    self._wait.until(EC.presence_of_element_located(locator))
-                    self._wait.until(EC.visibility_of_element_located(locator))
-                    element = self._wait.until(EC.element_to_be_clickable(locator))
+                    # Wait for the element to appear, then for the same element to be visible and enabled,
+                    # both within the timeout of this attempt.
+                    started = time.monotonic()
+                    element = self._locate(locator, timeout)
+                    stage = 'clickable'
+                    remaining = max(timeout - (time.monotonic() - started), self._poll_frequency)
+                    element = self._build_wait(remaining).until(EC.element_to_be_clickable(element))
+                    stage = 'click'
 
                     # Scroll to the element.
                     self.driver.execute_script(
@@ -221,7 +356,7 @@ class BaseCase:
                     )
 
                     if delay > 0:
-                        time.sleep(delay)  # Wait only if explicitly requested.
+                        self.sleep(delay)  # Wait only if explicitly requested.
 
                     # Click the element.
                     try:
@@ -233,14 +368,23 @@ class BaseCase:
                     INFO.logger.info(f"Successfully clicked element: {selector} (by={by}).")
                     return
 
-                except TimeoutException as e:
-                    last_exception = e
-                    attempt += 1
-                    continue
                 except Exception as e:
                     last_exception = e
-                    attempt += 1
-                    continue
+                    kind = classify_failure(e, stage)
+                    backoff = retry_state.next_delay(kind)
+                    deadline = current_deadline()
+                    if backoff is not None and deadline is not None and deadline.remaining() <= backoff:
+                        backoff = None  # Not enough budget left for another attempt.
+                    if backoff is None:
+                        ERROR.logger.error(f"Giving up clicking element: {selector} (by={by}), "
+                                           f"failure: {kind.value}, retries: {retry_state.total}.")
+                        break
+                    action_metrics.add_retry()
+                    INFO.logger.info(f"Retrying to click element: {selector} (by={by}), failure: {kind.value}, "
+                                     f"backoff: {backoff}s.")
+                    if backoff > 0:
+                        sleep_auditor.sleep(backoff)  # Recorded, and never beyond the time budget.
+                    timeout = retry_state.wait_timeout(kind) or self._timeout
 
             # If the maximum number of retries is reached, an exception is thrown.
             ERROR.logger.error(f"Failed to click element: {selector} (by={by}), error message: {str(last_exception)}")
@@ -255,6 +399,7 @@ class BaseCase:
 
             raise last_exception
 
+    @timed_action
     def type(self, selector: str, text: str, by: str = 'css_selector', timeout: int = None,
              retry: bool = False) -> None:
         """
@@ -277,6 +422,7 @@ class BaseCase:
             ERROR.logger.error(f"Timeout when entering text: {text} into the element: {selector} (by={by}).")
             self.take_screenshot("type_timeout")
             if retry:
+                action_metrics.add_retry()
                 self.type(selector, text, by, timeout, retry=False)
             else:
                 raise
@@ -286,6 +432,7 @@ class BaseCase:
             self.take_screenshot("type_error")
             raise
 
+    @timed_action
     def is_element_present(self, selector: str, by: str = 'css_selector') -> bool:
         """
         Check if the element exists.
@@ -307,17 +454,123 @@ class BaseCase:
             ERROR.logger.error(f"Failed to find element: {selector} (by={by}), error message: {str(e)}")
             return False
 
-    @staticmethod
-    def sleep(seconds: float = 0.1) -> None:
+    def _wait_idle(self, condition: page_is_idle, timeout: Optional[float] = None) -> None:
+        """
+        :param condition: Idle condition.
+        :param timeout: Timeout (seconds), defaults to the WebDriver timeout.
+        :raise TimeoutException: If the page does not become idle in time.
+        """
+        TimedWebDriverWait(
+            self.driver,
+            cap_timeout(self._timeout if timeout is None else timeout, 'wait_for_idle'),
+            poll_frequency=min(self._poll_frequency, max(condition.quiet_ms / 2000, 0.05))
+        ).until(condition)
+
+    @timed_action
+    def block_urls(self, patterns: List[str]) -> None:
+        """
+        Block the requests matching the URL patterns, e.g.: static assets and analytics.
+
+        :param patterns: URL patterns, '*' is a wildcard.
+        :Usage:
+            self.block_urls(["*.png", "*.woff2"])
         """
-        Pause for a specified number of seconds.
+        try:
+            self.network.block(patterns)
+            INFO.logger.info(f"Successfully blocked URLs: {patterns}.")
+        except (NotImplementedError, WebDriverException) as e:
+            ERROR.logger.error(f"Failed to block URLs: {patterns}, error message: {str(e)}")
+            raise
+
+    @timed_action
+    def throttle_network(self, latency_ms: float = 0, download_kbps: Optional[float] = None,
+                         upload_kbps: Optional[float] = None, offline: bool = False) -> None:
+        """
+        Shape the network latency and throughput.
+
+        :param latency_ms: Added round-trip latency (milliseconds).
+        :param download_kbps: Download throughput (kbit/s), None for unlimited.
+        :param upload_kbps: Upload throughput (kbit/s), None for unlimited.
+        :param offline: Simulate a lost connection.
+        :Usage:
+            self.throttle_network(latency_ms=300, download_kbps=1600)
+        """
+        try:
+            self.network.shape(latency_ms, download_kbps, upload_kbps, offline)
+            INFO.logger.info(f"Successfully throttled the network: latency {latency_ms}ms, "
+                             f"download {download_kbps}kbps, upload {upload_kbps}kbps, offline {offline}.")
+        except (NotImplementedError, WebDriverException) as e:
+            ERROR.logger.error(f"Failed to throttle the network, error message: {str(e)}")
+            raise
+
+    @timed_action
+    def replay_har(self, har_file: str) -> None:
+        """
+        Serve the fetch/XHR responses recorded in a HAR file instead of the backend.
+
+        :param har_file: HAR file path, relative paths are resolved against 'har_dir'.
+        :Usage:
+            self.replay_har("login.har")
+        """
+        file_path = har_file if os.path.isabs(har_file) else os.path.join(self.har_path, har_file)
+        try:
+            count = self.network.replay(file_path)
+            INFO.logger.info(f"Replaying {count} recorded responses from: {file_path}.")
+        except (NotImplementedError, OSError, WebDriverException) as e:
+            ERROR.logger.error(f"Failed to replay the HAR file: {file_path}, error message: {str(e)}")
+            raise
+
+    @timed_action
+    def wait_for_idle(self, quiet_ms: Optional[int] = None, timeout: Optional[float] = None,
+                      strict: bool = False) -> bool:
+        """
+        Wait until the page is idle: document loaded, no pending fetch/XHR/jQuery request,
+        and no network activity or DOM change for quiet_ms. Use it instead of fixed sleeps.
+        Pages that never go quiet (clocks, carousels, long polling) only log a warning unless strict.
+
+        :param quiet_ms: Quiet period (milliseconds), defaults to 'idle_quiet_ms'.
+        :param timeout: Timeout (seconds).
+        :param strict: Raise TimeoutException if the page does not become idle in time.
+        :return: Whether the page became idle.
+        :Usage:
+            self.click("#search")
+            self.wait_for_idle()
+        """
+        quiet_ms = self._idle_quiet_ms if quiet_ms is None else quiet_ms
+        condition = page_is_idle(quiet_ms)
+        try:
+            self._wait_idle(condition, timeout)
+        except DeadlineExceeded:
+            raise
+        except TimeoutException:
+            message = (f"Timeout when waiting for the page to be idle, "
+                       f"last state (readyState, pending requests, quiet ms): {condition.last_state}.")
+            if strict:
+                ERROR.logger.error(message)
+                raise
+            WARNING.logger.warning(message)
+            return False
+        INFO.logger.info(f"The page is idle (quiet for {quiet_ms}ms).")
+        return True
+
+    @_static_or_bound
+    def sleep(self: Optional['BaseCase'], seconds: float = 0.1) -> None:
+        """
+        Pause for a specified number of seconds, never beyond the current time budget.
+        Every sleep is recorded by the sleep auditor. With 'sleep_mode' set to 'idle',
+        the pause ends as soon as the page is idle. It can still be called on the class like the former
+        staticmethod, e.g.: BaseCase.sleep(1), such calls always sleep the full time.
 
         :param seconds: Pause time (seconds).
         :Usage:
             self.sleep(5)
         """
-        time.sleep(seconds)
+        if self is None:
+            sleep_auditor.sleep(seconds)
+            return
+        sleep_auditor.sleep(seconds, lambda timeout: self._wait_idle(page_is_idle(self._idle_quiet_ms), timeout))
 
+    @timed_action
     def start_app(self, app_package: str) -> None:
         """
         Start the App.
@@ -336,6 +589,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to start the App: {app_package}, error message: {str(e)}")
             raise
 
+    @timed_action
     def close_app(self, app_package: str) -> None:
         """
         Close the App.
@@ -380,6 +634,7 @@ class BaseCase:
             return self.driver.current_activity
         raise NotImplementedError("The Web end does not support the 'current_activity' method!")
 
+    @timed_action
     def install_app(self, app_path: str) -> None:
         """
         Install the App.
@@ -398,6 +653,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to install the App: {app_path}, error message: {str(e)}")
             raise
 
+    @timed_action
     def uninstall_app(self, app_package: str) -> None:
         """
         Uninstall the App.
@@ -416,6 +672,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to uninstall the App: {app_package}, error message: {str(e)}")
             raise
 
+    @timed_action
     def is_app_installed(self, app_package: str) -> bool:
         """
         Check if the App is installed.
@@ -433,6 +690,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to check if the App is installed: {app_package}, error message: {str(e)}")
             raise
 
+    @timed_action
     def background_app(self, seconds: int) -> None:
         """
         Put the App in the background.
@@ -479,6 +737,7 @@ class BaseCase:
             return self.driver.network_connection
         raise NotImplementedError("The Web end does not support the 'get_network_connect' method!")
 
+    @timed_action
     def set_network_connect(self, connect_type: int) -> None:
         """
         Set the mobile network connection type.
@@ -497,6 +756,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to set the network connection type: {connect_type}, error message: {str(e)}")
             raise
 
+    @timed_action
     def press_keycode(self, keycode: int, metastate: Optional[int] = None, flags: Optional[int] = None) -> Self:
         """
         Sends a keycode to the device. Android only.
@@ -554,6 +814,7 @@ class BaseCase:
             raise
         return self
 
+    @timed_action
     def open_notify(self) -> Self:
         """
         Open notification shade in Android.
@@ -586,6 +847,7 @@ class BaseCase:
             return self.driver.contexts
         raise NotImplementedError("The Web end does not support the 'contexts' method!")
 
+    @timed_action
     def switch_to_context(self, context_name: str) -> Self:
         """
         Sets the context for the current session.
@@ -597,6 +859,8 @@ class BaseCase:
         try:
             if isinstance(self.driver, AppDriver):
                 self.driver.switch_to.context(context_name)
+                if self._element_cache is not None:
+                    self._element_cache.clear()
                 INFO.logger.info(f"Successfully switched to the context: {context_name}.")
             else:
                 raise NotImplementedError("The Web end does not support the 'switch_to_context' method!")
@@ -605,6 +869,7 @@ class BaseCase:
             raise
         return self
 
+    @timed_action
     def find_element(self, selector: str, by: str = 'css_selector', timeout: Optional[int] = None) -> CustomWebElement:
         """
         Find a single element.
@@ -616,19 +881,11 @@ class BaseCase:
         :Usage:
             element = self.find_element("#element_id")
         """
-        temp_wait = self._wait if timeout is None else WebDriverWait(
-            self.driver,
-            timeout,
-            poll_frequency=self._poll_frequency
-        )
-
         try:
             locator = SelectorUtil.get_selenium_locator(selector, by)
-            element = temp_wait.until(
-                EC.presence_of_element_located(locator)
-            )
+            element = self._locate(locator, timeout)
             INFO.logger.info(f"Successfully found the element: {selector} (by={by}).")
-            return CustomWebElement(self.driver, element.id)
+            return element
         except TimeoutException:
             ERROR.logger.error(f"Timeout when finding the element: {selector} (by={by}).")
             self.take_screenshot("find_element_timeout")
@@ -638,6 +895,7 @@ class BaseCase:
             self.take_screenshot("find_element_error")
             raise
 
+    @timed_action
     def find_elements(self, selector: str, by: str = 'css_selector', timeout: Optional[int] = None) -> List[WebElement]:
         """
         Find multiple elements.
@@ -649,11 +907,7 @@ class BaseCase:
         :Usage:
             elements = self.find_elements(".element_class")
         """
-        temp_wait = self._wait if timeout is None else WebDriverWait(
-            self.driver,
-            timeout,
-            poll_frequency=self._poll_frequency
-        )
+        temp_wait = self._build_wait(timeout)
 
         try:
             locator = SelectorUtil.get_selenium_locator(selector, by)
@@ -683,6 +937,7 @@ class BaseCase:
         """
         pass
 
+    @timed_action
     def download_image(self, element: WebElement, save_name: str, save_path: Optional[str] = None) -> Union[str, None]:
         """
         Download the image of the web page.
@@ -700,42 +955,129 @@ class BaseCase:
             if save_path is None:
                 save_path = self.downloads_path
 
-            os.makedirs(save_path, exist_ok=True)
-
             # Wait for the image element to load completely.
-            self._wait.until(EC.visibility_of(element))
+            self._build_wait().until(EC.visibility_of(element))
 
-            # Get the src attribute of the image.
+            # Get the src attribute of the image, base64 data URIs are decoded, other images are
+            # fetched with the cookies of the browser session.
             image_src = element.get_attribute("src")
-
-            if image_src.startswith("data:image"):
-                # Handling base64 encoded images.
-                header, encoded = image_src.split(",", 1)
-                image_data = base64.b64decode(encoded)
-                file_path = os.path.join(save_path, f"{save_name}")
-                with open(file_path, "wb") as file:
-                    file.write(image_data)
-                INFO.logger.info(f"Succeeded in downloading the base64 image: {file_path}.")
-            else:
-                # Handling normal images.
-                response = requests.get(image_src, stream=True)
-                if response.status_code == 200:
-                    file_path = os.path.join(save_path, f"{save_name}")
-                    with open(file_path, 'wb') as file:
-                        for chunk in response.iter_content(1024):
-                            file.write(chunk)
-                    INFO.logger.info(f"Succeeded in downloading the normal image: {file_path}.")
-                else:
-                    ERROR.logger.error(
-                        f"Failed to download the image: {image_src}, status code: {response.status_code}.")
-                    file_path = None
-
+            file_path = self.downloads.download(image_src, os.path.join(save_path, save_name))
+            INFO.logger.info(f"Succeeded in downloading the image: {file_path}.")
             return file_path
 
         except Exception as e:
             ERROR.logger.error(f"An unknown exception occurred when downloading the image: {str(e)}")
             return None
 
+    @timed_action
+    def element_image(self, element: WebElement) -> np.ndarray:
+        """
+        Capture the image of an element in memory, without writing it to disk.
+        Images with a data URI source are decoded directly, other elements from their screenshot.
+
+        :param element: WebElement object.
+        :return: Image array (BGR).
+        :Usage:
+            captcha = self.element_image(self.find_element("img"))
+            text_positions = TextCaptcha().recognize_text(captcha)
+        """
+        try:
+            self._build_wait().until(EC.visibility_of(element))
+            src = element.get_attribute("src")
+            if src and src.startswith("data:image"):
+                image = decode_data_uri(src)
+            else:
+                image = decode_image(element.screenshot_as_png)
+            INFO.logger.info(f"Successfully captured the element image: {image.shape[1]}x{image.shape[0]}.")
+            return image
+        except Exception as e:
+            ERROR.logger.error(f"Failed to capture the element image, error message: {str(e)}")
+            self.take_screenshot("element_image_error")
+            raise
+
+    @timed_action
+    def solve_captcha(self, kind: str, element: WebElement, timeout: Optional[float] = None, wait: bool = True,
+                      **kwargs) -> Union[SolveResult, CaptchaTask]:
+        """
+        Function: Solve a captcha with the registered solvers of its kind, falling back in registration order.
+        Scenario: Applicable to login and form flows guarded by a captcha.
+        e.g. 'Text click captcha', 'Slider captcha', 'Image tile captcha', 'Arithmetic question'.
+
+        The captcha is captured in this thread, the answer computed in the solver pool and applied in this thread.
+
+        :param kind: Captcha kind: 'text', 'slider', 'image', 'faq' or 'behavior'.
+        :param element: The captcha element.
+        :param timeout: Compute timeout of each solver (seconds), defaults to 'captcha_solve_timeout'.
+        :param wait: False to return the pending task at once, its result() applies the answer.
+        :param kwargs: Solver arguments, e.g. prompt, targets, handle, piece, target, input.
+        :return: The solve result, or the pending task when wait is False.
+        :Usage:
+            self.solve_captcha('text', self.find_element("img.captcha"), prompt=self.get_text(".tip"))
+            self.solve_captcha('slider', self.find_element(".bg"), handle=self.find_element(".handle"),
+                               piece=self.find_element(".piece"))
+            task = self.solve_captcha('faq', self.find_element(".question"), wait=False, input=answer_box)
+            self.type("#username", "admin")
+            task.result()
+        """
+        try:
+            task = CaptchaTask(kind, self, element, timeout, **kwargs)
+            if not wait:
+                return task
+            result = task.result()
+            INFO.logger.info(f"Successfully solved the '{kind}' captcha with '{result.solver}' "
+                             f"in {result.elapsed:.2f}s.")
+            return result
+        except Exception as e:
+            ERROR.logger.error(f"Failed to solve the '{kind}' captcha, error message: {str(e)}")
+            self.take_screenshot("captcha_error")
+            raise
+
+    @timed_action
+    def download_files(self, urls: List[str], save_path: Optional[str] = None) -> List[Union[str, None]]:
+        """
+        Download resources of the page concurrently, with the cookies of the browser session.
+
+        :param urls: Resource URLs.
+        :param save_path: Save path. Defaults to 'downloads_path'.
+        :return: File paths in the order of the URLs, None for failed downloads.
+        :Usage:
+            paths = self.download_files([img.get_attribute("src") for img in self.find_elements("img")])
+        """
+        save_path = save_path or self.downloads_path
+        items = [(url, os.path.join(save_path, name)) for url, name in zip(urls, unique_file_names(urls))]
+        results = self.downloads.download_many(items)
+        paths = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                ERROR.logger.error(f"Failed to download: {url}, error message: {str(result)}")
+                paths.append(None)
+            else:
+                paths.append(result)
+        INFO.logger.info(f"Downloaded {sum(p is not None for p in paths)}/{len(urls)} files to: {save_path}.")
+        return paths
+
+    @timed_action
+    def wait_for_download(self, pattern: str = '*', timeout: Optional[float] = None) -> str:
+        """
+        Wait until the browser finished downloading a new file into the download folder of the test.
+
+        :param pattern: File name pattern, e.g.: '*.xlsx'.
+        :param timeout: Timeout (seconds), defaults to 'download_timeout'.
+        :return: File path.
+        :Usage:
+            self.click("#export")
+            report = self.wait_for_download("*.xlsx")
+        """
+        try:
+            file_path = self.downloads.wait_for_download(pattern, timeout)
+            INFO.logger.info(f"Download completed: {file_path}.")
+            return file_path
+        except TimeoutException:
+            ERROR.logger.error(f"Timeout when waiting for a download matching: {pattern}.")
+            self.take_screenshot("wait_for_download_timeout")
+            raise
+
+    @timed_action
     def get_window_size(self, windowHandle: str = "current") -> dict:
         """
         Gets the width and height of the current window.
@@ -754,6 +1096,7 @@ class BaseCase:
             ERROR.logger.error(f"Failed to get the window size: {str(e)}")
             raise
 
+    @timed_action
     def get_element_attribute(self, element: WebElement, attribute: str) -> str | None:
         """
         Get the value of the specified attribute of the element.
@@ -773,6 +1116,7 @@ class BaseCase:
             self.take_screenshot("get_element_attribute_error")
             raise
 
+    @timed_action
     def refresh(self) -> None:
         """
         Refreshes the current page.
@@ -788,6 +1132,7 @@ class BaseCase:
             self.take_screenshot("refresh_error")
             raise
 
+    @timed_action
     def back(self) -> None:
         """
         Returns to the previous page in the browser history.
@@ -803,6 +1148,7 @@ class BaseCase:
             self.take_screenshot("back_error")
             raise
 
+    @timed_action
     def forward(self) -> None:
         """
         Forward to the next page in the browser history.
@@ -818,6 +1164,7 @@ class BaseCase:
             self.take_screenshot("forward_error")
             raise
 
+    @timed_action
     def close(self) -> None:
         """
         Closes the current window.
@@ -833,6 +1180,7 @@ class BaseCase:
             self.take_screenshot("close_error")
             raise
 
+    @timed_action
     def quit(self) -> None:
         """
         Quits the driver and closes all windows.
@@ -848,6 +1196,7 @@ class BaseCase:
             self.take_screenshot("quit_error")
             raise
 
+    @timed_action
     def maximize_window(self) -> None:
         """
         Maximizes the current window.
@@ -863,6 +1212,7 @@ class BaseCase:
             self.take_screenshot("maximize_window_error")
             raise
 
+    @timed_action
     def minimize_window(self) -> None:
         """
         Minimizes the current window.
@@ -878,6 +1228,7 @@ class BaseCase:
             self.take_screenshot("minimize_window_error")
             raise
 
+    @timed_action
     def switch_to_frame(self, frame: Union[str, int, WebElement]) -> None:
         """
         Switches focus to the specified frame, by index, name, or WebElement.
@@ -896,6 +1247,7 @@ class BaseCase:
             self.take_screenshot("switch_to_frame_error")
             raise
 
+    @timed_action
     def switch_to_default_frame(self) -> None:
         """
         Switches focus to the default frame.
@@ -911,6 +1263,7 @@ class BaseCase:
             self.take_screenshot("switch_to_default_frame_error")
             raise
 
+    @timed_action
     def execute_script(self, script: str, *args) -> Any:
         """
         Synchronously Executes JavaScript in the current window/frame.
@@ -930,6 +1283,7 @@ class BaseCase:
             self.take_screenshot("execute_script_error")
             raise
 
+    @timed_action
     def scroll_to(self, x_offset: Optional[int] = None, y_offset: Optional[int] = None,
                   element: Optional[WebElement] = None) -> None:
         """
@@ -961,6 +1315,7 @@ class BaseCase:
             self.take_screenshot("scroll_error")
             raise
 
+    @timed_action
     def scroll_to_top(self) -> None:
         """
         Scroll to the top of the page.
@@ -977,6 +1332,7 @@ class BaseCase:
             self.take_screenshot("scroll_to_top_error")
             raise
 
+    @timed_action
     def scroll_to_bottom(self) -> None:
         """
         Scroll to the bottom of the page.
@@ -1063,6 +1419,7 @@ class BaseCase:
             self.take_screenshot("current_page_code_error")
             raise
 
+    @timed_action
     def tap(self, pos: List[Tuple[int, int]], duration: Optional[int] = None) -> Self:
         """
         Function: Simulates a click operation at the specified coordinates. (App only)
@@ -1088,6 +1445,7 @@ class BaseCase:
             raise
         return self
 
+    @timed_action
     def drag_and_drop(self, start_element: WebElement, end_element: WebElement, pause: Optional[float] = None) -> Self:
         """
         Function: Drag the origin element to the destination element. (App only)
@@ -1112,6 +1470,34 @@ class BaseCase:
             raise
         return self
 
+    @timed_action
+    def drag_by_offset(self, element: WebElement, x_offset: float, y_offset: float = 0, duration: float = 0.8,
+                       human: bool = True) -> Self:
+        """
+        Function: Drag the element by an offset along a precomputed trajectory, sent as one W3C Actions request.
+        Scenario: Applicable to scenarios where the drag path or speed matters.
+        e.g. 'Slider captcha', sortable lists.
+
+        :param element: The element to drag, pressed at its center.
+        :param x_offset: Horizontal offset (CSS pixels).
+        :param y_offset: Vertical offset (CSS pixels).
+        :param duration: Duration of the drag (seconds).
+        :param human: Curved path with jitter, False for a straight path with the same easing.
+        :return: Self instance.
+        :Usage:
+            self.drag_by_offset(self.find_element(".slider-handle"), 180)
+        """
+        try:
+            options = {} if human else {'curvature': 0, 'jitter': 0}
+            trajectory = generate_trajectory(x_offset, y_offset, duration, **options)
+            compile_actions(self.driver, element, trajectory, touch=isinstance(self.driver, AppDriver)).perform()
+            INFO.logger.info(f"Successfully dragged the element by ({x_offset}, {y_offset}) in {duration}s.")
+        except WebDriverException as e:
+            ERROR.logger.error(f"Failed to drag the element by ({x_offset}, {y_offset}), error message: {e}")
+            raise
+        return self
+
+    @timed_action
     def scroll(self, start_element: WebElement, end_element: WebElement, duration: Optional[int] = None) -> Self:
         """
         Function: Scrolls from one element to another. (App only)
@@ -1136,6 +1522,7 @@ class BaseCase:
             raise
         return self
 
+    @timed_action
     def swipe(self, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = None) -> Self:
         """
         Function: Slowly slide the screen from one point to another. (App only)
@@ -1163,6 +1550,7 @@ class BaseCase:
             raise
         return self
 
+    @timed_action
     def flick(self, start_x: int, start_y: int, end_x: int, end_y: int) -> Self:
         """
         Function: Quickly flick the screen from one point to another. (App only)
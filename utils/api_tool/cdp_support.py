@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 9:00 AM
+@ Author      : Poco Ray
+@ File        : cdp_support.py
+@ Description : Chrome DevTools support check of a WebDriver session.
+"""
+from appium.webdriver.webdriver import WebDriver as AppDriver
+
+# 'browserName' capabilities of the Chromium-based browsers, compared in lower case.
+CDP_BROWSERS = ('chrome', 'chromium', 'chrome-headless-shell', 'msedge', 'microsoftedge')
+
+
+def supports_cdp(driver) -> bool:
+    """
+    Selenium defines execute_cdp_cmd on every remote driver, Appium drivers included, but only Chromium
+    browsers accept the command, and sessions without a 'browserName' capability fail with KeyError.
+
+    :param driver: WebDriver object.
+    :return: Whether the driver is a Chromium web session that accepts Chrome DevTools commands.
+    """
+    if isinstance(driver, AppDriver) or not hasattr(driver, 'execute_cdp_cmd'):
+        return False
+    browser_name = (getattr(driver, 'caps', None) or {}).get('browserName') or ''
+    return str(browser_name).lower() in CDP_BROWSERS
@@ -7,10 +7,41 @@
 @ Description :
 """
 import warnings
+from typing import Callable, Optional
+import numpy as np
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.remote.webelement import WebElement
+from utils.captcha_tool.image_io import decode_image
 
 
 class CustomWebElement(WebElement):
+    def __init__(self, parent, id_, resolver: Optional[Callable[[], str]] = None):
+        """
+        :param parent: WebDriver object.
+        :param id_: Element id.
+        :param resolver: Locates the element again and returns its new id, used when the element went stale.
+        """
+        super().__init__(parent, id_)
+        self._resolver = resolver
+
+    def _execute(self, command, params=None):
+        """
+        执行元素命令, 元素过期时重新定位后重试一次
+        """
+        try:
+            return super()._execute(command, params)
+        except StaleElementReferenceException:
+            if self._resolver is None:
+                raise
+            self._id = self._resolver()
+            return super()._execute(command, params)
+
+    def screenshot_as_array(self) -> np.ndarray:
+        """
+        截图元素并直接解码为图像数组(BGR), 不写入磁盘
+        """
+        return decode_image(self.screenshot_as_png)
+
     def screenshot(self, filename):
         """
         截图元素
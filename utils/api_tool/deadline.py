@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 5:00 PM
+@ Author      : Poco Ray
+@ File        : deadline.py
+@ Description : Time budget shared by every wait, retry, sleep, download and WebDriver command of a test or step.
+"""
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+from selenium.common.exceptions import TimeoutException
+
+
+class DeadlineExceeded(TimeoutException):
+    """ The time budget of the test or step is used up. """
+
+
+class Deadline:
+    """ Absolute point in time before which an operation must finish. """
+
+    def __init__(self, seconds: float, label: str = 'test'):
+        """
+        :param seconds: Time budget (seconds).
+        :param label: Name of the budget owner, used in error messages.
+        """
+        self.seconds = seconds
+        self.label = label
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """ :return: Remaining time (seconds), never negative. """
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, action: str = '') -> None:
+        """
+        :param action: Action about to run, used in the error message.
+        :raise DeadlineExceeded: If the budget is used up.
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"Time budget of the {self.label} ({self.seconds}s) is used up"
+                                   + (f" before: {action}." if action else "."))
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('uiatf_deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """ :return: The innermost active deadline, or None. """
+    return _current_deadline.get()
+
+
+@contextmanager
+def time_budget(seconds: Optional[float], label: str = 'step') -> Iterator[Optional[Deadline]]:
+    """
+    Run a block under a time budget. A nested budget never extends the enclosing one.
+
+    :param seconds: Time budget (seconds), None for no additional limit.
+    :param label: Name of the budget owner.
+    :Usage:
+        with time_budget(30, 'login'):
+            self.login()
+    """
+    parent = _current_deadline.get()
+    if seconds is None:
+        yield parent
+        return
+    deadline = Deadline(seconds, label)
+    if parent is not None and parent.expires_at < deadline.expires_at:
+        deadline = parent
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def cap_timeout(timeout: Optional[float], action: str = '') -> Optional[float]:
+    """
+    Shrink a timeout to the remaining budget.
+
+    :param timeout: Requested timeout (seconds), None for no timeout.
+    :param action: Action about to run, used in the error message.
+    :return: Timeout that does not exceed the deadline.
+    :raise DeadlineExceeded: If the budget is already used up.
+    """
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    deadline.check(action)
+    remaining = deadline.remaining()
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def bound_commands(driver: Any) -> None:
+    """
+    Bound every WebDriver command by the remaining time budget. The HTTP timeout of the command executor
+    is shrunk to the budget for the command, so a hung 'get' or 'execute_script' fails with DeadlineExceeded
+    instead of running until the client timeout. It is safe to call repeatedly.
+
+    :param driver: WebDriver or AppDriver object.
+    :Usage:
+        bound_commands(self.driver)
+    """
+    executor = getattr(driver, 'command_executor', None)
+    client_config = getattr(executor, 'client_config', None)
+    if client_config is None or getattr(executor, '_uiatf_bounded', False):
+        return
+    execute = executor.execute
+
+    @functools.wraps(execute)
+    def bounded_execute(command, params=None):
+        deadline = _current_deadline.get()
+        if deadline is None:
+            return execute(command, params)
+        deadline.check(command)
+        default_timeout = client_config.timeout
+        remaining = deadline.remaining()
+        client_config.timeout = remaining if default_timeout is None else min(default_timeout, remaining)
+        try:
+            return execute(command, params)
+        except Exception as e:
+            if deadline.expired and not isinstance(e, DeadlineExceeded):
+                raise DeadlineExceeded(f"Time budget of the {deadline.label} ({deadline.seconds}s) is used up "
+                                       f"during: {command}.") from e
+            raise
+        finally:
+            client_config.timeout = default_timeout
+
+    executor.execute = bounded_execute
+    executor._uiatf_bounded = True
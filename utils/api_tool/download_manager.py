@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 8:00 PM
+@ Author      : Poco Ray
+@ File        : download_manager.py
+@ Description : Pooled, cookie-aware downloads and browser download tracking for a test.
+"""
+import base64
+import fnmatch
+import mimetypes
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import unquote, unquote_to_bytes, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from utils.api_tool.cdp_support import supports_cdp
+from utils.api_tool.deadline import cap_timeout
+
+# Suffixes of files that the browser is still writing.
+_PARTIAL_SUFFIXES = ('.crdownload', '.part', '.tmp', '.download')
+
+
+def download_dir_for(downloads_dir: str, test_id: Optional[str], worker: str = 'master') -> str:
+    """
+    :param downloads_dir: Root download directory.
+    :param test_id: Test node id, None outside of a test.
+    :param worker: xdist worker id.
+    :return: Download directory of the test, e.g.: 'downloads/gw0/tests_test_web_test_web_login.py__test_web_login'.
+    """
+    name = re.sub(r'[^\w.\-]+', '_', test_id.replace('::', '__')) if test_id else 'session'
+    return os.path.join(downloads_dir, worker, name)
+
+
+def unique_file_names(urls: Iterable[str], max_length: int = 120) -> List[str]:
+    """
+    File names of the URLs, unique within the list, so that concurrent downloads never share a file.
+    Repeated names get the index of the URL as a suffix, data URIs get a generated name with the
+    extension of their MIME type.
+
+    :param urls: Resource URLs, http(s) or data URI.
+    :param max_length: Maximum length of a file name stem.
+    :return: File names in the order of the URLs, e.g.: ['report.xlsx', 'report_1.xlsx', 'file_2.png'].
+    """
+    names, used = [], set()
+    for i, url in enumerate(urls):
+        if url.startswith('data:'):
+            mime = url[len('data:'):].split(',', 1)[0].split(';', 1)[0]
+            stem, ext = f"file_{i}", mimetypes.guess_extension(mime or 'text/plain') or ''
+        else:
+            name = re.sub(r'[^\w.\-]+', '_', os.path.basename(unquote(urlsplit(url).path)))
+            stem, ext = os.path.splitext(name.strip('.') or f"file_{i}")
+        stem = stem[:max_length]
+        name, suffix = f"{stem}{ext}", i
+        while name.lower() in used:  # Lower case, case-insensitive file systems would still share the file.
+            name, suffix = f"{stem}_{suffix}{ext}", suffix + 1
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+class DownloadManager:
+    """
+    Downloads resources of the page with a pooled requests.Session that carries the browser cookies,
+    and waits for files downloaded by the browser itself.
+
+    :Usage:
+        manager = DownloadManager(driver, "datas/downloads/gw0/test_a")
+        path = manager.download("https://example.com/a.png", "a.png")
+        paths = manager.download_many([(url_a, "a.png"), (url_b, "b.png")])
+        manager.enable_browser_downloads()
+        path = manager.wait_for_download("*.xlsx", timeout=30)
+    """
+
+    def __init__(self, driver, download_dir: str, timeout: float = 30, chunk_size: int = 1024 * 1024,
+                 max_workers: int = 4):
+        """
+        :param driver: WebDriver object, its cookies are sent with every download.
+        :param download_dir: Directory of the downloaded files.
+        :param timeout: Connect and read timeout of a download (seconds), capped by the time budget.
+        :param chunk_size: Bytes written per chunk.
+        :param max_workers: Concurrent downloads, also the connection pool size.
+        """
+        self.driver = driver
+        self.download_dir = download_dir
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._seen: Set[str] = set()
+        os.makedirs(download_dir, exist_ok=True)
+
+    def sync_cookies(self) -> None:
+        """ Copy the cookies and the user agent of the browser session into the requests session. """
+        try:
+            for cookie in self.driver.get_cookies():
+                self.session.cookies.set(cookie['name'], cookie['value'],
+                                         domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+            user_agent = self.driver.execute_script("return navigator.userAgent")
+            if user_agent:
+                self.session.headers['User-Agent'] = user_agent
+        except WebDriverException:
+            pass  # Native app contexts have no cookies.
+
+    def _file_path(self, file_name: str) -> str:
+        return file_name if os.path.isabs(file_name) else os.path.join(self.download_dir, file_name)
+
+    def _fetch(self, url: str, file_path: str, timeout: Optional[float]) -> str:
+        """ Write the resource to a temporary file first, so that a failed download never leaves a partial file. """
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        temp_path = file_path + '.part'
+        if url.startswith('data:'):
+            header, encoded = url.split(',', 1)
+            data = base64.b64decode(encoded) if header.endswith(';base64') else unquote_to_bytes(encoded)
+            with open(temp_path, 'wb') as file:
+                file.write(data)
+        else:
+            with self.session.get(url, stream=True, timeout=timeout) as response:
+                response.raise_for_status()
+                with open(temp_path, 'wb') as file:
+                    for chunk in response.iter_content(self.chunk_size):
+                        file.write(chunk)
+        os.replace(temp_path, file_path)
+        return file_path
+
+    def download(self, url: str, file_name: str) -> str:
+        """
+        :param url: Resource URL, http(s) or data URI.
+        :param file_name: File name in the download directory, or an absolute path.
+        :return: File path.
+        :raise requests.RequestException: If the download fails.
+        """
+        self.sync_cookies()
+        return self._fetch(url, self._file_path(file_name), cap_timeout(self.timeout, 'download'))
+
+    def download_many(self, items: Iterable[Tuple[str, str]]) -> List[Union[str, Exception]]:
+        """
+        Download resources concurrently over the pooled connections.
+
+        :param items: (url, file_name) pairs.
+        :return: File path or the raised exception, in the order of the items.
+        """
+        self.sync_cookies()
+        timeout = cap_timeout(self.timeout, 'download')  # The time budget does not follow into the pool threads.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='download')
+        futures = [self._executor.submit(self._fetch, url, self._file_path(name), timeout) for url, name in items]
+        results: List[Union[str, Exception]] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def enable_browser_downloads(self) -> bool:
+        """
+        Direct the downloads of the browser into the download directory, over Chrome DevTools.
+
+        :return: Whether the browser accepted the download directory.
+        """
+        if not supports_cdp(self.driver):
+            return False
+        params = {'behavior': 'allow', 'downloadPath': os.path.abspath(self.download_dir)}
+        for cmd in ('Browser.setDownloadBehavior', 'Page.setDownloadBehavior'):
+            try:
+                self.driver.execute_cdp_cmd(cmd, params)
+                return True
+            except WebDriverException:
+                continue
+        return False
+
+    def completed_files(self, pattern: str = '*') -> List[str]:
+        """ :return: Completed files matching the pattern that no earlier wait returned, oldest first. """
+        if not os.path.isdir(self.download_dir):
+            return []
+        paths = []
+        for name in os.listdir(self.download_dir):
+            path = os.path.join(self.download_dir, name)
+            if (path not in self._seen and os.path.isfile(path) and not name.endswith(_PARTIAL_SUFFIXES)
+                    and fnmatch.fnmatch(name, pattern)):
+                paths.append(path)
+        return sorted(paths, key=os.path.getmtime)
+
+    def wait_for_download(self, pattern: str = '*', timeout: Optional[float] = None,
+                          poll_frequency: float = 0.2) -> str:
+        """
+        Wait until the browser finished a new download matching the pattern.
+        A file counts as finished once it has no partial suffix and its size stopped changing.
+
+        :param pattern: File name pattern, e.g.: '*.xlsx'.
+        :param timeout: Timeout (seconds), defaults to the download timeout.
+        :param poll_frequency: Poll interval (seconds).
+        :return: File path.
+        :raise TimeoutException: If no download finished in time.
+        """
+        timeout = cap_timeout(self.timeout if timeout is None else timeout, 'wait_for_download')
+        end = time.monotonic() + timeout
+        sizes = {}
+        while True:
+            for path in self.completed_files(pattern):
+                size = os.path.getsize(path)
+                if sizes.get(path) == size:
+                    self._seen.add(path)
+                    return path
+                sizes[path] = size
+            if time.monotonic() >= end:
+                raise TimeoutException(f"No download matching '{pattern}' finished in {timeout:.1f}s.")
+            time.sleep(poll_frequency)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self.session.close()
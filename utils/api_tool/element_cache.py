@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 5:40 PM
+@ Author      : Poco Ray
+@ File        : element_cache.py
+@ Description : Per-page cache of located element handles, invalidated when the DOM changes.
+"""
+from typing import Dict, Optional, Tuple
+from selenium.common.exceptions import WebDriverException
+
+# Installs a MutationObserver on first use and returns the DOM token of the current document:
+# [document id, DOM generation, URL]. The document id changes on every page load or frame switch,
+# the generation is incremented whenever nodes are added or removed, an attribute changes or a text node is edited,
+# since selectors such as '.active', '[aria-selected=true]' or ":contains('...')" depend on them.
+DOM_TOKEN_SCRIPT = """
+var w = window;
+if (w.__uiatf_doc_id === undefined) {
+    w.__uiatf_doc_id = Date.now().toString(36) + Math.random().toString(36).slice(2);
+    w.__uiatf_dom_gen = 0;
+    new MutationObserver(function () { w.__uiatf_dom_gen++; })
+        .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return [w.__uiatf_doc_id, w.__uiatf_dom_gen, location.href];
+"""
+
+
+class ElementCache:
+    """
+    Element ids keyed by resolved locator, valid while the DOM token of the page is unchanged.
+    Reading the token is a single property read in the browser, much cheaper than evaluating
+    the locator (e.g.: XPath contains() over the whole document) and polling for presence.
+
+    :Usage:
+        cache = ElementCache(driver)
+        element_id = cache.get(locator)  # None on a miss.
+        cache.put(locator, element.id)
+    """
+
+    def __init__(self, driver, max_size: int = 256):
+        """
+        :param driver: WebDriver object.
+        :param max_size: Maximum number of cached elements per page.
+        """
+        self.driver = driver
+        self.max_size = max_size
+        self.supported = True  # False when the driver cannot run scripts, e.g.: native app context.
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._token: Optional[Tuple] = None
+        self._entries: Dict[Tuple[str, str], str] = {}
+
+    def read_token(self) -> Optional[Tuple]:
+        """ :return: DOM token of the current document, None if it cannot be read. """
+        try:
+            token = self.driver.execute_script(DOM_TOKEN_SCRIPT)
+        except WebDriverException:
+            self.supported = False
+            return None
+        if not isinstance(token, list):
+            self.supported = False
+            return None
+        return tuple(token)
+
+    def get(self, locator: Tuple[str, str]) -> Optional[str]:
+        """
+        Look up an element, dropping every entry if the page changed since they were stored.
+
+        :param locator: Resolved locator, e.g.: ('css selector', '#submit').
+        :return: Element id, or None on a miss.
+        """
+        if not self.supported:
+            return None
+        token = self.read_token()
+        if token != self._token:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._token = token
+        element_id = self._entries.get(locator)
+        if element_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return element_id
+
+    def put(self, locator: Tuple[str, str], element_id: str) -> None:
+        """
+        Store an element under the token read by the preceding get(), so that an element found
+        after further DOM changes is dropped by the next lookup.
+        """
+        if not self.supported or self._token is None:
+            return
+        if len(self._entries) >= self.max_size:
+            self._entries.clear()
+        self._entries[locator] = element_id
+
+    def discard(self, locator: Tuple[str, str]) -> None:
+        self._entries.pop(locator, None)
+
+    def clear(self) -> None:
+        """ Drop every entry and probe script support again, e.g.: after switching the app context. """
+        self._entries.clear()
+        self._token = None
+        self.supported = True
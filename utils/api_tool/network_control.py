@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 7:20 PM
+@ Author      : Poco Ray
+@ File        : network_control.py
+@ Description : Request blocking, network shaping, HAR recording and fetch/XHR replay over Chrome DevTools.
+"""
+import json
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from utils.api_tool.cdp_support import supports_cdp
+
+# Response headers that no longer describe a replayed body, which is stored decoded.
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+
+# Serves recorded responses to fetch() and XMLHttpRequest, keyed by 'METHOD absolute-url'.
+# Repeated requests get the recorded responses in order, the last one is served again once they run out.
+STUB_SCRIPT = """
+(function (stubs) {
+    var w = window;
+    if (w.__uiatf_stubs) { w.__uiatf_stubs = stubs; return; }
+    w.__uiatf_stubs = stubs;
+    var take = function (method, url) {
+        var list = w.__uiatf_stubs[(method || 'GET').toUpperCase() + ' ' + new URL(url, location.href).href];
+        if (!list) { return null; }
+        var stub = list[Math.min(list.served || 0, list.length - 1)];
+        list.served = (list.served || 0) + 1;
+        return stub;
+    };
+    var bytes = function (text) {
+        var result = new Uint8Array(text.length);
+        for (var i = 0; i < text.length; i++) { result[i] = text.charCodeAt(i); }
+        return result;
+    };
+    if (w.fetch) {
+        var fetch = w.fetch;
+        w.fetch = function (input, init) {
+            var method = (init && init.method) || (input && input.method) || 'GET';
+            var stub = take(method, typeof input === 'string' ? input : input.url);
+            if (!stub) { return fetch.apply(this, arguments); }
+            var empty = [101, 204, 205, 304].indexOf(stub.status) >= 0;
+            var body = empty ? null : (stub.base64 ? bytes(atob(stub.body)) : stub.body);
+            return Promise.resolve(new Response(body, {status: stub.status, statusText: stub.statusText, headers: stub.headers}));
+        };
+    }
+    if (w.XMLHttpRequest) {
+        var proto = w.XMLHttpRequest.prototype, open = proto.open, send = proto.send;
+        proto.open = function (method, url) {
+            this.__uiatf_request = [method, url];
+            return open.apply(this, arguments);
+        };
+        proto.send = function () {
+            var request = this.__uiatf_request, stub = request && take(request[0], request[1]);
+            if (!stub) { return send.apply(this, arguments); }
+            var xhr = this, text = stub.base64 ? atob(stub.body) : stub.body;
+            var define = function (name, value) { Object.defineProperty(xhr, name, {value: value, configurable: true}); };
+            define('readyState', 4);
+            define('status', stub.status);
+            define('statusText', stub.statusText);
+            define('responseURL', new URL(request[1], location.href).href);
+            define('responseText', text);
+            define('response', xhr.responseType === 'json' ? JSON.parse(text) : text);
+            xhr.getResponseHeader = function (name) {
+                for (var key in stub.headers) { if (key.toLowerCase() === name.toLowerCase()) { return stub.headers[key]; } }
+                return null;
+            };
+            xhr.getAllResponseHeaders = function () {
+                return Object.keys(stub.headers).map(function (key) { return key + ': ' + stub.headers[key]; }).join('\\r\\n');
+            };
+            setTimeout(function () {
+                ['readystatechange', 'load', 'loadend'].forEach(function (type) { xhr.dispatchEvent(new Event(type)); });
+            }, 0);
+        };
+    }
+})(__STUBS__);
+"""
+
+
+def har_path_for(test_id: str, har_dir: str) -> str:
+    """
+    :param test_id: Test node id.
+    :param har_dir: HAR directory.
+    :return: HAR file of the test, e.g.: 'tests_test_web_test_web_login.py__TestWebLogin__test_web_login.har'.
+    """
+    return os.path.join(har_dir, re.sub(r'[^\w.\-]+', '_', test_id.replace('::', '__')) + '.har')
+
+
+def load_har(file_path: str) -> List[Dict[str, Any]]:
+    """ :return: HAR entries of the file. """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)['log']['entries']
+
+
+def save_har(file_path: str, entries: List[Dict[str, Any]]) -> None:
+    """ Write HAR 1.2 entries. """
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    har = {'log': {'version': '1.2', 'creator': {'name': 'UI-ATF', 'version': '1.0'}, 'entries': entries}}
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(har, file, ensure_ascii=False, indent=1)
+
+
+def build_stub_script(entries: Iterable[Dict[str, Any]]) -> str:
+    """
+    :param entries: HAR entries, entries without recorded content are skipped.
+    :return: Script that serves the recorded responses to fetch() and XMLHttpRequest.
+    """
+    stubs: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        request, response = entry['request'], entry['response']
+        content = response.get('content', {})
+        if 'text' not in content:
+            continue
+        stubs.setdefault(f"{request['method'].upper()} {request['url']}", []).append({
+            'status': response['status'],
+            'statusText': response.get('statusText', ''),
+            'headers': {h['name']: h['value'] for h in response.get('headers', [])
+                        if h['name'].lower() not in _DROPPED_HEADERS},
+            'body': content['text'],
+            'base64': content.get('encoding') == 'base64',
+        })
+    return STUB_SCRIPT.replace('__STUBS__', json.dumps(stubs, ensure_ascii=False))
+
+
+def _headers(headers: Optional[Dict[str, str]]) -> List[Dict[str, str]]:
+    return [{'name': k, 'value': str(v)} for k, v in (headers or {}).items()]
+
+
+class NetworkControl:
+    """
+    Network layer of a Chromium WebDriver session, driven through execute_cdp_cmd.
+    Replay stubs fetch() and XMLHttpRequest in the page, documents and static assets still go to
+    the network, block them with block() if the replay has to run offline.
+
+    :Usage:
+        network = NetworkControl(driver)
+        network.block(["*.png", "*.woff2"])
+        network.shape(latency_ms=200, download_kbps=1024)
+        network.start_recording()
+        ...
+        network.stop_recording("datas/har/login.har")
+        network.replay("datas/har/login.har")
+    """
+
+    def __init__(self, driver):
+        """
+        :param driver: WebDriver object, recording requires the 'goog:loggingPrefs' performance log.
+        """
+        self.driver = driver
+        self.supported = supports_cdp(driver)
+        self.recording = False
+        self._network_enabled = False
+        self._shaped = False
+        self._blocked = False
+        self._stub_script_id: Optional[str] = None
+
+    def _cdp(self, cmd: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not self.supported:
+            raise NotImplementedError("Network control requires a Chromium-based WebDriver!")
+        return self.driver.execute_cdp_cmd(cmd, params or {})
+
+    def _enable(self) -> None:
+        if not self._network_enabled:
+            self._cdp('Network.enable')
+            self._network_enabled = True
+
+    def block(self, patterns: Iterable[str]) -> None:
+        """
+        :param patterns: URL patterns, '*' is a wildcard, e.g.: '*.png', '*google-analytics.com*'.
+        """
+        self._enable()
+        self._cdp('Network.setBlockedURLs', {'urls': list(patterns)})
+        self._blocked = True
+
+    def shape(self, latency_ms: float = 0, download_kbps: Optional[float] = None,
+              upload_kbps: Optional[float] = None, offline: bool = False) -> None:
+        """
+        :param latency_ms: Added round-trip latency (milliseconds).
+        :param download_kbps: Download throughput (kbit/s), None for unlimited.
+        :param upload_kbps: Upload throughput (kbit/s), None for unlimited.
+        :param offline: Simulate a lost connection.
+        """
+        self._enable()
+        self._cdp('Network.emulateNetworkConditions', {
+            'offline': offline,
+            'latency': latency_ms,
+            'downloadThroughput': -1 if download_kbps is None else download_kbps * 1024 / 8,
+            'uploadThroughput': -1 if upload_kbps is None else upload_kbps * 1024 / 8,
+        })
+        self._shaped = True
+
+    def _performance_log(self) -> List[Dict[str, Any]]:
+        """ :return: DevTools events buffered since the last read. """
+        entries = self.driver.execute(Command.GET_LOG, {'type': 'performance'})['value'] or []
+        return [json.loads(entry['message'])['message'] for entry in entries]
+
+    def start_recording(self) -> None:
+        """ Start capturing the requests of the page, events buffered before are discarded. """
+        self._enable()
+        self._performance_log()
+        self.recording = True
+
+    def stop_recording(self, har_path: str, resource_types: Optional[Iterable[str]] = ('XHR', 'Fetch')) -> int:
+        """
+        Write the requests captured since start_recording() to a HAR file.
+
+        :param har_path: HAR file path.
+        :param resource_types: DevTools resource types whose bodies are captured, None for every type.
+        :return: Number of entries written.
+        """
+        self.recording = False
+        types = None if resource_types is None else set(resource_types)
+        requests: Dict[str, Dict[str, Any]] = {}
+        for event in self._performance_log():
+            method, params = event.get('method'), event.get('params', {})
+            request_id = params.get('requestId')
+            if method == 'Network.requestWillBeSent':
+                requests[request_id] = {'sent': params}
+            elif request_id in requests and method == 'Network.responseReceived':
+                requests[request_id]['response'] = params
+            elif request_id in requests and method == 'Network.loadingFinished':
+                requests[request_id]['finished'] = params
+
+        entries = []
+        for request_id, item in requests.items():
+            if 'response' not in item or 'finished' not in item:
+                continue
+            resource_type = item['response'].get('type') or item['sent'].get('type')
+            if types is not None and resource_type not in types:
+                continue
+            entries.append(self._har_entry(request_id, item, resource_type))
+        save_har(har_path, entries)
+        return len(entries)
+
+    def _har_entry(self, request_id: str, item: Dict[str, Any], resource_type: str) -> Dict[str, Any]:
+        sent, response = item['sent'], item['response']['response']
+        request = sent['request']
+        elapsed = (item['finished']['timestamp'] - sent['timestamp']) * 1000
+        content = {'size': item['finished'].get('encodedDataLength', 0), 'mimeType': response.get('mimeType', '')}
+        try:
+            body = self._cdp('Network.getResponseBody', {'requestId': request_id})
+            content['text'] = body['body']
+            if body.get('base64Encoded'):
+                content['encoding'] = 'base64'
+        except WebDriverException:
+            pass  # The body was evicted from the DevTools buffer or the request had none.
+        entry = {
+            'startedDateTime': datetime.fromtimestamp(sent.get('wallTime', 0), tz=timezone.utc).isoformat(),
+            'time': round(elapsed, 3),
+            'request': {
+                'method': request['method'], 'url': request['url'], 'httpVersion': 'HTTP/1.1',
+                'headers': _headers(request.get('headers')), 'queryString': [], 'cookies': [],
+                'headersSize': -1, 'bodySize': len(request.get('postData', '')),
+            },
+            'response': {
+                'status': response['status'], 'statusText': response.get('statusText', ''),
+                'httpVersion': response.get('protocol', 'HTTP/1.1'), 'headers': _headers(response.get('headers')),
+                'cookies': [], 'content': content, 'redirectURL': '', 'headersSize': -1,
+                'bodySize': item['finished'].get('encodedDataLength', -1),
+            },
+            'cache': {},
+            'timings': {'send': 0, 'wait': round(elapsed, 3), 'receive': 0},
+            '_resourceType': resource_type,
+        }
+        if 'postData' in request:
+            entry['request']['postData'] = {'mimeType': request.get('headers', {}).get('Content-Type', ''),
+                                            'text': request['postData']}
+        return entry
+
+    def replay(self, har_path: str) -> int:
+        """
+        Serve the recorded fetch/XHR responses from a HAR file, in the current and every new document.
+
+        :param har_path: HAR file path.
+        :return: Number of stubbed entries.
+        """
+        entries = [e for e in load_har(har_path) if 'text' in e['response'].get('content', {})]
+        script = build_stub_script(entries)
+        self.remove_stubs()
+        self._stub_script_id = self._cdp('Page.addScriptToEvaluateOnNewDocument', {'source': script})['identifier']
+        self.driver.execute_script(script)
+        return len(entries)
+
+    def remove_stubs(self) -> None:
+        """ Stop stubbing new documents, the current document keeps its stubs until it is unloaded. """
+        if self._stub_script_id is not None:
+            self._cdp('Page.removeScriptToEvaluateOnNewDocument', {'identifier': self._stub_script_id})
+            self._stub_script_id = None
+
+    def reset(self) -> None:
+        """ Undo blocking, shaping and stubbing, so that the next test on the same browser starts clean. """
+        if not self.supported:
+            return
+        self.remove_stubs()
+        if self._blocked:
+            self._cdp('Network.setBlockedURLs', {'urls': []})
+            self._blocked = False
+        if self._shaped:
+            self._cdp('Network.emulateNetworkConditions',
+                      {'offline': False, 'latency': 0, 'downloadThroughput': -1, 'uploadThroughput': -1})
+            self._shaped = False
+        if self._network_enabled:
+            self._cdp('Network.disable')
+            self._network_enabled = False
+        self.recording = False
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 6:10 PM
+@ Author      : Poco Ray
+@ File        : page_idle.py
+@ Description : Network-idle and render-idle detection for SPA pages.
+"""
+from typing import Optional, Tuple
+from selenium.common.exceptions import WebDriverException
+from utils.api_tool.cdp_support import supports_cdp
+
+# Counts pending fetch/XHR requests and records the time of the last network activity or DOM mutation.
+# document.readyState is "complete" long before the XHRs of a Vue/React page settle, this hook sees them.
+IDLE_HOOK_SCRIPT = """
+(function () {
+    var w = window;
+    if (w.__uiatf_idle) { return; }
+    var state = w.__uiatf_idle = {pending: 0, last: performance.now()};
+    var touch = function () { state.last = performance.now(); };
+    var done = function () { state.pending = Math.max(state.pending - 1, 0); touch(); };
+    if (w.fetch) {
+        var fetch = w.fetch;
+        w.fetch = function () {
+            state.pending++; touch();
+            try {
+                var promise = fetch.apply(this, arguments);
+                promise.then(done, done);
+                return promise;
+            } catch (e) { done(); throw e; }
+        };
+    }
+    if (w.XMLHttpRequest) {
+        var send = w.XMLHttpRequest.prototype.send;
+        w.XMLHttpRequest.prototype.send = function () {
+            state.pending++; touch();
+            this.addEventListener('loadend', done);
+            try { return send.apply(this, arguments); } catch (e) { done(); throw e; }
+        };
+    }
+    if (w.MutationObserver) {
+        new MutationObserver(touch).observe(document, {childList: true, subtree: true, characterData: true});
+    }
+})();
+"""
+
+# Installs the hook if the page was loaded without it, and returns [readyState, pending requests, quiet ms].
+# Resource timing entries cover requests that finished before the hook was installed.
+IDLE_PROBE_SCRIPT = IDLE_HOOK_SCRIPT + """
+var state = window.__uiatf_idle, last = state.last;
+var entries = performance.getEntriesByType('resource');
+for (var i = Math.max(entries.length - 50, 0); i < entries.length; i++) {
+    last = Math.max(last, entries[i].responseEnd);
+}
+var jquery = (typeof window.jQuery !== 'undefined' && window.jQuery.active) || 0;
+return [document.readyState, state.pending + jquery, performance.now() - last];
+"""
+
+
+def install_idle_hook(driver) -> bool:
+    """
+    Inject the idle hook into every new document through Chrome DevTools, so that requests issued
+    while the page loads are counted too. Other drivers get the hook on the first probe,
+    App drivers never send the DevTools command.
+
+    :param driver: WebDriver object.
+    :return: Whether the hook was registered.
+    """
+    if not supports_cdp(driver):
+        return False
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': IDLE_HOOK_SCRIPT})
+        return True
+    except WebDriverException:
+        return False
+
+
+class page_is_idle:
+    """
+    Expected condition: the document is loaded, no fetch/XHR/jQuery request is pending,
+    and neither the network nor the DOM changed for quiet_ms.
+
+    :Usage:
+        WebDriverWait(driver, 10, poll_frequency=0.1).until(page_is_idle(500))
+    """
+
+    def __init__(self, quiet_ms: int = 500):
+        self.quiet_ms = quiet_ms
+        self.last_state: Optional[Tuple[str, int, float]] = None
+
+    def __call__(self, driver) -> bool:
+        state = driver.execute_script(IDLE_PROBE_SCRIPT)
+        if not isinstance(state, list):
+            return True  # Scripts are not supported, e.g.: native app context.
+        self.last_state = ready_state, pending, quiet = state[0], int(state[1]), float(state[2])
+        return ready_state == 'complete' and pending == 0 and quiet >= self.quiet_ms
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 4:10 PM
+@ Author      : Poco Ray
+@ File        : retry_policy.py
+@ Description : Failure classification and per-class retry budgets for BaseCase actions.
+"""
+from dataclasses import dataclass
+from enum import Enum, unique
+from typing import Dict, Optional
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    ElementNotVisibleException,
+    InvalidArgumentException,
+    InvalidSelectorException,
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from utils.api_tool.deadline import DeadlineExceeded
+
+
+@unique
+class FailureKind(Enum):
+    """ Classes of action failures. """
+    STALE = 'stale'  # The element was re-rendered, locating it again usually works.
+    INTERCEPTED = 'intercepted'  # Another element (overlay, spinner) received the click.
+    NOT_VISIBLE = 'not_visible'  # The element exists but is hidden or disabled.
+    ABSENT = 'absent'  # The element did not appear within the timeout.
+    DRIVER_DEAD = 'driver_dead'  # The session or browser is gone.
+    INVALID = 'invalid'  # Invalid selector or argument, retrying cannot help.
+    DEADLINE = 'deadline'  # The time budget of the test or step is used up.
+    UNKNOWN = 'unknown'
+
+
+# Fragments of WebDriverException messages raised when the browser or the session is gone.
+_DEAD_DRIVER_MESSAGES = (
+    'chrome not reachable', 'disconnected', 'session deleted', 'invalid session id',
+    'target window already closed', 'connection refused', 'max retries exceeded',
+)
+
+
+def classify_failure(exc: BaseException, stage: Optional[str] = None) -> FailureKind:
+    """
+    Classify an action failure.
+
+    :param exc: Raised exception.
+    :param stage: Stage of the action that failed, 'presence' or 'clickable' for wait timeouts.
+    :return: Failure kind.
+    :Usage:
+        kind = classify_failure(e, stage='presence')
+    """
+    if isinstance(exc, DeadlineExceeded):
+        return FailureKind.DEADLINE
+    if isinstance(exc, StaleElementReferenceException):
+        return FailureKind.STALE
+    if isinstance(exc, ElementClickInterceptedException):
+        return FailureKind.INTERCEPTED
+    if isinstance(exc, (ElementNotVisibleException, ElementNotInteractableException)):
+        return FailureKind.NOT_VISIBLE
+    if isinstance(exc, NoSuchElementException):
+        return FailureKind.ABSENT
+    if isinstance(exc, TimeoutException):
+        return FailureKind.NOT_VISIBLE if stage == 'clickable' else FailureKind.ABSENT
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException, ConnectionError)):
+        return FailureKind.DRIVER_DEAD
+    if isinstance(exc, (InvalidSelectorException, InvalidArgumentException, ValueError)):
+        return FailureKind.INVALID
+    if any(m in str(exc).lower() for m in _DEAD_DRIVER_MESSAGES):
+        return FailureKind.DRIVER_DEAD
+    return FailureKind.UNKNOWN
+
+
+@dataclass(frozen=True)
+class RetryBudget:
+    """ Retry budget of a failure kind. """
+    retries: int = 0  # Number of retries allowed for this kind.
+    backoff: float = 0.0  # Delay before the first retry (seconds).
+    backoff_factor: float = 2.0  # Multiplier of the delay for each further retry.
+    wait_timeout: Optional[float] = None  # Wait timeout of the retried attempt, None for the default timeout.
+
+
+# Default budgets. Absent elements already consumed the full wait timeout, so they fail fast.
+DEFAULT_BUDGETS: Dict[FailureKind, RetryBudget] = {
+    FailureKind.STALE: RetryBudget(retries=2, backoff=0.0, wait_timeout=2),
+    FailureKind.INTERCEPTED: RetryBudget(retries=2, backoff=0.25, wait_timeout=2),
+    FailureKind.NOT_VISIBLE: RetryBudget(retries=1, backoff=0.5, wait_timeout=3),
+    FailureKind.ABSENT: RetryBudget(retries=0),
+    FailureKind.DRIVER_DEAD: RetryBudget(retries=0),
+    FailureKind.INVALID: RetryBudget(retries=0),
+    FailureKind.DEADLINE: RetryBudget(retries=0),
+    FailureKind.UNKNOWN: RetryBudget(retries=1, backoff=0.5, wait_timeout=2),
+}
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to retry a failed action.
+
+    :Usage:
+        policy = RetryPolicy()
+        attempt = policy.start()
+        delay = attempt.next_delay(FailureKind.STALE)  # None means give up.
+    """
+
+    def __init__(self, budgets: Optional[Dict[FailureKind, RetryBudget]] = None, max_retries: int = 3):
+        """
+        :param budgets: Budgets overriding the defaults per failure kind.
+        :param max_retries: Cap of the total number of retries of an action, across all kinds.
+        """
+        self.budgets = {**DEFAULT_BUDGETS, **(budgets or {})}
+        self.max_retries = max_retries
+
+    def budget(self, kind: FailureKind) -> RetryBudget:
+        return self.budgets.get(kind, DEFAULT_BUDGETS[FailureKind.UNKNOWN])
+
+    def start(self) -> 'RetryState':
+        """ :return: Retry bookkeeping for a new action. """
+        return RetryState(self)
+
+
+class RetryState:
+    """ Retries performed so far by a single action. """
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.retries: Dict[FailureKind, int] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.retries.values())
+
+    def next_delay(self, kind: FailureKind) -> Optional[float]:
+        """
+        Consume a retry of the failure kind.
+
+        :param kind: Failure kind.
+        :return: Backoff delay before retrying (seconds), or None if the budget is exhausted.
+        """
+        budget = self.policy.budget(kind)
+        used = self.retries.get(kind, 0)
+        if used >= budget.retries or self.total >= self.policy.max_retries:
+            return None
+        self.retries[kind] = used + 1
+        return budget.backoff * (budget.backoff_factor ** used)
+
+    def wait_timeout(self, kind: FailureKind) -> Optional[float]:
+        """ :return: Wait timeout of the next attempt after a failure of this kind. """
+        return self.policy.budget(kind).wait_timeout
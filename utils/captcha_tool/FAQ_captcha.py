@@ -8,3 +8,109 @@
 @ Solution    : 1. 自动化计算: 直接通过编程解决数学运算.
                 2. 知识库: 对常见的问题建立知识库，进行匹配和回答.
 """
+import ast
+import operator
+import re
+from typing import Dict, Optional, Union
+
+# 中文及全角运算符 -> Python运算符
+_REPLACEMENTS = (
+    ('加上', '+'), ('减去', '-'), ('乘以', '*'), ('除以', '/'),
+    ('加', '+'), ('减', '-'), ('乘', '*'), ('除', '/'),
+    ('×', '*'), ('x', '*'), ('X', '*'), ('＊', '*'), ('÷', '/'), ('＋', '+'), ('－', '-'), ('—', '-'),
+    ('（', '('), ('）', ')'),
+)
+_CHINESE_DIGITS = {'零': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
+                   '十': 10}
+_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+              ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.USub: operator.neg, ast.UAdd: operator.pos}
+
+
+def _chinese_number(text: str) -> str:
+    """ 将'十二'、'三十五'等一百以内的中文数字转换为阿拉伯数字 """
+    def convert(match):
+        chars = match.group(0)
+        if '十' not in chars:
+            return ''.join(str(_CHINESE_DIGITS[c]) for c in chars)
+        tens, _, ones = chars.partition('十')
+        return str((_CHINESE_DIGITS[tens] if tens else 1) * 10 + (_CHINESE_DIGITS[ones] if ones else 0))
+    return re.sub(f"[{''.join(_CHINESE_DIGITS)}]+", convert, text)
+
+
+def _evaluate(node: ast.AST) -> Union[int, float]:
+    """ 只允许数字和四则运算, 不执行任意代码 """
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.left), _evaluate(node.right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError(f"不支持的表达式: {ast.dump(node)}")
+
+
+class FAQCaptcha:
+    """
+    数学运算及问答验证码处理工具
+
+    :Usage:
+        FAQCaptcha().solve("3 + 5 = ?")  # '8'
+        FAQCaptcha().solve("十二减三等于几")  # '9'
+        FAQCaptcha({'中国的首都是哪里': '北京'}).solve("中国的首都是哪里？")  # '北京'
+    """
+
+    def __init__(self, knowledge: Optional[Dict[str, str]] = None):
+        """
+        :param knowledge: 问答知识库, 问题 -> 答案, 匹配时忽略标点和空白
+        """
+        self.knowledge = {self.normalize(question): answer for question, answer in (knowledge or {}).items()}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """ :return: 去除标点和空白后的文本 """
+        return re.sub(r'[\s,.!?，。！？:：=＝]+', '', text)
+
+    @staticmethod
+    def expression(question: str) -> str:
+        """
+        从题目中提取算式, 如："十二减三等于几？" -> "12-3"
+
+        :param question: 题目
+        :return: 算式
+        :raise ValueError: 题目中没有算式
+        """
+        text = _chinese_number(question)
+        for source, target in _REPLACEMENTS:
+            text = text.replace(source, target)
+        text = re.split(r'[=＝]|等于', text)[0]
+        text = re.sub(r'[^\d+\-*/%().]', '', text)
+        if not re.search(r'\d', text):
+            raise ValueError(f"题目中没有算式: {question}")
+        return text
+
+    def calculate(self, question: str) -> str:
+        """
+        :param question: 数学题, 如："3 + 5 = ?"
+        :return: 计算结果, 整数结果不带小数点
+        """
+        value = _evaluate(ast.parse(self.expression(question), mode='eval'))
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(round(value, 2) if isinstance(value, float) else value)
+
+    def solve(self, question: str) -> str:
+        """
+        先匹配知识库, 再按数学题计算
+
+        :param question: 题目
+        :return: 答案
+        :raise ValueError: 无法回答
+        """
+        answer = self.knowledge.get(self.normalize(question))
+        if answer is not None:
+            return answer
+        try:
+            return self.calculate(question)
+        except (SyntaxError, ZeroDivisionError, ValueError) as e:
+            raise ValueError(f"无法回答的问题: {question}") from e
@@ -7,4 +7,183 @@
 @ Description : 行为验证码, 通过检测用户的行为（如鼠标移动路径）来判断是否为人类.
 @ Solution    : 1. 模拟人机交互: 使用模拟用户行为的脚本，模拟人类的操作模式.
                 2. 机器学习: 学习人类行为特征，生成更自然的行为模拟.
+
+                轨迹生成: 三次贝塞尔曲线路径 + 最小加加速度(minimum-jerk)速度曲线 + 抖动, 一次性生成为NumPy数组,
+                再编码为一个W3C Actions请求, 由浏览器按各段耗时回放. 滑块验证码及BaseCase拖动复用本模块.
 """
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import numpy as np
+from selenium.webdriver.common.actions import interaction
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.common.actions.pointer_input import PointerInput
+from selenium.webdriver.remote.webelement import WebElement
+
+# 浏览器回放时每段移动的最短耗时(毫秒), 更短的移动合并到下一段
+MIN_STEP_MS = 8
+
+
+@dataclass
+class Trajectory:
+    """ 指针轨迹: points为相对起点的坐标(N×2, CSS像素), times为对应时刻(N, 毫秒), 首点为(0, 0)和0 """
+    points: np.ndarray
+    times: np.ndarray
+
+    @property
+    def duration(self) -> float:
+        """ :return: 总耗时(毫秒) """
+        return float(self.times[-1])
+
+    def relative_moves(self, min_step_ms: int = MIN_STEP_MS) -> np.ndarray:
+        """
+        转换为整数相对移动, 坐标先对累计位置取整再差分, 舍入误差不会累积, 终点精确
+
+        :param min_step_ms: 每段最短耗时(毫秒)
+        :return: M×3的int数组 [dx, dy, 毫秒]
+        """
+        points = np.round(self.points).astype(np.int64)
+        times = np.round(self.times).astype(np.int64)
+        # 按最短耗时抽取关键帧, 始终保留终点
+        keep = np.flatnonzero(np.diff(times // min_step_ms, prepend=-1))
+        if keep[-1] != len(times) - 1:
+            keep = np.append(keep, len(times) - 1)
+        moves = np.column_stack([np.diff(points[keep], axis=0), np.diff(times[keep])])
+        return moves[(moves[:, 0] != 0) | (moves[:, 1] != 0) | (moves[:, 2] > 0)]
+
+
+def minimum_jerk(steps: int) -> np.ndarray:
+    """
+    最小加加速度曲线, 起止速度和加速度为0, 与人手的点到点运动一致
+
+    :param steps: 采样点数
+    :return: 0-1之间的进度, 首尾为0和1
+    """
+    tau = np.linspace(0.0, 1.0, steps)
+    return tau ** 3 * (10 - 15 * tau + 6 * tau ** 2)
+
+
+def bezier(control: np.ndarray, progress: np.ndarray) -> np.ndarray:
+    """
+    三次贝塞尔曲线
+
+    :param control: 4×2控制点
+    :param progress: 曲线参数(0-1)
+    :return: N×2坐标
+    """
+    t = progress[:, None]
+    return ((1 - t) ** 3 * control[0] + 3 * (1 - t) ** 2 * t * control[1]
+            + 3 * (1 - t) * t ** 2 * control[2] + t ** 3 * control[3])
+
+
+def generate_trajectory(dx: float, dy: float, duration: float = 0.8, rate: int = 60, curvature: float = 0.15,
+                        jitter: float = 0.5, overshoot: float = 0.0,
+                        rng: Optional[np.random.Generator] = None) -> Trajectory:
+    """
+    生成从(0, 0)到(dx, dy)的类人轨迹
+
+    :param dx: 横向位移(CSS像素)
+    :param dy: 纵向位移(CSS像素)
+    :param duration: 总耗时(秒)
+    :param rate: 采样率(Hz)
+    :param curvature: 控制点偏离直线的最大比例, 0为直线
+    :param jitter: 抖动标准差(像素), 首尾无抖动
+    :param overshoot: 超过终点的比例, 超出后回拉到终点, 如：0.05
+    :param rng: 随机数生成器, 固定种子可复现轨迹
+    :return: 轨迹
+    """
+    rng = rng or np.random.default_rng()
+    end = np.array([dx, dy], dtype=float)
+    length = float(np.hypot(dx, dy))
+    normal = np.array([-dy, dx]) / length if length else np.zeros(2)
+    steps = max(2, int(duration * rate) + 1)
+
+    target = end * (1 + overshoot)
+    offsets = rng.uniform(-curvature, curvature, size=2) * length
+    control = np.array([np.zeros(2), target / 3 + normal * offsets[0], target * 2 / 3 + normal * offsets[1], target])
+
+    main_steps = steps if not overshoot else max(2, int(steps * 0.85))
+    points = bezier(control, minimum_jerk(main_steps))
+    if overshoot:
+        # 回拉段同样按最小加加速度减速到终点
+        back = minimum_jerk(steps - main_steps + 1)[1:, None]
+        points = np.vstack([points, target + (end - target) * back])
+
+    if jitter:
+        envelope = np.sin(np.linspace(0.0, np.pi, len(points)))[:, None]
+        points = points + rng.normal(0.0, jitter, size=points.shape) * envelope
+    points[0], points[-1] = 0.0, end
+    times = np.linspace(0.0, duration * 1000, len(points))
+    return Trajectory(points, times)
+
+
+def compile_actions(driver, element: WebElement, trajectory: Trajectory, start: Tuple[int, int] = (0, 0),
+                    press: bool = True, touch: bool = False, hold: float = 0.1) -> ActionBuilder:
+    """
+    将轨迹编码为一个W3C Actions请求
+
+    :param driver: WebDriver对象
+    :param element: 起点所在元素
+    :param trajectory: 轨迹
+    :param start: 起点相对元素中心的偏移(CSS像素)
+    :param press: 是否按住拖动, False时仅移动
+    :param touch: 是否使用触摸指针(App)
+    :param hold: 松开前的停顿(秒)
+    :return: ActionBuilder, 调用perform()执行
+    """
+    pointer_input = PointerInput(interaction.POINTER_TOUCH if touch else interaction.POINTER_MOUSE,
+                                 'touch' if touch else 'mouse')
+    builder = ActionBuilder(driver, mouse=pointer_input, duration=0)
+    pointer = builder.pointer_action
+    pointer.move_to(element, *start)
+    if press:
+        pointer.pointer_down()
+    for dx, dy, ms in trajectory.relative_moves().tolist():
+        pointer_input.create_pointer_move(duration=ms, x=dx, y=dy, origin=interaction.POINTER)
+    if press:
+        pointer.pause(hold)
+        pointer.pointer_up()
+    return builder
+
+
+class BehaviorCaptcha:
+    """
+    行为验证码处理工具, 以类人轨迹移动或拖动指针
+
+    :Usage:
+        behavior = BehaviorCaptcha(seed=1)
+        behavior.drag(handle_element, 180, 0, duration=0.9)
+    """
+
+    def __init__(self, seed: Optional[int] = None, **options):
+        """
+        :param seed: 随机种子, 固定后轨迹可复现
+        :param options: generate_trajectory的其他参数, 如：curvature=0.1, jitter=0.8
+        """
+        self.rng = np.random.default_rng(seed)
+        self.options = options
+
+    def trajectory(self, dx: float, dy: float, duration: float = 0.8, **options) -> Trajectory:
+        return generate_trajectory(dx, dy, duration, rng=self.rng, **{**self.options, **options})
+
+    def drag(self, element: WebElement, dx: float, dy: float = 0, duration: float = 0.8, touch: bool = False,
+             **options) -> Trajectory:
+        """
+        按住元素中心沿类人轨迹拖动, 整条轨迹一次发送
+
+        :param element: 被拖动的元素
+        :param dx: 横向位移(CSS像素)
+        :param dy: 纵向位移(CSS像素)
+        :param duration: 拖动耗时(秒)
+        :param touch: 是否使用触摸指针(App)
+        :return: 实际使用的轨迹
+        """
+        trajectory = self.trajectory(dx, dy, duration, **options)
+        compile_actions(element.parent, element, trajectory, touch=touch).perform()
+        return trajectory
+
+    def move(self, element: WebElement, dx: float, dy: float = 0, duration: float = 0.5,
+             start: Tuple[int, int] = (0, 0), **options) -> Trajectory:
+        """ 不按下, 从元素上的起点沿类人轨迹移动指针 """
+        trajectory = self.trajectory(dx, dy, duration, **options)
+        compile_actions(element.parent, element, trajectory, start=start, press=False).perform()
+        return trajectory
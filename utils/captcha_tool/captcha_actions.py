@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午10:50
+@ Author      : Poco Ray
+@ File        : captcha_actions.py
+@ Description : 验证码点击, 将识别图像坐标换算为相对元素中心的CSS偏移, 所有点击在一个W3C Actions请求中完成.
+                由浏览器执行, 支持无头模式和并行浏览器, 不移动系统鼠标.
+"""
+from typing import List, Optional, Sequence, Tuple
+from selenium.webdriver.common.actions.action_builder import ActionBuilder
+from selenium.webdriver.remote.webelement import WebElement
+
+Point = Tuple[float, float]
+
+
+def element_offsets(element: WebElement, points: Sequence[Point],
+                    image_size: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+    """
+    图像坐标换算为相对元素中心的偏移(CSS像素), 即W3C Actions以元素为origin时的x/y
+
+    :param element: 验证码图片元素
+    :param points: 图像坐标(像素), 如：[(100, 200), (200, 300)]
+    :param image_size: 图像尺寸(width, height), 如元素截图在高分屏上为CSS尺寸的devicePixelRatio倍. 默认与元素尺寸相同
+    :return: 偏移列表
+    """
+    rect = element.rect
+    width, height = rect['width'], rect['height']
+    image_width, image_height = image_size or (width, height)
+    scale_x, scale_y = width / image_width, height / image_height
+    return [(round(x * scale_x - width / 2), round(y * scale_y - height / 2)) for x, y in points]
+
+
+def click_offsets(element: WebElement, offsets: Sequence[Tuple[int, int]], pause: float = 0.3,
+                  move_duration: int = 150) -> None:
+    """
+    依次点击元素上的多个位置, 整个序列编码为一个W3C Actions请求
+
+    :param element: 元素, 偏移相对其中心
+    :param offsets: element_offsets的返回值
+    :param pause: 两次点击之间的停顿(秒)
+    :param move_duration: 每次移动的耗时(毫秒)
+    """
+    builder = ActionBuilder(element.parent, duration=move_duration)
+    pointer = builder.pointer_action
+    for i, (x, y) in enumerate(offsets):
+        if i:
+            pointer.pause(pause)
+        pointer.move_to(element, x, y)
+        pointer.click()
+    builder.perform()
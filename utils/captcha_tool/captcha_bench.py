@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午10:20
+@ Author      : Poco Ray
+@ File        : captcha_bench.py
+@ Description : 验证码求解的准确率/耗时评测, 基于本地标注数据集, 各类验证码共用.
+                数据集目录: captcha_corpus_dir/<kind>/, 其中labels.json为 {"图片文件名": 标注}.
+@ Usage       : python -m utils.captcha_tool.captcha_bench {text,slider,image} [--corpus datas/captcha/<kind>] [--output report.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import cv2
+import numpy as np
+from common.setting import Settings
+from utils.captcha_tool.image_io import load_image
+from utils.perf_tool.action_metrics import percentile
+
+_settings = Settings()
+
+
+@dataclass
+class LabeledSample:
+    """ 标注样本 """
+    name: str
+    image: np.ndarray
+    label: Any
+    path: str = ''
+
+
+@dataclass
+class StrategyStats:
+    """ 单个策略在数据集上的得分和耗时(秒) """
+    name: str
+    samples: int = 0
+    score: float = 0.0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def accuracy(self) -> float:
+        return self.score / self.samples if self.samples else 0.0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.latencies, 95) if self.latencies else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'samples': self.samples, 'accuracy': round(self.accuracy, 4),
+                'errors': self.errors, 'median_ms': round(self.median * 1000, 3), 'p95_ms': round(self.p95 * 1000, 3)}
+
+
+def load_corpus(corpus_dir: str, labels_file: str = 'labels.json', flags: int = cv2.IMREAD_COLOR) -> List[LabeledSample]:
+    """
+    读取标注数据集
+
+    :param corpus_dir: 数据集目录
+    :param labels_file: 标注文件名
+    :param flags: cv2.imread标志
+    :return: 按文件名排序的样本列表
+    """
+    with open(os.path.join(corpus_dir, labels_file), encoding='utf-8') as file:
+        labels = json.load(file)
+    samples = []
+    for name, label in sorted(labels.items()):
+        path = os.path.join(corpus_dir, name)
+        samples.append(LabeledSample(name, load_image(path, flags), label, path))
+    return samples
+
+
+def evaluate(name: str, samples: Sequence[LabeledSample], solve: Callable[[LabeledSample], Any],
+             score: Callable[[Any, Any], float]) -> StrategyStats:
+    """
+    在数据集上评测一个求解函数, 抛出异常的样本计0分
+
+    :param name: 策略名称
+    :param samples: 标注样本
+    :param solve: 求解函数, 参数为样本, 返回答案
+    :param score: 评分函数, 参数为答案和标注, 返回0-1之间的得分
+    :return: 评测结果
+    """
+    stats = StrategyStats(name)
+    for sample in samples:
+        start = time.perf_counter()
+        try:
+            answer = solve(sample)
+        except Exception:
+            answer = None
+            stats.errors += 1
+        stats.latencies.append(time.perf_counter() - start)
+        stats.samples += 1
+        if answer is not None:
+            stats.score += score(answer, sample.label)
+    return stats
+
+
+def format_report(results: Sequence[StrategyStats]) -> str:
+    """ :return: 评测结果表格 """
+    lines = [f"{'strategy':<24}{'samples':>8}{'accuracy':>10}{'errors':>8}{'median ms':>12}{'p95 ms':>10}"]
+    for stats in results:
+        lines.append(f"{stats.name:<24}{stats.samples:>8}{stats.accuracy:>10.2%}{stats.errors:>8}"
+                     f"{stats.median * 1000:>12.2f}{stats.p95 * 1000:>10.2f}")
+    return '\n'.join(lines)
+
+
+def save_report(path: str, results: Sequence[StrategyStats]) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump([stats.to_dict() for stats in results], file, ensure_ascii=False, indent=2)
+
+
+# 验证码类型 -> 评测函数, 评测函数接收样本列表, 返回各策略的评测结果
+BENCHMARKS: Dict[str, Callable[[List[LabeledSample]], List[StrategyStats]]] = {}
+
+
+def register_benchmark(kind: str):
+    """ 注册验证码类型的评测函数 """
+    def decorator(func):
+        BENCHMARKS[kind] = func
+        return func
+    return decorator
+
+
+def text_score(answer, label: str) -> float:
+    """ :return: 标注文字中被识别出的比例 """
+    found = {text for text, _ in answer}
+    return sum(char in found for char in label) / len(label) if label else 0.0
+
+
+@register_benchmark('text')
+def bench_text(samples: List[LabeledSample]) -> List[StrategyStats]:
+    """ 文字点选验证码: 标注为需要点击的文字, 如："送公赶". 分别评测每个OCR策略及完整策略链 """
+    from utils.captcha_tool.text_captcha import TextCaptcha
+
+    captcha = TextCaptcha()
+    results = [evaluate(strategy.name, samples, lambda sample, s=strategy: captcha.run_strategy(sample.image, s),
+                        text_score)
+               for strategy in captcha.strategies]
+    results.append(evaluate('chain', samples,
+                            lambda sample: captcha.recognize_text(sample.image, list(sample.label), use_cache=False),
+                            text_score))
+    return results
+
+
+# 滑块缺口定位允许的误差(像素)
+SLIDER_TOLERANCE = 5
+
+
+def slider_score(answer, label) -> float:
+    """ :return: 缺口横坐标误差在SLIDER_TOLERANCE内为1, 否则为0 """
+    expected = label['x'] if isinstance(label, dict) else label
+    return float(abs(answer.x - expected) <= SLIDER_TOLERANCE)
+
+
+@register_benchmark('slider')
+def bench_slider(samples: List[LabeledSample]) -> List[StrategyStats]:
+    """
+    滑块验证码: 标注为缺口左边缘横坐标, 如：152, 有拼图块时为 {"x": 152, "piece": "piece_001.png"}.
+    分别评测拼图块轮廓匹配和方框轮廓匹配
+    """
+    from utils.captcha_tool.slider_captcha import SliderCaptcha
+
+    slider = SliderCaptcha()
+    pieces = {}
+    for sample in samples:
+        if isinstance(sample.label, dict) and sample.label.get('piece'):
+            piece_path = os.path.join(os.path.dirname(sample.path), sample.label['piece'])
+            pieces[sample.name] = load_image(piece_path, cv2.IMREAD_UNCHANGED)
+    results = [evaluate('outline', samples, lambda sample: slider.find_gap(sample.image), slider_score)]
+    with_piece = [sample for sample in samples if sample.name in pieces]
+    if with_piece:
+        results.insert(0, evaluate('piece', with_piece,
+                                   lambda sample: slider.find_gap(sample.image, pieces[sample.name]), slider_score))
+    return results
+
+
+def tiles_score(answer, label) -> float:
+    """ :return: 选中图块与标注图块的交并比 """
+    expected, selected = set(label['tiles']), set(answer)
+    return len(expected & selected) / len(expected | selected) if expected | selected else 1.0
+
+
+@register_benchmark('image')
+def bench_image(samples: List[LabeledSample], backend=None) -> List[StrategyStats]:
+    """
+    图片验证码: 标注如 {"target": "car", "tiles": [0, 4, 7], "grid": [3, 3]}.
+    分别评测所有图块批量推理和逐个图块推理
+    """
+    from utils.captcha_tool.image_captcha import ImageCaptcha, load_backend, split_tiles
+
+    backend = backend or load_backend()
+
+    def captcha_for(sample):
+        rows, cols = sample.label.get('grid', (3, 3))
+        return ImageCaptcha(backend, rows, cols)
+
+    def per_tile(sample):
+        captcha = captcha_for(sample)
+        tiles = split_tiles(sample.image, captcha.rows, captcha.cols)
+        return captcha.decide(np.vstack([backend.predict(tile[None]) for tile in tiles]), sample.label['target'])
+
+    return [evaluate('batched', samples, lambda sample: captcha_for(sample).select(sample.image, sample.label['target']),
+                     tiles_score),
+            evaluate('per_tile', samples, per_tile, tiles_score)]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Captcha solver accuracy and latency over a labeled corpus.")
+    parser.add_argument('kind', choices=sorted(BENCHMARKS))
+    parser.add_argument('--corpus', default=None, help="Corpus directory, defaults to captcha_corpus_dir/<kind>.")
+    parser.add_argument('--output', default=None, help="Report path, defaults to benchmark_dir/captcha-<kind>.json.")
+    args = parser.parse_args(argv)
+
+    corpus_dir = args.corpus or os.path.join(_settings.global_config['captcha_corpus_dir'], args.kind)
+    output = args.output or os.path.join(_settings.global_config['benchmark_dir'], f'captcha-{args.kind}.json')
+    results = BENCHMARKS[args.kind](load_corpus(corpus_dir))
+    print(format_report(results))
+    save_report(output, results)
+    print(f"Report saved to: {output}")
+
+
+if __name__ == '__main__':
+    main()
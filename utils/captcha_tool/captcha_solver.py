@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/20 上午12:20
+@ Author      : Poco Ray
+@ File        : captcha_solver.py
+@ Description : 验证码求解器注册表及统一求解入口.
+                每个求解器分三步: capture(调用线程, 使用driver截图/取文本) -> compute(线程池, 纯计算, 不使用driver)
+                -> act(调用线程, 使用driver点击/拖动/输入). 计算期间测试可继续操作浏览器.
+                同一类型注册多个求解器时按注册顺序依次回退, 每个求解器独立计时和统计.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from selenium.webdriver.remote.webelement import WebElement
+from common.setting import Settings
+from utils.api_tool.deadline import DeadlineExceeded, cap_timeout
+from utils.captcha_tool.behavior_captcha import compile_actions, generate_trajectory
+from utils.captcha_tool.FAQ_captcha import FAQCaptcha
+from utils.captcha_tool.image_captcha import ImageCaptcha, load_backend
+from utils.captcha_tool.image_io import ImageSource, load_image
+from utils.captcha_tool.slider_captcha import SliderCaptcha
+from utils.log_tool.log_control import WARNING
+from utils.perf_tool.action_metrics import percentile
+
+_settings = Settings()
+
+
+class CaptchaSolveError(Exception):
+    """ 所有求解器均未能求解 """
+
+
+class CaptchaSolver:
+    """
+    求解器基类, 子类实现compute, 按需覆盖capture和act.
+    求解器实例在线程间共享, compute中不得使用driver.
+    """
+    name = 'base'
+    required: Tuple[str, ...] = ()  # act等步骤必需的求解器参数
+
+    def validate(self, **kwargs) -> None:
+        """ 提交前检查求解器参数, 缺少必需参数时抛出ValueError """
+        missing = [name for name in self.required if kwargs.get(name) is None]
+        if missing:
+            raise ValueError(f"The '{self.name}' captcha solver needs the arguments: {', '.join(missing)}.")
+
+    def capture(self, case, element: WebElement, **kwargs) -> Any:
+        """ 调用线程: 默认在内存中截取元素图像 """
+        return case.element_image(element)
+
+    def compute(self, captured: Any, **kwargs) -> Any:
+        """ 线程池: 由采集的数据计算答案, 返回None表示无法求解 """
+        raise NotImplementedError
+
+    def act(self, case, element: WebElement, answer: Any, **kwargs) -> None:
+        """ 调用线程: 将答案作用到页面 """
+
+
+# 验证码类型 -> 按回退顺序排列的求解器
+SOLVERS: Dict[str, List[CaptchaSolver]] = {}
+
+
+def register_solver(kind: str):
+    """
+    注册求解器类, 同一类型的求解器按注册顺序回退
+
+    :Usage:
+        @register_solver('text')
+        class MyTextSolver(CaptchaSolver):
+            name = 'my_text'
+            def compute(self, captured, **kwargs): ...
+    """
+    def decorator(cls):
+        SOLVERS.setdefault(kind, []).append(cls())
+        return cls
+    return decorator
+
+
+@dataclass
+class SolverStats:
+    """ 单个求解器的统计, 耗时为compute耗时(秒) """
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def merge(self, other: 'SolverStats') -> None:
+        self.attempts += other.attempts
+        self.successes += other.successes
+        self.failures += other.failures
+        self.timeouts += other.timeouts
+        self.latencies.extend(other.latencies)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'attempts': self.attempts, 'successes': self.successes, 'failures': self.failures,
+                'timeouts': self.timeouts,
+                'median_ms': round(statistics.median(self.latencies) * 1000, 1) if self.latencies else 0.0,
+                'p95_ms': round(percentile(self.latencies, 95) * 1000, 1) if self.latencies else 0.0}
+
+
+class SolverMetrics:
+    """ 进程内的求解器统计, 键为'类型/求解器' """
+
+    def __init__(self):
+        self.worker: str = os.environ.get('PYTEST_XDIST_WORKER', 'master')
+        self._stats: Dict[str, SolverStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, solver: str, outcome: str, elapsed: Optional[float] = None) -> None:
+        """
+        :param kind: 验证码类型
+        :param solver: 求解器名称
+        :param outcome: 'success'、'failure'或'timeout'
+        :param elapsed: compute耗时(秒), 超时为None
+        """
+        with self._lock:
+            stats = self._stats.setdefault(f"{kind}/{solver}", SolverStats())
+            stats.attempts += 1
+            counter = {'success': 'successes', 'failure': 'failures', 'timeout': 'timeouts'}[outcome]
+            setattr(stats, counter, getattr(stats, counter) + 1)
+            if elapsed is not None:
+                stats.latencies.append(elapsed)
+
+    def stats(self) -> Dict[str, SolverStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def export_records(self, output_dir: str) -> Optional[str]:
+        """ 将本进程的统计写入'captcha-solvers-<worker>.json', 没有求解记录时不写入 """
+        stats = self.stats()
+        if not stats:
+            return None
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, f"captcha-solvers-{self.worker}.json")
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({key: {**vars(s)} for key, s in stats.items()}, file, ensure_ascii=False)
+        return file_path
+
+    @staticmethod
+    def export_summary(output_dir: str) -> Dict[str, Dict[str, Any]]:
+        """ 合并所有worker的统计, 写入'captcha-solvers-summary.json' """
+        merged: Dict[str, SolverStats] = {}
+        if os.path.isdir(output_dir):
+            for filename in sorted(os.listdir(output_dir)):
+                if filename.startswith('captcha-solvers-') and filename != 'captcha-solvers-summary.json':
+                    with open(os.path.join(output_dir, filename), 'r', encoding='utf-8') as file:
+                        for key, item in json.load(file).items():
+                            merged.setdefault(key, SolverStats()).merge(SolverStats(**item))
+        summary = {key: stats.to_dict() for key, stats in sorted(merged.items())}
+        if summary:
+            with open(os.path.join(output_dir, 'captcha-solvers-summary.json'), 'w', encoding='utf-8') as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+
+solver_metrics = SolverMetrics()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _solver_executor() -> ThreadPoolExecutor:
+    """ OpenCV、NumPy和OCR推理释放GIL, 线程池即可与测试线程并行 """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = _settings.global_config.get('captcha_solver_workers', 2)
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='captcha')
+    return _executor
+
+
+@dataclass
+class SolveResult:
+    """ 求解结果 """
+    kind: str
+    solver: str
+    answer: Any
+    elapsed: float  # 从开始求解到完成act的耗时(秒)
+
+
+class CaptchaTask:
+    """
+    进行中的求解. 创建时即在调用线程中采集并提交计算, result()等待计算完成后在调用线程中执行act
+
+    :Usage:
+        task = CaptchaTask('text', case, element, prompt="请依次点击【送,公,赶】")
+        ...  # 计算期间继续操作浏览器
+        result = task.result()
+    """
+
+    def __init__(self, kind: str, case, element: WebElement, timeout: Optional[float] = None, **kwargs):
+        """
+        :param kind: 验证码类型, 如：'text'、'slider'、'image'、'faq'、'behavior'
+        :param case: BaseCase实例
+        :param element: 验证码元素
+        :param timeout: 每个求解器的计算超时(秒), 默认取配置'captcha_solve_timeout', 受时间预算限制
+        :param kwargs: 求解器参数
+        """
+        if kind not in SOLVERS:
+            raise ValueError(f"Unknown captcha kind: {kind}, registered kinds: {sorted(SOLVERS)}")
+        for solver in SOLVERS[kind]:  # 缺少参数时在采集和计算之前失败, 不计为求解器失败
+            solver.validate(**kwargs)
+        self.kind = kind
+        self.case = case
+        self.element = element
+        self.timeout = timeout or _settings.global_config.get('captcha_solve_timeout', 30)
+        self.kwargs = kwargs
+        self.errors: List[str] = []
+        self._solvers = list(SOLVERS[kind])
+        self._index = -1
+        self._started = time.perf_counter()
+        self._future: Optional[Future] = None
+        self._running = threading.Event()  # 当前求解器的计算已开始
+        self._compute_started = 0.0
+        self._captured: Any = None
+        self._submitted = 0.0
+        self._dedicated = False  # 有超时的计算仍占用线程池线程时, 后续计算使用独立线程
+        self._start_next()
+
+    @property
+    def solver(self) -> CaptchaSolver:
+        return self._solvers[self._index]
+
+    def _start_next(self) -> bool:
+        """ 采集并提交下一个求解器的计算, 采集失败时继续回退 """
+        while self._index + 1 < len(self._solvers):
+            self._index += 1
+            try:
+                captured = self.solver.capture(self.case, self.element, **self.kwargs)
+            except Exception as e:
+                self._fail('failure', f"capture failed: {e}")
+                continue
+            self._submit(captured)
+            return True
+        self._future = None
+        return False
+
+    def _submit(self, captured: Any) -> None:
+        """ 提交计算到线程池, 或在独立线程中计算 """
+        running = self._running = threading.Event()
+        self._captured = captured
+        args = (self.solver, captured, self.kwargs, running)
+        self._submitted = time.perf_counter()
+        if not self._dedicated:
+            self._future = _solver_executor().submit(self._timed_compute, *args)
+            return
+        future = self._future = Future()
+        threading.Thread(target=self._run_dedicated, args=(future, args), name='captcha-dedicated', daemon=True).start()
+
+    def _run_dedicated(self, future: Future, args: tuple) -> None:
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(self._timed_compute(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _timed_compute(self, solver: CaptchaSolver, captured: Any, kwargs: Dict[str, Any],
+                       running: threading.Event) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        if running is self._running:
+            self._compute_started = start
+        running.set()
+        return solver.compute(captured, **kwargs), time.perf_counter() - start
+
+    def _wait_answer(self) -> Tuple[Any, float]:
+        """
+        等待当前求解器的答案. 超时从计算开始时算起, 不含在线程池中排队的时间;
+        排队超过超时时间时(线程池被其它计算占满), 取消排队改为在独立线程中计算
+        """
+        label = f"captcha:{self.kind}"
+        while not self._running.is_set():
+            queued = time.perf_counter() - self._submitted
+            if self._running.wait(cap_timeout(max(0.0, self.timeout - queued), label)):
+                break
+            cap_timeout(0, label)  # 时间预算用完时抛出DeadlineExceeded
+            if self._future.cancel():
+                self._dedicated = True
+                self._submit(self._captured)
+        wait = max(0.0, self.timeout - (time.perf_counter() - self._compute_started))
+        try:
+            return self._future.result(timeout=cap_timeout(wait, label))
+        except FutureTimeoutError:
+            cap_timeout(0, label)
+            raise
+
+    def _fail(self, outcome: str, message: str, elapsed: Optional[float] = None) -> None:
+        solver_metrics.record(self.kind, self.solver.name, outcome, elapsed)
+        self.errors.append(f"{self.solver.name}: {message}")
+        WARNING.logger.warning(f"Captcha solver '{self.kind}/{self.solver.name}' {outcome}: {message}")
+
+    def done(self) -> bool:
+        """ :return: 当前求解器的计算是否已完成 """
+        return self._future is None or self._future.done()
+
+    def result(self) -> SolveResult:
+        """
+        :return: 求解结果
+        :raise CaptchaSolveError: 所有求解器均失败或超时
+        :raise DeadlineExceeded: 测试或步骤的时间预算已用完
+        """
+        while self._future is not None:
+            try:
+                answer, elapsed = self._wait_answer()
+            except DeadlineExceeded:
+                self._future.cancel()
+                raise
+            except FutureTimeoutError:
+                # 正在运行的计算无法取消, 它继续占用线程池线程, 后续回退改用独立线程, 不在其后排队
+                if not self._future.cancel():
+                    self._dedicated = True
+                self._fail('timeout', f"no answer within {self.timeout}s")
+            except Exception as e:
+                self._fail('failure', str(e))
+            else:
+                if answer is None:
+                    self._fail('failure', "no answer", elapsed)
+                else:
+                    try:
+                        self.solver.act(self.case, self.element, answer, **self.kwargs)
+                    except Exception as e:
+                        self._fail('failure', f"act failed: {e}", elapsed)
+                    else:
+                        solver_metrics.record(self.kind, self.solver.name, 'success', elapsed)
+                        return SolveResult(self.kind, self.solver.name, answer, time.perf_counter() - self._started)
+            self._start_next()
+        raise CaptchaSolveError(f"Failed to solve the '{self.kind}' captcha: {'; '.join(self.errors)}")
+
+
+def _image_size(image) -> Tuple[int, int]:
+    return image.shape[1], image.shape[0]
+
+
+@register_solver('text')
+class TextClickSolver(CaptchaSolver):
+    """ 文字点选: 参数prompt为文字要求(如："请依次点击【送,公,赶】")或targets为文字列表 """
+    name = 'ocr_click'
+
+    def __init__(self):
+        self._captcha = None
+        self._lock = threading.Lock()
+
+    def _text_captcha(self):
+        with self._lock:
+            if self._captcha is None:
+                from utils.captcha_tool.text_captcha import TextCaptcha  # 首次使用时才加载OCR
+                self._captcha = TextCaptcha()
+            return self._captcha
+
+    def validate(self, prompt: Optional[str] = None, targets: Optional[List[str]] = None, **kwargs) -> None:
+        if not prompt and not targets:
+            raise ValueError(f"The '{self.name}' captcha solver needs the arguments: prompt or targets.")
+
+    def compute(self, captured, prompt: Optional[str] = None, targets: Optional[List[str]] = None, **kwargs):
+        captcha = self._text_captcha()
+        targets = targets or captcha.parse_captcha_text(prompt)
+        positions = captcha.recognize_text(captured, targets)
+        if not set(targets).issubset(text for text, _ in positions):
+            return None
+        return positions, targets, _image_size(captured)
+
+    def act(self, case, element, answer, **kwargs):
+        from utils.captcha_tool.text_captcha import TextCaptcha
+        positions, targets, image_size = answer
+        TextCaptcha.click_text_positions(element, positions, targets, image_size)
+
+
+@register_solver('slider')
+class SliderSolver(CaptchaSolver):
+    """
+    滑块: 参数handle为滑块元素, piece为拼图块(元素或图像, 可选).
+    拼图块初始左边缘piece_left(背景图像素)由拼图块元素位置或整条拼图块图片得出, 否则必须传入
+    """
+    name = 'edge_match'
+    required = ('handle',)
+
+    def __init__(self):
+        self.slider = SliderCaptcha()
+
+    def capture(self, case, element, piece=None, **kwargs):
+        piece_offset = None  # 拼图块元素相对背景元素的左偏移(CSS像素)
+        if isinstance(piece, WebElement):
+            piece_offset = piece.rect['x'] - element.rect['x']
+            piece = case.element_image(piece)
+        return case.element_image(element), piece, element.rect['width'], piece_offset
+
+    def compute(self, captured, piece_left: Optional[int] = None, **kwargs):
+        background, piece, element_width, piece_offset = captured
+        match = self.slider.find_gap(background, piece)
+        if piece_left is None and piece_offset is not None:
+            piece_left = round(piece_offset * background.shape[1] / element_width)
+        return self.slider.drag_distance(match, background.shape[1], element_width, piece_left)
+
+    def act(self, case, element, answer, handle: WebElement = None, **kwargs):
+        self.slider.drag(handle, answer)
+
+
+@register_solver('image')
+class ImageTileSolver(CaptchaSolver):
+    """ 图片九宫格: 参数target为目标类别, rows/cols为网格行列数 """
+    name = 'tile_classifier'
+
+    def compute(self, captured, target: str = None, rows: int = 3, cols: int = 3, **kwargs):
+        indices = ImageCaptcha(load_backend(), rows, cols).select(captured, target)
+        return (indices, _image_size(captured)) if indices else None
+
+    def act(self, case, element, answer, rows: int = 3, cols: int = 3, **kwargs):
+        indices, image_size = answer
+        ImageCaptcha(load_backend(), rows, cols).click_tiles(element, indices, image_size)
+
+
+class _FaqSolver(CaptchaSolver):
+    """ 问答: 参数input为答案输入框, knowledge为问答知识库 """
+    required = ('input',)
+
+    def compute(self, captured, knowledge: Optional[Dict[str, str]] = None, **kwargs):
+        return FAQCaptcha(knowledge).solve(captured)
+
+    def act(self, case, element, answer, input: WebElement = None, **kwargs):
+        input.clear()
+        input.send_keys(answer)
+
+
+@register_solver('faq')
+class FaqTextSolver(_FaqSolver):
+    """ 题目为元素文本 """
+    name = 'text'
+
+    def capture(self, case, element, **kwargs):
+        return element.text or element.get_attribute('value') or ''
+
+
+@register_solver('faq')
+class FaqOcrSolver(_FaqSolver):
+    """ 题目为图片时, 先OCR识别文字 """
+    name = 'ocr'
+
+    def compute(self, captured: ImageSource, knowledge: Optional[Dict[str, str]] = None, **kwargs):
+        from utils.captcha_tool.ocr_engine import shared_ocr
+
+        result = shared_ocr().ocr(load_image(captured), cls=True)
+        question = ''.join(line[1][0] for line in (result[0] or []) if line) if result else ''
+        return FAQCaptcha(knowledge).solve(question)
+
+
+@register_solver('behavior')
+class BehaviorClickSolver(CaptchaSolver):
+    """ 行为验证(如"点击完成验证"): 沿类人轨迹移动到元素后点击, 参数start为起点相对元素中心的偏移 """
+    name = 'trajectory_click'
+
+    def capture(self, case, element, **kwargs):
+        return None
+
+    def compute(self, captured, start: Tuple[int, int] = (-160, 60), duration: float = 0.6, **kwargs):
+        return start, generate_trajectory(-start[0], -start[1], duration)
+
+    def act(self, case, element, answer, **kwargs):
+        start, trajectory = answer
+        builder = compile_actions(element.parent, element, trajectory, start=start, press=False)
+        builder.pointer_action.click()
+        builder.perform()
@@ -8,4 +8,280 @@
 @ Solution    : 1. 图像分类算法: 使用卷积神经网络（CNN）等技术来进行图像分类.
                 2. 人工智能: 训练模型识别各种图片内容.
                 3. 人工服务: 有些自动化服务可能会使用人工来解决这些验证码.
+
+                九宫格图片切分为图块后, 所有图块在一次批量推理中完成分类(CPU).
+                分类后端可插拔: ONNX Runtime模型(onnxruntime为可选依赖)或颜色直方图分类器, 每个进程只加载一次.
 """
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from selenium.webdriver.remote.webelement import WebElement
+from common.setting import Settings
+from utils.captcha_tool.captcha_actions import click_offsets, element_offsets
+from utils.captcha_tool.image_io import ImageSource, load_image
+from utils.log_tool.log_control import INFO
+
+_settings = Settings()
+
+
+def split_tiles(image: np.ndarray, rows: int = 3, cols: int = 3, margin: int = 0) -> np.ndarray:
+    """
+    将网格图片切分为等大的图块, 按行优先编号
+
+    :param image: BGR图像
+    :param rows: 行数
+    :param cols: 列数
+    :param margin: 每个图块四周去掉的边框(像素), 用于去除图块间的分隔线
+    :return: N×h×w×3的图块数组
+    """
+    tile_h, tile_w = image.shape[0] // rows, image.shape[1] // cols
+    grid = image[:rows * tile_h, :cols * tile_w].reshape(rows, tile_h, cols, tile_w, -1)
+    tiles = grid.transpose(0, 2, 1, 3, 4).reshape(rows * cols, tile_h, tile_w, -1)
+    if margin:
+        tiles = tiles[:, margin:tile_h - margin, margin:tile_w - margin]
+    return np.ascontiguousarray(tiles)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+# 后端名称 -> 后端工厂, 后端需提供labels属性和predict(tiles) -> N×C概率数组
+BACKENDS: Dict[str, Callable[..., object]] = {}
+
+
+def register_backend(name: str):
+    """ 注册分类后端 """
+    def decorator(factory):
+        BACKENDS[name] = factory
+        return factory
+    return decorator
+
+
+@register_backend('onnx')
+class OnnxBackend:
+    """
+    ONNX Runtime分类模型, 输入为N×3×H×W的RGB图块.
+    模型同名的.json文件描述标签及预处理, 如：{"labels": ["cat", "car"], "input_size": [224, 224]}
+    """
+
+    def __init__(self, model_path: Optional[str] = None, labels: Optional[Sequence[str]] = None,
+                 input_size: Optional[Tuple[int, int]] = None, mean: Sequence[float] = (0.485, 0.456, 0.406),
+                 std: Sequence[float] = (0.229, 0.224, 0.225), threads: Optional[int] = None):
+        """
+        :param model_path: 模型路径, 默认取配置'image_captcha_model'
+        :param labels: 类别标签, 默认取模型描述文件
+        :param input_size: 输入尺寸(height, width), 默认取模型描述文件或模型输入形状
+        :param mean: 归一化均值(RGB)
+        :param std: 归一化标准差(RGB)
+        :param threads: 推理线程数, 默认取配置'image_captcha_threads'
+        """
+        import onnxruntime as ort  # 可选依赖, 只在使用该后端时导入
+
+        model_path = model_path or _settings.global_config['image_captcha_model']
+        meta_path = os.path.splitext(model_path)[0] + '.json'
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as file:
+                meta = json.load(file)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or _settings.global_config.get('image_captcha_threads', 4)
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.labels = list(labels or meta['labels'])
+        self.input_size = tuple(input_size or meta.get('input_size') or model_input.shape[2:4])
+        self.mean = np.array(meta.get('mean', mean), dtype=np.float32).reshape(1, 3, 1, 1)
+        self.std = np.array(meta.get('std', std), dtype=np.float32).reshape(1, 3, 1, 1)
+        self.outputs_probabilities = meta.get('probabilities', False)
+        INFO.logger.info(f"Image captcha model loaded: {model_path} ({len(self.labels)} labels).")
+
+    def predict(self, tiles: np.ndarray) -> np.ndarray:
+        """
+        :param tiles: N×h×w×3的BGR图块
+        :return: N×C概率数组
+        """
+        height, width = self.input_size
+        blob = cv2.dnn.blobFromImages(list(tiles), 1 / 255.0, (width, height), swapRB=True)
+        outputs = self.session.run(None, {self.input_name: (blob - self.mean) / self.std})[0]
+        return outputs if self.outputs_probabilities else softmax(outputs)
+
+
+class HistogramBackend:
+    """
+    色调-饱和度直方图 + 余弦相似度的最近质心分类器, 仅依赖OpenCV/NumPy.
+    适用于按颜色区分的简单图块, 以及无模型时的自测和基准测试.
+    """
+
+    def __init__(self, labels: Sequence[str], centroids: np.ndarray, bins: int = 18, temperature: float = 20.0):
+        """
+        :param labels: 类别标签
+        :param centroids: C×(bins×4)的类别质心
+        :param bins: 色调的分箱数, 饱和度固定为4箱
+        :param temperature: 相似度转换为概率时的放大系数
+        """
+        self.labels = list(labels)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.bins = bins
+        self.temperature = temperature
+
+    def features(self, tiles: np.ndarray) -> np.ndarray:
+        """ :return: N×(bins×4)的色调-饱和度直方图(开方后归一化), 所有图块拼接后一次计算 """
+        count, height, width = tiles.shape[:3]
+        hsv = cv2.cvtColor(np.ascontiguousarray(tiles[..., :3]).reshape(count * height, width, 3), cv2.COLOR_BGR2HSV)
+        hsv = hsv.reshape(count, height * width, 3).astype(np.int64)
+        index = (hsv[..., 0] * self.bins // 180) * 4 + hsv[..., 1] // 64
+        index[hsv[..., 1] < 64] = 0  # 低饱和度像素的色调不稳定, 统一计入一箱
+        index += np.arange(count)[:, None] * self.bins * 4
+        hist = np.bincount(index.ravel(), minlength=count * self.bins * 4).reshape(count, self.bins, 4)
+        # 相邻色调箱互相分摊一半, 颜色略有偏差落入相邻箱时仍相似
+        hist = hist + 0.5 * (np.roll(hist, 1, axis=1) + np.roll(hist, -1, axis=1))
+        hist = np.sqrt(hist.reshape(count, -1).astype(np.float32))
+        return hist / np.maximum(np.linalg.norm(hist, axis=1, keepdims=True), 1e-6)
+
+    @classmethod
+    def fit(cls, tiles_by_label: Dict[str, Sequence[np.ndarray]], bins: int = 18) -> 'HistogramBackend':
+        """
+        由标注图块计算类别质心
+
+        :param tiles_by_label: 标签 -> 图块列表
+        :param bins: 色调的分箱数
+        :return: 分类后端
+        """
+        backend = cls(list(tiles_by_label), np.zeros((0, bins * 4)), bins)
+        centroids = [backend.features(np.stack(tiles)).mean(axis=0) for tiles in tiles_by_label.values()]
+        centroids = np.stack(centroids)
+        backend.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+        return backend
+
+    def save(self, path: str) -> None:
+        np.savez(path, labels=np.array(self.labels), centroids=self.centroids, bins=self.bins)
+
+    @classmethod
+    def load(cls, path: str) -> 'HistogramBackend':
+        data = np.load(path)
+        return cls([str(label) for label in data['labels']], data['centroids'], int(data['bins']))
+
+    def predict(self, tiles: np.ndarray) -> np.ndarray:
+        return softmax(self.features(tiles) @ self.centroids.T * self.temperature)
+
+
+@register_backend('histogram')
+def histogram_backend(path: Optional[str] = None) -> HistogramBackend:
+    """ :param path: HistogramBackend.save保存的质心文件, 默认取配置'image_captcha_model' """
+    return HistogramBackend.load(path or _settings.global_config['image_captcha_model'])
+
+
+_backends: Dict[Tuple[str, str], object] = {}
+_backends_lock = threading.Lock()
+
+
+def load_backend(name: Optional[str] = None, **kwargs):
+    """
+    加载分类后端, 相同参数的后端每个进程只加载一次
+
+    :param name: 后端名称, 默认取配置'image_captcha_backend'
+    :param kwargs: 后端参数, 如：model_path="datas/models/image_captcha.onnx"
+    :return: 分类后端
+    """
+    name = name or _settings.global_config.get('image_captcha_backend', 'onnx')
+    key = (name, json.dumps(kwargs, sort_keys=True, default=str))
+    backend = _backends.get(key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(key)
+            if backend is None:
+                backend = BACKENDS[name](**kwargs)
+                _backends[key] = backend
+    return backend
+
+
+class ImageCaptcha:
+    """
+    图片验证码处理工具
+
+    :Usage:
+        captcha = ImageCaptcha(rows=3, cols=3)
+        indices = captcha.select(self.element_image(grid_element), "car")
+        captcha.click_tiles(grid_element, indices, image_size)
+    """
+
+    def __init__(self, backend=None, rows: int = 3, cols: int = 3, margin: int = 0, threshold: float = 0.3):
+        """
+        :param backend: 分类后端, 默认为load_backend()
+        :param rows: 行数
+        :param cols: 列数
+        :param margin: 每个图块四周去掉的边框(像素)
+        :param threshold: 目标类别的最低概率
+        """
+        self.backend = backend or load_backend()
+        self.rows = rows
+        self.cols = cols
+        self.margin = margin
+        self.threshold = threshold
+
+    def classify(self, image: ImageSource) -> np.ndarray:
+        """
+        :param image: 网格图像
+        :return: N×C概率数组, 所有图块一次批量推理
+        """
+        return self.backend.predict(split_tiles(load_image(image), self.rows, self.cols, self.margin))
+
+    def decide(self, probabilities: np.ndarray, target: str) -> List[int]:
+        """
+        :param probabilities: N×C概率数组
+        :param target: 目标类别
+        :return: 最可能类别为目标且概率不低于阈值的图块编号
+        """
+        column = self.backend.labels.index(target)
+        chosen = (probabilities.argmax(axis=1) == column) & (probabilities[:, column] >= self.threshold)
+        return np.flatnonzero(chosen).tolist()
+
+    def select(self, image: ImageSource, target: str) -> List[int]:
+        """
+        :param image: 网格图像
+        :param target: 目标类别
+        :return: 需要点击的图块编号(行优先, 从0开始)
+        """
+        return self.decide(self.classify(image), target)
+
+    def tile_centers(self, image_size: Tuple[int, int], indices: Sequence[int]) -> List[Tuple[float, float]]:
+        """ :return: 图块中心的图像坐标 """
+        tile_w, tile_h = image_size[0] / self.cols, image_size[1] / self.rows
+        return [((index % self.cols + 0.5) * tile_w, (index // self.cols + 0.5) * tile_h) for index in indices]
+
+    def click_tiles(self, element: WebElement, indices: Sequence[int], image_size: Optional[Tuple[int, int]] = None,
+                    delay: float = 0.3) -> None:
+        """
+        点击图块, 所有点击在一个W3C Actions请求中完成
+
+        :param element: 网格图片元素
+        :param indices: 图块编号
+        :param image_size: 图像尺寸(width, height), 默认与元素尺寸相同
+        :param delay: 点击间隔时间(秒)
+        """
+        if not indices:
+            return
+        size = image_size or (element.rect['width'], element.rect['height'])
+        click_offsets(element, element_offsets(element, self.tile_centers(size, indices), size), pause=delay)
+
+    def solve(self, element: WebElement, image: ImageSource, target: str) -> List[int]:
+        """
+        识别并点击目标图块
+
+        :param element: 网格图片元素
+        :param image: 网格图像, 如：self.element_image(element)
+        :param target: 目标类别
+        :return: 点击的图块编号
+        """
+        image = load_image(image)
+        indices = self.select(image, target)
+        self.click_tiles(element, indices, (image.shape[1], image.shape[0]))
+        return indices
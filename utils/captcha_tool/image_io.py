@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午8:40
+@ Author      : Poco Ray
+@ File        : image_io.py
+@ Description : 验证码图片的内存读取, 截图和data URI直接解码为NumPy数组, 不经过磁盘.
+"""
+import base64
+import os
+from typing import Union
+from urllib.parse import unquote_to_bytes
+import cv2
+import numpy as np
+from common.setting import Settings
+
+_settings = Settings()
+
+ImageSource = Union[str, bytes, np.ndarray]
+
+
+def decode_image(data: bytes, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """
+    解码图片字节流
+
+    :param data: PNG/JPEG等图片字节
+    :param flags: cv2.imdecode标志, 默认BGR彩色
+    :return: 图像数组
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    if image is None:
+        raise ValueError("无法解码图片数据")
+    return image
+
+
+def decode_data_uri(uri: str, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """
+    解码data URI图片, 如：data:image/png;base64,iVBORw0...
+
+    :param uri: data URI
+    :param flags: cv2.imdecode标志
+    :return: 图像数组
+    """
+    header, encoded = uri.split(',', 1)
+    data = base64.b64decode(encoded) if header.endswith(';base64') else unquote_to_bytes(encoded)
+    return decode_image(data, flags)
+
+
+def load_image(source: ImageSource, flags: int = cv2.IMREAD_COLOR) -> np.ndarray:
+    """
+    读取图像, 支持数组、图片字节、data URI和文件路径
+
+    :param source: 图像来源
+    :param flags: cv2.imdecode标志
+    :return: 图像数组, 数组直接返回不复制
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return decode_image(bytes(source), flags)
+    if source.startswith('data:'):
+        return decode_data_uri(source, flags)
+    image = cv2.imread(source, flags)
+    if image is None:
+        raise ValueError(f"无法读取图片: {source}")
+    return image
+
+
+def dump_debug_image(name: str, image: np.ndarray) -> None:
+    """
+    保存调试图像, 仅在配置'captcha_debug'开启时写入'captcha_debug_dir'
+
+    :param name: 文件名, 如：debug_mask.png
+    :param image: 图像数组
+    """
+    if not _settings.global_config.get('captcha_debug', False):
+        return
+    debug_dir = _settings.global_config['captcha_debug_dir']
+    os.makedirs(debug_dir, exist_ok=True)
+    cv2.imwrite(os.path.join(debug_dir, name), image)
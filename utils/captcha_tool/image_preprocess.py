@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午9:50
+@ Author      : Poco Ray
+@ File        : image_preprocess.py
+@ Description : 彩色文字验证码预处理, 多个HSV颜色范围通过一次查找表运算合并为掩码.
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from utils.captcha_tool.image_io import dump_debug_image
+
+
+@dataclass(frozen=True)
+class HsvRange:
+    """ HSV颜色范围, 上下界均包含, OpenCV的H取值0-179 """
+    name: str
+    lower: Tuple[int, int, int]
+    upper: Tuple[int, int, int]
+
+
+# 默认颜色范围, 针对目标站点验证码中的文字颜色调整
+DEFAULT_HSV_RANGES: Tuple[HsvRange, ...] = (
+    HsvRange('brown', (10, 40, 40), (20, 255, 200)),  # 褐色(如"叫"字)
+    HsvRange('cyan', (80, 40, 40), (100, 255, 255)),  # 青色(如"眼"字)
+    HsvRange('green', (35, 40, 40), (75, 255, 255)),  # 绿色(如"知"字)
+    HsvRange('purple', (130, 40, 40), (170, 255, 255)),  # 紫色(如"神"字)
+    HsvRange('white', (0, 0, 200), (180, 30, 255)),  # 白色文字
+)
+
+
+def build_hsv_lut(ranges: Sequence[HsvRange]) -> np.ndarray:
+    """
+    构建三通道查找表: 第i个颜色范围对应第i位, 每个通道的表项为该通道值落在哪些范围内的位掩码.
+    像素属于某个范围, 当且仅当三个通道的位掩码按位与后该位仍为1.
+
+    :param ranges: 颜色范围, 最多8个
+    :return: 256x1x3的uint8查找表, 用于cv2.LUT
+    """
+    if not 0 < len(ranges) <= 8:
+        raise ValueError("HSV ranges must contain 1 to 8 entries")
+    values = np.arange(256)
+    lut = np.zeros((256, 1, 3), dtype=np.uint8)
+    for bit, hsv_range in enumerate(ranges):
+        for channel in range(3):
+            inside = (values >= hsv_range.lower[channel]) & (values <= hsv_range.upper[channel])
+            lut[inside, 0, channel] |= np.uint8(1 << bit)
+    return lut
+
+
+def hsv_mask(hsv: np.ndarray, lut: np.ndarray) -> np.ndarray:
+    """
+    一次查找表运算得到所有颜色范围的并集掩码
+
+    :param hsv: HSV图像
+    :param lut: build_hsv_lut的返回值
+    :return: 掩码, 命中为255
+    """
+    bits = cv2.LUT(hsv, lut)
+    hue_bits, sat_bits, val_bits = cv2.split(bits)
+    combined = cv2.bitwise_and(cv2.bitwise_and(hue_bits, sat_bits), val_bits)
+    return cv2.compare(combined, 0, cv2.CMP_GT)
+
+
+def select_scale(height: int, target_height: int = 360, max_scale: float = 3.0) -> float:
+    """
+    根据输入尺寸选择放大倍数, 小图放大到目标高度, 大图不再放大
+
+    :param height: 图像高度
+    :param target_height: 放大后的目标高度
+    :param max_scale: 最大放大倍数
+    :return: 放大倍数, 不小于1
+    """
+    return float(min(max_scale, max(1.0, target_height / max(height, 1))))
+
+
+class CaptchaPreprocessor:
+    """
+    彩色文字验证码预处理: 放大 -> HSV多颜色掩码 -> CLAHE增强 -> Otsu二值化 -> 降噪
+
+    :Usage:
+        preprocessor = CaptchaPreprocessor()
+        binary = preprocessor(image)
+    """
+
+    def __init__(self, ranges: Sequence[HsvRange] = DEFAULT_HSV_RANGES, scale: Optional[float] = None,
+                 target_height: int = 360, max_scale: float = 3.0):
+        """
+        :param ranges: 文字颜色范围
+        :param scale: 固定放大倍数, None时根据输入尺寸自动选择
+        :param target_height: 自动放大的目标高度
+        :param max_scale: 自动放大的最大倍数
+        """
+        self.ranges = tuple(ranges)
+        self.lut = build_hsv_lut(self.ranges)
+        self.scale = scale
+        self.target_height = target_height
+        self.max_scale = max_scale
+        self._clahe = cv2.createCLAHE(clipLimit=3.5, tileGridSize=(4, 4))
+        self._kernel = np.ones((2, 2), np.uint8)
+
+    def scale_for(self, image: np.ndarray) -> float:
+        """ :return: 该图像使用的放大倍数, 识别结果的坐标需除以该倍数换算回原图 """
+        return self.scale or select_scale(image.shape[0], self.target_height, self.max_scale)
+
+    def __call__(self, image: np.ndarray, scale: Optional[float] = None) -> np.ndarray:
+        """
+        :param image: BGR图像
+        :param scale: 本次使用的放大倍数, 默认由scale_for选择
+        :return: 二值图像
+        """
+        height, width = image.shape[:2]
+        scale = scale or self.scale_for(image)
+        if scale != 1.0:
+            image = cv2.resize(image, (int(width * scale), int(height * scale)))
+
+        mask = hsv_mask(cv2.cvtColor(image, cv2.COLOR_BGR2HSV), self.lut)
+        result = cv2.bitwise_and(image, image, mask=mask)
+
+        # 转换为灰度图并增强对比度, 再使用Otsu二值化
+        enhanced = self._clahe.apply(cv2.cvtColor(result, cv2.COLOR_BGR2GRAY))
+        _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # 降噪及形态学处理
+        binary = cv2.medianBlur(binary, 3)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, self._kernel, iterations=1)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, self._kernel, iterations=1)
+
+        # 保存调试图像(需开启'captcha_debug')
+        dump_debug_image('debug_original.png', image)
+        dump_debug_image('debug_mask.png', mask)
+        dump_debug_image('debug_result.png', result)
+        dump_debug_image('debug_binary.png', binary)
+        return binary
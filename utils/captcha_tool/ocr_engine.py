@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/19 下午9:10
+@ Author      : Poco Ray
+@ File        : ocr_engine.py
+@ Description : 共享的常驻OCR引擎, 模型每个进程只加载一次, 或由sidecar进程加载后通过Unix socket供xdist worker共用.
+@ Usage       : python -m utils.captcha_tool.ocr_engine serve --socket /tmp/uiatf-ocr.sock --threads 4
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from common.setting import Settings
+from utils.log_tool.log_control import INFO, ERROR
+
+_settings = Settings()
+
+# 环境变量: sidecar的socket路径, 由主进程在启动worker前设置
+SOCKET_ENV = 'UIATF_OCR_SOCKET'
+
+# PaddleOCR参数, 降低检测阈值以适应验证码中的扭曲文字
+DEFAULT_OCR_OPTIONS = {
+    'use_angle_cls': True,
+    'lang': 'ch',
+    'show_log': False,
+    'det_db_thresh': 0.3,  # 降低检测阈值
+    'det_db_box_thresh': 0.3,  # 降低框检测阈值
+    'det_db_unclip_ratio': 1.6,  # 调整文本框扩张比例
+}
+
+
+def _to_json(value: Any) -> Any:
+    """ 将OCR结果中的NumPy类型和元组转换为JSON类型 """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+
+class OcrEngine:
+    """
+    进程内OCR引擎, 仅使用CPU, 预测器非线程安全, 调用按锁串行执行
+
+    :Usage:
+        engine = get_ocr_engine()
+        result = engine.ocr(image)
+        future = engine.submit(image)
+        results = engine.ocr_batch([image1, image2])
+    """
+
+    def __init__(self, cpu_threads: Optional[int] = None, **options):
+        """
+        :param cpu_threads: 推理线程数, 默认取配置'ocr_cpu_threads'
+        :param options: 覆盖的PaddleOCR参数
+        """
+        from paddleocr import PaddleOCR  # 模型加载耗时数秒, 只在真正需要时导入
+
+        self.cpu_threads = cpu_threads or _settings.global_config.get('ocr_cpu_threads', 4)
+        started = time.perf_counter()
+        self._ocr = PaddleOCR(**{**DEFAULT_OCR_OPTIONS, 'use_gpu': False, 'cpu_threads': self.cpu_threads, **options})
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        INFO.logger.info(f"OCR engine loaded in {time.perf_counter() - started:.2f}s (cpu_threads={self.cpu_threads}).")
+
+    def ocr(self, image: Union[np.ndarray, str], **kwargs) -> List[Any]:
+        """
+        :param image: 图像数组(BGR)或图像路径
+        :param kwargs: PaddleOCR.ocr参数, 如：cls=True
+        :return: PaddleOCR识别结果
+        """
+        with self._lock:
+            return self._ocr.ocr(image, **kwargs)
+
+    def ocr_batch(self, images: Sequence[Union[np.ndarray, str]], **kwargs) -> List[List[Any]]:
+        """ 批量识别, 一次加锁完成整批 """
+        with self._lock:
+            return [self._ocr.ocr(image, **kwargs) for image in images]
+
+    def submit(self, image: Union[np.ndarray, str], **kwargs) -> Future:
+        """ 异步识别, 返回Future """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr')
+        return self._executor.submit(self.ocr, image, **kwargs)
+
+
+_engine: Optional[OcrEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OcrEngine:
+    """ :return: 进程内单例OCR引擎, 首次调用时加载模型 """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = OcrEngine()
+    return _engine
+
+
+# ---------- Sidecar协议: 4字节长度 + JSON头, 之后依次为各图像的原始字节 ----------
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view, received = memoryview(buffer), 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("OCR socket closed")
+        received += count
+    return buffer
+
+
+def send_message(sock: socket.socket, header: Dict[str, Any], images: Sequence[np.ndarray] = ()) -> None:
+    images = [np.ascontiguousarray(image) for image in images]
+    header = {**header, 'images': [{'shape': image.shape, 'dtype': str(image.dtype)} for image in images]}
+    payload = json.dumps(header).encode('utf-8')
+    sock.sendall(struct.pack('!I', len(payload)) + payload)
+    for image in images:
+        sock.sendall(memoryview(image).cast('B'))
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict[str, Any], List[np.ndarray]]:
+    size = struct.unpack('!I', _recv_exact(sock, 4))[0]
+    header = json.loads(_recv_exact(sock, size).decode('utf-8'))
+    images = []
+    for spec in header.pop('images', []):
+        dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+        data = _recv_exact(sock, int(np.prod(shape)) * dtype.itemsize)
+        images.append(np.frombuffer(data, dtype=dtype).reshape(shape))
+    return header, images
+
+
+class OcrServer:
+    """
+    OCR sidecar, 加载一次模型后通过Unix socket为多个xdist worker提供识别
+
+    :Usage:
+        server = OcrServer("/tmp/uiatf-ocr.sock").start()
+        ...
+        server.stop()
+    """
+
+    def __init__(self, socket_path: str, engine: Optional[Any] = None):
+        """
+        :param socket_path: Unix socket路径
+        :param engine: OCR引擎, 默认为进程内单例
+        """
+        self.socket_path = socket_path
+        self.engine = engine or get_ocr_engine()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        header, images = recv_message(self.request)
+                    except ConnectionError:
+                        return
+                    try:
+                        results = server.engine.ocr_batch(images, **header.get('kwargs', {}))
+                        send_message(self.request, {'results': _to_json(results)})
+                    except Exception as e:
+                        send_message(self.request, {'error': str(e)})
+
+        self._server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        self._server.daemon_threads = True
+        os.chmod(socket_path, 0o600)
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> 'OcrServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='ocr-sidecar', daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """ 停止start()启动的后台线程并关闭socket """
+        self._server.shutdown()
+        self.close()
+
+    def close(self) -> None:
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class OcrClient:
+    """
+    OCR sidecar客户端, 与OcrEngine接口一致
+
+    :Usage:
+        client = OcrClient("/tmp/uiatf-ocr.sock")
+        result = client.ocr(image)
+    """
+
+    def __init__(self, socket_path: str, connect_timeout: float = 60, timeout: Optional[float] = None):
+        """
+        :param socket_path: Unix socket路径
+        :param connect_timeout: 等待sidecar加载模型并开始监听的时间(秒)
+        :param timeout: 单次请求的读写超时(秒), 默认取配置'captcha_solve_timeout', 避免sidecar卡住时调用线程永久阻塞
+        """
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+        self.timeout = timeout or _settings.global_config.get('captcha_solve_timeout', 30)
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _connection(self) -> socket.socket:
+        """ 每个线程一个长连接 """
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            return sock
+        end = time.monotonic() + self.connect_timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if time.monotonic() >= end:
+                    raise
+                time.sleep(0.2)
+        self._local.sock = sock
+        return sock
+
+    def ocr_batch(self, images: Sequence[np.ndarray], **kwargs) -> List[List[Any]]:
+        sock = self._connection()
+        try:
+            send_message(sock, {'kwargs': kwargs}, images)
+            header, _ = recv_message(sock)
+        except (ConnectionError, OSError) as e:
+            sock.close()  # 超时后连接中残留未读的响应, 不能复用
+            self._local.sock = None
+            if isinstance(e, socket.timeout):
+                raise TimeoutError(f"OCR sidecar did not answer in {self.timeout}s.") from e
+            raise
+        if 'error' in header:
+            raise RuntimeError(f"OCR sidecar error: {header['error']}")
+        return header['results']
+
+    def ocr(self, image: np.ndarray, **kwargs) -> List[Any]:
+        return self.ocr_batch([image], **kwargs)[0]
+
+    def submit(self, image: np.ndarray, **kwargs) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='ocr-client')
+        return self._executor.submit(self.ocr, image, **kwargs)
+
+
+def default_socket_path() -> str:
+    """ :return: sidecar的socket路径, 包含主进程pid, 避免同机多次运行冲突 """
+    return os.path.join(tempfile.gettempdir(), f"uiatf-ocr-{os.getpid()}.sock")
+
+
+def sidecar_supported() -> bool:
+    """ :return: 当前平台是否支持Unix socket """
+    return hasattr(socket, 'AF_UNIX') and hasattr(socketserver, 'ThreadingUnixStreamServer')
+
+
+_client: Optional[OcrClient] = None
+
+
+def shared_ocr() -> Union[OcrEngine, OcrClient]:
+    """
+    :return: sidecar可用时返回其客户端, 否则返回进程内单例引擎
+    """
+    global _client
+    socket_path = os.environ.get(SOCKET_ENV)
+    if socket_path and sidecar_supported():
+        if _client is None or _client.socket_path != socket_path:
+            _client = OcrClient(socket_path)
+        return _client
+    return get_ocr_engine()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Shared OCR sidecar.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help="Load the OCR models and serve them over a Unix socket.")
+    serve_parser.add_argument('--socket', required=True)
+    serve_parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    global _engine
+    _engine = OcrEngine(cpu_threads=args.threads)
+    server = OcrServer(args.socket, _engine)
+    INFO.logger.info(f"OCR sidecar listening on: {args.socket}.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        ERROR.logger.error(f"OCR sidecar stopped: {str(e)}")
+        raise
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,156 @@
 @ Description : 滑块验证码, 需要用户通过滑动拼图、拖动滑块等方式验证.
 @ Solution    : 1. 自动化脚本: 使用Selenium等工具模拟用户行为的脚本进行滑动操作.
                 2. 图像识别与计算机视觉: 分析前后图片的变化，计算出滑块需要移动的距离.
+
+                缺口定位: Canny边缘检测 + 模板匹配(cv2.matchTemplate), 图像全程在内存中处理.
+                拖动: 类人轨迹(behavior_captcha)编码为一个W3C Actions请求, 由浏览器执行.
 """
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from selenium.webdriver.remote.webelement import WebElement
+from utils.captcha_tool.behavior_captcha import BehaviorCaptcha
+from utils.captcha_tool.image_io import ImageSource, load_image, dump_debug_image
+
+
+@dataclass
+class GapMatch:
+    """ 缺口位置(背景图像素)及匹配得分 """
+    x: int
+    y: int
+    score: float
+    piece_left: Optional[int] = None  # 整条拼图块图片给出的拼图块初始左边缘
+
+
+def crop_piece(piece: np.ndarray) -> Tuple[np.ndarray, int, int]:
+    """
+    按透明通道裁剪拼图块, 拼图块图片常为带透明背景的整条图
+
+    :param piece: 拼图块图像, BGRA或BGR
+    :return: 裁剪后的图像, 及其在原图中的左、上位置
+    """
+    if piece.ndim == 3 and piece.shape[2] == 4:
+        ys, xs = np.nonzero(piece[:, :, 3] > 0)
+        if xs.size:
+            left, top = int(xs.min()), int(ys.min())
+            return piece[top:ys.max() + 1, left:xs.max() + 1], left, top
+    return piece, 0, 0
 
 
 class SliderCaptcha:
-    pass
+    """
+    滑块验证码处理工具
+
+    :Usage:
+        slider = SliderCaptcha()
+        match = slider.find_gap(background, piece)
+        distance = slider.drag_distance(match, background.shape[1], background_element.rect['width'], piece_left)
+        slider.drag(handle_element, distance)
+    """
+
+    def __init__(self, canny_low: int = 100, canny_high: int = 200, blur: int = 3,
+                 behavior: Optional[BehaviorCaptcha] = None):
+        """
+        :param canny_low: Canny低阈值
+        :param canny_high: Canny高阈值
+        :param blur: 边缘检测前的高斯模糊核大小, 0为不模糊
+        :param behavior: 拖动轨迹生成器, 默认轻微超调后回拉
+        """
+        self.canny_low = canny_low
+        self.canny_high = canny_high
+        self.blur = blur
+        self.behavior = behavior or BehaviorCaptcha(overshoot=0.04, curvature=0.05, jitter=0.4)
+
+    def edges(self, image: np.ndarray) -> np.ndarray:
+        """ :return: 边缘图 """
+        gray = image if image.ndim == 2 else cv2.cvtColor(image[:, :, :3], cv2.COLOR_BGR2GRAY)
+        if self.blur:
+            gray = cv2.GaussianBlur(gray, (self.blur, self.blur), 0)
+        return cv2.Canny(gray, self.canny_low, self.canny_high)
+
+    def find_gap(self, background: ImageSource, piece: Optional[ImageSource] = None, gap_size: int = 50,
+                 search_from: int = 0) -> GapMatch:
+        """
+        定位缺口: 有拼图块时用其轮廓匹配背景边缘图, 否则用gap_size大小的方框轮廓匹配
+
+        :param background: 背景图像
+        :param piece: 拼图块图像, 支持透明通道
+        :param gap_size: 无拼图块时缺口的边长(像素)
+        :param search_from: 从该横坐标开始搜索, 用于跳过拼图块初始位置
+        :return: 缺口位置
+        """
+        background = load_image(background)
+        band_top, band_bottom, pad, piece_left = 0, background.shape[0], 0, None
+        if piece is not None:
+            strip = load_image(piece, cv2.IMREAD_UNCHANGED)
+            piece, left, top = crop_piece(strip)
+            if strip.shape[1] == background.shape[1] and piece.shape[1] < strip.shape[1]:
+                piece_left = left  # 与背景等宽的整条图片给出了拼图块的初始位置
+            if piece.ndim == 3 and piece.shape[2] == 4:
+                # 透明通道的边缘即拼图块轮廓, 不受块内纹理干扰, 四周补边使轮廓完整
+                pad = 2
+                template = self.edges(cv2.copyMakeBorder(piece[:, :, 3], pad, pad, pad, pad, cv2.BORDER_CONSTANT))
+            else:
+                template = self.edges(piece)
+            if top:  # 整条拼图图片给出了缺口所在的行
+                band_top = max(0, top - 2 * pad - 2)
+                band_bottom = min(background.shape[0], top + piece.shape[0] + 2 * pad + 2)
+        else:
+            template = np.zeros((gap_size, gap_size), dtype=np.uint8)
+            cv2.rectangle(template, (0, 0), (gap_size - 1, gap_size - 1), 255, 2)
+
+        edges = self.edges(background)[band_top:band_bottom, search_from:]
+        result = cv2.matchTemplate(edges, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(result)
+        dump_debug_image('slider_edges.png', edges)
+        return GapMatch(x + search_from + pad, y + band_top + pad, float(score), piece_left)
+
+    @staticmethod
+    def drag_distance(match: GapMatch, image_width: int, element_width: float,
+                      piece_left: Optional[int] = None) -> int:
+        """
+        缺口位置换算为拖动距离(CSS像素), 拖动距离为缺口与拼图块初始位置之差
+
+        :param match: 缺口位置
+        :param image_width: 背景图像宽度(像素)
+        :param element_width: 背景元素宽度(CSS像素)
+        :param piece_left: 拼图块初始左边缘(背景图像素), 默认取整条拼图块图片给出的位置
+        :return: 拖动距离
+        :raise ValueError: 拼图块初始位置未知
+        """
+        if piece_left is None:
+            piece_left = match.piece_left
+        if piece_left is None:
+            raise ValueError("The initial left edge of the slider piece is unknown, "
+                             "pass piece_left, the piece element or a full-width piece strip.")
+        return round((match.x - piece_left) * element_width / image_width)
+
+    def drag(self, handle: WebElement, distance: float, duration: float = 0.8) -> None:
+        """
+        按住滑块沿类人轨迹拖动, 整条轨迹编码为一个W3C Actions请求
+
+        :param handle: 滑块元素
+        :param distance: 拖动距离(CSS像素)
+        :param duration: 拖动耗时(秒)
+        """
+        self.behavior.drag(handle, distance, 0, duration)
+
+    def solve(self, background_element: WebElement, handle: WebElement, background: ImageSource,
+              piece: Optional[ImageSource] = None, piece_left: Optional[int] = None, **kwargs) -> int:
+        """
+        定位缺口并拖动滑块
+
+        :param background_element: 背景图元素, 用于换算CSS像素
+        :param handle: 滑块元素
+        :param background: 背景图像, 如：self.element_image(background_element)
+        :param piece: 拼图块图像
+        :param piece_left: 拼图块初始左边缘(背景图像素), 整条拼图块图片时可省略
+        :param kwargs: find_gap的其他参数
+        :return: 拖动距离(CSS像素)
+        """
+        background = load_image(background)
+        match = self.find_gap(background, piece, **kwargs)
+        distance = self.drag_distance(match, background.shape[1], background_element.rect['width'], piece_left)
+        self.drag(handle, distance)
+        return distance
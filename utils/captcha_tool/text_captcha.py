@@ -16,187 +16,244 @@
 
                 4. 手动输入或人机交互: 使用自动化工具截取验证码图片并显示给用户, 用户手动输入识别结果，程序继续执行.
                     技术栈：Python + pyautogui.
+
+                点击由浏览器通过W3C Actions执行(captcha_actions), 支持无头模式和并行浏览器.
 """
 import cv2
+import hashlib
 import numpy as np
-from paddleocr import PaddleOCR
-import pyautogui
-import time
+import threading
 import re
-import os
-from typing import List, Tuple
-from common.setting import ensure_path_sep
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Sequence, Tuple
+from common.setting import Settings, ensure_path_sep
+from selenium.webdriver.remote.webelement import WebElement
+from utils.captcha_tool.captcha_actions import click_offsets, element_offsets
+from utils.captcha_tool.image_io import ImageSource, load_image, dump_debug_image
+from utils.captcha_tool.image_preprocess import DEFAULT_HSV_RANGES, CaptchaPreprocessor, HsvRange
+from utils.captcha_tool.ocr_engine import shared_ocr
+
+_settings = Settings()
+
+TextPositions = List[Tuple[str, Tuple[int, int]]]
+
+
+@dataclass(frozen=True)
+class OcrStrategy:
+    """ OCR策略: 是否预处理及放大倍数, scale为None时根据图像尺寸自动选择 """
+    name: str
+    preprocess: bool = True
+    scale: Optional[float] = None
+
+
+# 默认策略链, 按顺序尝试, 找到足够的目标文字后提前结束
+DEFAULT_STRATEGIES: Tuple[OcrStrategy, ...] = (
+    OcrStrategy('preprocessed'),
+    OcrStrategy('original', preprocess=False, scale=1.0),
+    OcrStrategy('preprocessed@3x', scale=3.0),
+    OcrStrategy('original@2x', preprocess=False, scale=2.0),
+)
+
+
+def image_digest(image: np.ndarray) -> str:
+    """ :return: 图像内容的哈希, 作为识别结果缓存的键 """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.shape}{image.dtype}".encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+class OcrResultCache:
+    """ 线程安全的LRU识别结果缓存, 同一验证码图片在重试时重复出现, 命中后不再运行OCR """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, TextPositions]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[TextPositions]:
+        with self._lock:
+            positions = self._entries.get(key)
+            if positions is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(positions)
+
+    def put(self, key: Hashable, positions: TextPositions) -> None:
+        with self._lock:
+            self._entries[key] = list(positions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class TextCaptcha:
     """文本验证码处理工具"""
 
-    def __init__(self):
-        """初始化OCR引擎"""
-        self.ocr = PaddleOCR(
-            use_angle_cls=True,
-            lang='ch',
-            show_log=True,  # 日志信息
-            det_db_thresh=0.3,  # 降低检测阈值
-            det_db_box_thresh=0.3,  # 降低框检测阈值
-            det_db_unclip_ratio=1.6  # 调整文本框扩张比例
-        )
+    # 所有实例共享的识别结果缓存
+    result_cache = OcrResultCache(_settings.global_config.get('ocr_cache_size', 128))
 
-    def recognize_text(self, image_path: str) -> List[Tuple[str, Tuple[int, int]]]:
+    def __init__(self, hsv_ranges: Sequence[HsvRange] = DEFAULT_HSV_RANGES,
+                 strategies: Sequence[OcrStrategy] = DEFAULT_STRATEGIES, ocr=None):
         """
-        优化的文字识别函数
+        使用共享的常驻OCR引擎(进程内单例或sidecar), 不再每个实例加载一次模型
 
-        :param image_path: 图像路径
-        :return: 文字和位置信息列表，如：[('送', (100, 200)), ('公', (200, 300)), ('赶', (300, 400))]
+        :param hsv_ranges: 文字颜色范围, 默认为DEFAULT_HSV_RANGES
+        :param strategies: OCR策略链, 默认为DEFAULT_STRATEGIES
+        :param ocr: OCR引擎, 默认为shared_ocr()
         """
-        try:
-            # 读取图像
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"无法读取图片: {image_path}")
-
-            # 图像预处理
-            processed_image = self._preprocess_image(image)
-
-            # 保存预处理后的图像用于调试
-            debug_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'datas', 'debug')
-            os.makedirs(debug_dir, exist_ok=True)
-            processed_path = os.path.join(debug_dir, 'processed.png')
-            cv2.imwrite(processed_path, processed_image)
-
-            # OCR识别，使用简化的参数
-            result = self.ocr.ocr(
-                processed_path,
-                cls=True,
-                det=True,
-                rec=True
-            )
-
-            if not result or not result[0]:
-                # 如果识别失败，尝试使用原始图像
-                result = self.ocr.ocr(
-                    image_path,
-                    cls=True,
-                    det=True,
-                    rec=True
-                )
-
-            if not result or not result[0]:
-                return []
-
-            # 提取文字和位置信息
-            text_positions = []
-            for line in result[0]:
-                if not line:
-                    continue
-
-                box = line[0]
-                text = line[1][0]
-                confidence = float(line[1][1])
-
-                if confidence < 0.3:  # 降低置信度阈值
-                    continue
-
-                # 计算中心点
-                center_x = int((box[0][0] + box[2][0]) / 2)
-                center_y = int((box[0][1] + box[2][1]) / 2)
-
-                # 对单个汉字进行处理
-                if len(text) == 1 and '\u4e00' <= text <= '\u9fff':
-                    text_positions.append((text, (center_x, center_y)))
-
-                # 处理多字符文本
-                elif len(text) > 1:
-                    char_width = (box[2][0] - box[0][0]) / len(text)
-                    for i, char in enumerate(text):
-                        if '\u4e00' <= char <= '\u9fff':
-                            char_x = int(box[0][0] + char_width * (i + 0.5))
-                            char_y = center_y
-                            text_positions.append((char, (char_x, char_y)))
-
-            return text_positions
+        self.ocr = ocr or shared_ocr()
+        self.preprocessor = CaptchaPreprocessor(hsv_ranges)
+        self.strategies = tuple(strategies)
+        self.last_strategies: List[str] = []  # 最近一次识别实际运行的策略
+
+    def recognize_text(self, image: ImageSource, targets: Optional[Sequence[str]] = None,
+                       use_cache: bool = True) -> TextPositions:
+        """
+        按策略链识别文字, 图像全程在内存中处理.
+        指定目标文字时, 全部目标找到后提前结束; 否则在第一个识别出文字的策略后结束.
 
+        :param image: 图像数组(BGR)、图片字节、data URI或图像路径
+        :param targets: 需要点击的文字, 如：['送', '公', '赶']
+        :param use_cache: 是否使用识别结果缓存
+        :return: 文字和位置信息列表(原图坐标)，如：[('送', (100, 200)), ('公', (200, 300)), ('赶', (300, 400))]
+        """
+        try:
+            image = load_image(image)
         except Exception as e:
             print(f"识别文字失败: {str(e)}")
             return []
 
+        key = (image_digest(image), tuple(targets or ()), self.preprocessor.ranges, self.strategies)
+        if use_cache:
+            cached = self.result_cache.get(key)
+            if cached is not None:
+                self.last_strategies = []
+                return cached
+
+        text_positions: TextPositions = []
+        found = set()
+        tried = set()
+        failed = False
+        self.last_strategies = []
+        for strategy in self.strategies:
+            scale = strategy.scale or self.preprocessor.scale_for(image)
+            if (strategy.preprocess, scale) in tried:
+                continue
+            tried.add((strategy.preprocess, scale))
+            self.last_strategies.append(strategy.name)
+            try:
+                positions = self._run_strategy(image, strategy, scale)
+            except Exception as e:
+                print(f"识别文字失败({strategy.name}): {str(e)}")
+                failed = True
+                continue
+            for text, position in positions:
+                if text not in found:
+                    found.add(text)
+                    text_positions.append((text, position))
+            if (found.issuperset(targets) if targets else found):
+                break
 
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
+        # 找到全部目标文字时缓存; 有策略异常(如OCR服务暂时不可用)或未识别出文字时不缓存, 重试时重新识别
+        complete = bool(targets) and found.issuperset(targets)
+        if use_cache and (complete or (text_positions and not failed)):
+            self.result_cache.put(key, text_positions)
+        return text_positions
+
+    def run_strategy(self, image: np.ndarray, strategy: OcrStrategy) -> TextPositions:
         """
-        优化的图像预处理，专门处理彩色文字验证码
+        运行单个OCR策略
+
+        :param image: 图像数组(BGR)
+        :param strategy: OCR策略
+        :return: 文字和位置信息列表(原图坐标), 识别失败时为空
         """
         try:
-            # 调整图像大小以提高清晰度
-            height, width = image.shape[:2]
-            scale = 3.0  # 进一步增加放大比例
-            image = cv2.resize(image, (int(width * scale), int(height * scale)))
-            
-            # 转换到HSV空间以更好地处理彩色
-            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            
-            # 创建多个颜色掩码，针对性调整每种颜色的范围
-            masks = []
-            
-            # 褐色范围（针对"叫"字）
-            lower_brown = np.array([10, 40, 40])
-            upper_brown = np.array([20, 255, 200])
-            masks.append(cv2.inRange(hsv, lower_brown, upper_brown))
-            
-            # 青色范围（针对"眼"字）
-            lower_cyan = np.array([80, 40, 40])
-            upper_cyan = np.array([100, 255, 255])
-            masks.append(cv2.inRange(hsv, lower_cyan, upper_cyan))
-            
-            # 绿色范围（针对"知"字）
-            lower_green = np.array([35, 40, 40])
-            upper_green = np.array([75, 255, 255])
-            masks.append(cv2.inRange(hsv, lower_green, upper_green))
-            
-            # 紫色范围（针对"神"字）
-            lower_purple = np.array([130, 40, 40])
-            upper_purple = np.array([170, 255, 255])
-            masks.append(cv2.inRange(hsv, lower_purple, upper_purple))
-            
-            # 白色范围（可选，用于识别白色文字）
-            lower_white = np.array([0, 0, 200])
-            upper_white = np.array([180, 30, 255])
-            masks.append(cv2.inRange(hsv, lower_white, upper_white))
-
-            # 合并所有颜色掩码
-            final_mask = np.zeros_like(masks[0])
-            for mask in masks:
-                final_mask = cv2.bitwise_or(final_mask, mask)
-            
-            # 应用掩码到原始图像
-            result = cv2.bitwise_and(image, image, mask=final_mask)
-            
-            # 转换为灰度图并增强对比度
-            gray = cv2.cvtColor(result, cv2.COLOR_BGR2GRAY)
-            clahe = cv2.createCLAHE(clipLimit=3.5, tileGridSize=(4,4))  # 调整对比度参数
-            enhanced = clahe.apply(gray)
-            
-            # 使用Otsu's二值化方法
-            _, binary = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # 降噪处理
-            binary = cv2.medianBlur(binary, 3)
-            
-            # 形态学操作改进
-            kernel = np.ones((2,2), np.uint8)
-            binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
-            binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=1)
-            
-            # 保存调试图像
-            debug_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'datas', 'debug')
-            os.makedirs(debug_dir, exist_ok=True)
-            
-            cv2.imwrite(os.path.join(debug_dir, 'debug_original.png'), image)
-            cv2.imwrite(os.path.join(debug_dir, 'debug_mask.png'), final_mask)
-            cv2.imwrite(os.path.join(debug_dir, 'debug_result.png'), result)
-            cv2.imwrite(os.path.join(debug_dir, 'debug_binary.png'), binary)
-            
-            return binary
-            
+            return self._run_strategy(image, strategy, strategy.scale or self.preprocessor.scale_for(image))
+        except Exception as e:
+            print(f"识别文字失败({strategy.name}): {str(e)}")
+            return []
+
+    def _run_strategy(self, image: np.ndarray, strategy: OcrStrategy, scale: float) -> TextPositions:
+        """ 运行单个OCR策略, 识别异常向上抛出 """
+        if strategy.preprocess:
+            processed_image = self._preprocess_image(image, scale)
+            dump_debug_image(f'processed_{strategy.name}.png', processed_image)
+            if processed_image.ndim == 2:
+                processed_image = cv2.cvtColor(processed_image, cv2.COLOR_GRAY2BGR)
+        elif scale != 1.0:
+            processed_image = cv2.resize(image, (int(image.shape[1] * scale), int(image.shape[0] * scale)))
+        else:
+            processed_image = image
+
+        result = self.ocr.ocr(
+            processed_image,
+            cls=True,
+            det=True,
+            rec=True
+        )
+        return self._parse_result(result, scale)
+
+    @staticmethod
+    def _parse_result(result, scale: float) -> TextPositions:
+        """
+        提取文字和位置信息
+
+        :param result: PaddleOCR识别结果
+        :param scale: 识别图像相对原图的放大倍数
+        :return: 单个汉字及其中心点(原图坐标)列表
+        """
+        if not result or not result[0]:
+            return []
+
+        text_positions = []
+        for line in result[0]:
+            if not line:
+                continue
+
+            box = line[0]
+            text = line[1][0]
+            confidence = float(line[1][1])
+
+            if confidence < 0.3:  # 降低置信度阈值
+                continue
+
+            # 计算中心点, 换算回原图坐标
+            box = [(x / scale, y / scale) for x, y in box]
+            center_x = int((box[0][0] + box[2][0]) / 2)
+            center_y = int((box[0][1] + box[2][1]) / 2)
+
+            # 对单个汉字进行处理
+            if len(text) == 1 and '\u4e00' <= text <= '\u9fff':
+                text_positions.append((text, (center_x, center_y)))
+
+            # 处理多字符文本
+            elif len(text) > 1:
+                char_width = (box[2][0] - box[0][0]) / len(text)
+                for i, char in enumerate(text):
+                    if '\u4e00' <= char <= '\u9fff':
+                        char_x = int(box[0][0] + char_width * (i + 0.5))
+                        char_y = center_y
+                        text_positions.append((char, (char_x, char_y)))
+
+        return text_positions
+
+    def _preprocess_image(self, image: np.ndarray, scale: Optional[float] = None) -> np.ndarray:
+        """
+        优化的图像预处理，专门处理彩色文字验证码, 多个颜色范围通过一次查找表运算生成掩码
+        """
+        try:
+            return self.preprocessor(image, scale)
         except Exception as e:
             print(f"图像预处理失败: {str(e)}")
             return image
@@ -216,32 +273,35 @@ class TextCaptcha:
         return match.group(1).split(',')
 
     @staticmethod
-    def click_text_positions(text_positions: List[Tuple[str, Tuple[int, int]]],
-                             text_sequence: List[str], delay: float = 0.5) -> None:
+    def click_text_positions(element: WebElement, text_positions: TextPositions, text_sequence: List[str],
+                             image_size: Optional[Tuple[int, int]] = None, delay: float = 0.3) -> List[str]:
         """
-        按顺序点击指定文字位置
-        
-        :param text_positions: 文字位置列表
+        按顺序点击指定文字位置, 所有点击在一个W3C Actions请求中由浏览器完成
+
+        :param element: 验证码图片元素
+        :param text_positions: 文字位置列表(识别图像坐标)
         :param text_sequence: 需要点击的文字序列
+        :param image_size: 识别图像尺寸(width, height), 默认与元素尺寸相同
         :param delay: 点击间隔时间(秒)
+        :return: 已点击的文字
         """
         # 创建文字到位置的映射
         text_map = {text: pos for text, pos in text_positions}
 
-        # 按序列依次点击
+        clicked = [text for text in text_sequence if text in text_map]
         for text in text_sequence:
-            if text in text_map:
-                x, y = text_map[text]
-                pyautogui.moveTo(x, y, duration=0.5)
-                pyautogui.click()
-                time.sleep(delay)
-            else:
+            if text not in text_map:
                 print(f"警告: 未找到文字 {text}")
 
+        if clicked:
+            offsets = element_offsets(element, [text_map[text] for text in clicked], image_size)
+            click_offsets(element, offsets, pause=delay)
+        return clicked
+
 
 if __name__ == '__main__':
     captcha_tool = TextCaptcha()
     img_path = ensure_path_sep("\\datas\\downloads\\img.png")
     print(f"处理图片: {img_path}")
-    text_positions = captcha_tool.recognize_text(image_path=img_path)
+    text_positions = captcha_tool.recognize_text(img_path)
     print(f"识别结果: {text_positions}")
@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 1:40 PM
+@ Author      : Poco Ray
+@ File        : __init__.py
+@ Description : Fakes for exercising the framework without a real browser or device.
+"""
@@ -0,0 +1,663 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 1:40 PM
+@ Author      : Poco Ray
+@ File        : fake_webdriver.py
+@ Description : Lightweight in-process W3C WebDriver/Appium stub server with a scriptable DOM model.
+                It supports the commands used by BaseCase, so the framework overhead (waits, retries,
+                logging, screenshots) can be measured on a plain Linux box.
+"""
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+# 1x1 transparent PNG, returned by the screenshot commands.
+BLANK_PNG_BASE64 = 'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+
+
+class FakeWebDriverError(Exception):
+    """ W3C error returned by the fake server. """
+
+    def __init__(self, error: str, message: str = '', status: int = 404):
+        super().__init__(message or error)
+        self.error = error
+        self.message = message or error
+        self.status = status
+
+
+@dataclass
+class FakeElement:
+    """ Element of the fake DOM. """
+    tag: str
+    attrs: Dict[str, str] = field(default_factory=dict)
+    text: str = ''
+    displayed: bool = True
+    enabled: bool = True
+    rect: Dict[str, float] = field(default_factory=lambda: {'x': 0, 'y': 0, 'width': 100, 'height': 30})
+    parent: Optional['FakeElement'] = None
+    appear_after: float = 0.0  # Seconds after the page load before the element is present.
+    visible_after: float = 0.0  # Seconds after the page load before the element is displayed.
+    fail_clicks: int = 0  # Number of clicks answered with 'click_error' before succeeding.
+    click_error: str = 'element click intercepted'
+    on_click: Optional[Callable[['FakeBrowser', 'FakeElement'], None]] = None
+    value: str = ''
+
+
+@dataclass
+class FakePage:
+    """ Page template, its elements are copied on every load. """
+    url: str
+    title: str = ''
+    elements: List[FakeElement] = field(default_factory=list)
+    ready_state: str = 'complete'
+
+
+def _split_css(selector: str) -> List[str]:
+    """ Split a CSS selector into compound selectors, ignoring spaces inside brackets and quotes. """
+    parts, buf, depth, quote = [], '', 0, None
+    for char in selector.strip():
+        if quote:
+            buf += char
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+            buf += char
+        elif char in '[(':
+            depth += 1
+            buf += char
+        elif char in '])':
+            depth -= 1
+            buf += char
+        elif (char.isspace() or char == '>') and depth == 0:
+            if buf:
+                parts.append(buf)
+            buf = ''
+        else:
+            buf += char
+    if buf:
+        parts.append(buf)
+    return parts
+
+
+_COMPOUND_RE = re.compile(r'#[\w-]+|\.[\w-]+|\[[^\]]+\]|^[\w*-]+')
+_ATTR_RE = re.compile(r'^\[\s*([\w:-]+)\s*(?:([*^$~]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]*)))?\s*\]$')
+
+
+def _match_compound(element: FakeElement, compound: str) -> bool:
+    """ Match an element against a compound CSS selector such as "input.name[type='text']". """
+    for token in _COMPOUND_RE.findall(compound):
+        if token.startswith('#'):
+            if element.attrs.get('id') != token[1:]:
+                return False
+        elif token.startswith('.'):
+            if token[1:] not in element.attrs.get('class', '').split():
+                return False
+        elif token.startswith('['):
+            match = _ATTR_RE.match(token)
+            if not match:
+                return False
+            name, operator = match.group(1), match.group(2)
+            expected = next((g for g in match.group(3, 4, 5) if g is not None), None)
+            actual = element.value if name == 'value' and element.value else element.attrs.get(name)
+            if actual is None:
+                return False
+            if operator == '=' and actual != expected:
+                return False
+            if operator == '*=' and expected not in actual:
+                return False
+            if operator == '^=' and not actual.startswith(expected):
+                return False
+            if operator == '$=' and not actual.endswith(expected):
+                return False
+            if operator == '~=' and expected not in actual.split():
+                return False
+        elif token not in ('*', element.tag):
+            return False
+    return True
+
+
+def match_css(element: FakeElement, selector: str) -> bool:
+    """ Match an element against a CSS selector list with descendant combinators. """
+    for group in selector.split(','):
+        compounds = _split_css(group)
+        if not compounds or not _match_compound(element, compounds[-1]):
+            continue
+        ancestor, remaining = element.parent, compounds[:-1]
+        while remaining and ancestor is not None:
+            if _match_compound(ancestor, remaining[-1]):
+                remaining.pop()
+            ancestor = ancestor.parent
+        if not remaining:
+            return True
+    return False
+
+
+_XPATH_RE = re.compile(r'^\(?\s*//([\w*-]+)(?:\[(.*)\])?\s*\)?(?:\[(\d+)\])?$', re.S)
+_TEXT_CONTAINS_RE = re.compile(r"contains\(normalize-space\((?:\.|text\(\))\),\s*['\"](.*?)['\"]\)")
+_ATTR_EQ_RE = re.compile(r"^@([\w:-]+)\s*=\s*['\"](.*?)['\"]$")
+_ATTR_CONTAINS_RE = re.compile(r"^contains\(@([\w:-]+),\s*['\"](.*?)['\"]\)$")
+_TEXT_EQ_RE = re.compile(r"^(?:text\(\)|normalize-space\(\.?\))\s*=\s*['\"](.*?)['\"]$")
+
+
+def _match_xpath_condition(element: FakeElement, condition: str) -> bool:
+    condition = condition.strip()
+    if condition.startswith('@*['):
+        match = _TEXT_CONTAINS_RE.search(condition)
+        return bool(match) and any(match.group(1) in str(v) for v in element.attrs.values())
+    if condition.startswith('.//text()['):
+        condition = condition[len('.//text()['):-1]
+    match = _TEXT_CONTAINS_RE.fullmatch(condition)
+    if match:
+        return match.group(1) in element.text
+    match = _ATTR_EQ_RE.match(condition)
+    if match:
+        name, expected = match.groups()
+        return (element.text if name == 'text' and 'text' not in element.attrs else element.attrs.get(name)) == expected
+    match = _ATTR_CONTAINS_RE.match(condition)
+    if match:
+        return match.group(2) in element.attrs.get(match.group(1), '')
+    match = _TEXT_EQ_RE.match(condition)
+    if match:
+        return element.text.strip() == match.group(1)
+    return False
+
+
+def match_xpath(elements: List[FakeElement], xpath: str) -> List[FakeElement]:
+    """
+    Evaluate the XPath subset generated by SelectorUtil and used by page objects:
+    '//tag[cond or cond]', '//*[@attr="v"]', '(//tag)[n]'. Other expressions match nothing.
+    """
+    match = _XPATH_RE.match(xpath.strip())
+    if not match:
+        return []
+    tag, predicate, index = match.groups()
+    result = []
+    for element in elements:
+        if tag not in ('*', element.tag):
+            continue
+        conditions = re.split(r'\s+or\s+', predicate) if predicate else []
+        if conditions and not any(_match_xpath_condition(element, c) for c in conditions):
+            continue
+        result.append(element)
+    if index is not None:
+        position = int(index) - 1
+        return result[position:position + 1]
+    return result
+
+
+class FakeBrowser:
+    """ Scriptable browser/device model behind the fake server. """
+
+    def __init__(self):
+        self.pages: Dict[str, FakePage] = {}
+        self.latency: float = 0.0  # Latency injected into every command (seconds).
+        self.command_latency: Dict[str, float] = {}  # Extra latency per command name.
+        self.script_handlers: List[Tuple[str, Callable[['FakeBrowser', List[Any]], Any]]] = []
+        self.command_log: List[str] = []
+        self.actions_log: List[Dict[str, Any]] = []
+        self.app_state: Dict[str, Any] = {
+            'installed': set(), 'current_package': 'com.android.browser', 'current_activity': '.BrowserActivity',
+            'network_connection': 6, 'contexts': ['NATIVE_APP'], 'context': 'NATIVE_APP',
+        }
+        self.window_rect = {'x': 0, 'y': 0, 'width': 1280, 'height': 800}
+        self._lock = threading.RLock()
+        self._elements: Dict[str, FakeElement] = {}
+        self._ids: Dict[int, str] = {}
+        self._history: List[str] = []
+        self._position = -1
+        self.current: FakePage = FakePage(url='about:blank')
+        self.loaded_at = time.monotonic()
+        self.generation = 0  # Incremented on every page load.
+        self.dom_generation = 0  # DOM mutation counter reported to the element cache, bump to simulate re-rendering.
+        self.network_idle_at = 0.0  # Monotonic time when the pending requests of the page finish.
+        self.cdp_log: List[Tuple[str, Dict[str, Any]]] = []  # Chrome DevTools commands received.
+        self.performance_log: List[Dict[str, Any]] = []  # DevTools events returned by the next 'performance' log read.
+        self.response_bodies: Dict[str, Dict[str, Any]] = {}  # Network.getResponseBody results by request id.
+
+    # ---------- Scripting API ----------
+
+    def add_page(self, url: str, title: str = '', elements: Optional[List[FakeElement]] = None,
+                 ready_state: str = 'complete') -> FakePage:
+        """
+        Register a page that the browser serves for the URL.
+
+        :Usage:
+            browser.add_page("http://fake/login", "Login", [FakeElement("input", {"name": "user"})])
+        """
+        page = FakePage(url=url, title=title, elements=elements or [], ready_state=ready_state)
+        self.pages[url] = page
+        return page
+
+    def on_script(self, fragment: str, handler: Callable[['FakeBrowser', List[Any]], Any]) -> None:
+        """
+        Answer scripts containing the fragment with the handler, checked before the built-in handlers.
+
+        :Usage:
+            browser.on_script("return window.pending", lambda browser, args: 0)
+        """
+        self.script_handlers.insert(0, (fragment, handler))
+
+    def mutate(self, element: FakeElement, text: Optional[str] = None, **attrs: str) -> None:
+        """
+        Change the text or attributes of a loaded element, as the page scripts would, e.g.: toggle a class.
+        The DOM generation is incremented like the MutationObserver of the element cache does.
+
+        :Usage:
+            browser.mutate(browser.find('css selector', 'li')[1], **{'class': 'active'})
+        """
+        with self._lock:
+            if text is not None:
+                element.text = text
+            element.attrs.update(attrs)
+            self.dom_generation += 1
+
+    def navigate(self, url: str, record_history: bool = True) -> None:
+        """ Load a page, the elements of the previous page become stale. """
+        with self._lock:
+            template = self.pages.get(url) or FakePage(url=url)
+            self.current = FakePage(url=template.url, title=template.title,
+                                    elements=copy.deepcopy(template.elements), ready_state=template.ready_state)
+            self.loaded_at = time.monotonic()
+            self.generation += 1
+            self._elements.clear()
+            self._ids.clear()
+            if record_history:
+                del self._history[self._position + 1:]
+                self._history.append(url)
+                self._position = len(self._history) - 1
+
+    def go(self, step: int) -> None:
+        """ Move through the history, e.g.: -1 for back. """
+        with self._lock:
+            position = self._position + step
+            if 0 <= position < len(self._history):
+                self._position = position
+                self.navigate(self._history[position], record_history=False)
+
+    def record_request(self, url: str, body: str, method: str = 'GET', status: int = 200,
+                       resource_type: str = 'XHR', mime_type: str = 'application/json') -> None:
+        """ Emit the DevTools events of a finished request, as captured by the performance log. """
+        request_id = str(len(self.response_bodies) + 1)
+        now = time.time()
+        events = [
+            ('Network.requestWillBeSent', {'requestId': request_id, 'timestamp': 1.0, 'wallTime': now, 'type': resource_type,
+                                           'request': {'method': method, 'url': url, 'headers': {}}}),
+            ('Network.responseReceived', {'requestId': request_id, 'type': resource_type, 'response': {
+                'status': status, 'statusText': 'OK', 'mimeType': mime_type,
+                'headers': {'Content-Type': mime_type, 'Content-Length': str(len(body))}}}),
+            ('Network.loadingFinished', {'requestId': request_id, 'timestamp': 1.05, 'encodedDataLength': len(body)}),
+        ]
+        for method_name, params in events:
+            self.performance_log.append({'level': 'INFO', 'timestamp': int(now * 1000), 'message': json.dumps(
+                {'webview': 'fake', 'message': {'method': method_name, 'params': params}})})
+        self.response_bodies[request_id] = {'body': body, 'base64Encoded': False}
+
+    def cdp_command(self, cmd: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """ Answer the Chrome DevTools commands used by the framework. """
+        self.cdp_log.append((cmd, params))
+        if cmd == 'Page.addScriptToEvaluateOnNewDocument':
+            return {'identifier': str(len(self.cdp_log))}
+        if cmd == 'Network.getResponseBody':
+            if params.get('requestId') not in self.response_bodies:
+                raise FakeWebDriverError('unknown error', 'No resource with given identifier found')
+            return self.response_bodies[params['requestId']]
+        return {}
+
+    def get_log(self, log_type: str) -> List[Dict[str, Any]]:
+        if log_type != 'performance':
+            return []
+        entries, self.performance_log = self.performance_log, []
+        return entries
+
+    # ---------- Element helpers ----------
+
+    def _present(self, element: FakeElement) -> bool:
+        return time.monotonic() - self.loaded_at >= element.appear_after
+
+    def is_displayed(self, element: FakeElement) -> bool:
+        return element.displayed and time.monotonic() - self.loaded_at >= element.visible_after
+
+    def element_id(self, element: FakeElement) -> str:
+        with self._lock:
+            key = id(element)
+            if key not in self._ids:
+                self._ids[key] = uuid.uuid4().hex
+                self._elements[self._ids[key]] = element
+            return self._ids[key]
+
+    def element(self, element_id: str) -> FakeElement:
+        with self._lock:
+            element = self._elements.get(element_id)
+        if element is None:
+            raise FakeWebDriverError('stale element reference', f"Element {element_id} is stale.")
+        return element
+
+    def find(self, using: str, value: str, root: Optional[FakeElement] = None) -> List[FakeElement]:
+        """ Locate the present elements of the current page. """
+        elements = [e for e in self.current.elements if self._present(e)]
+        if root is not None:
+            def is_descendant(element):
+                parent = element.parent
+                while parent is not None:
+                    if parent is root:
+                        return True
+                    parent = parent.parent
+                return False
+
+            elements = [e for e in elements if is_descendant(e)]
+        if using == 'css selector':
+            return [e for e in elements if match_css(e, value)]
+        if using == 'xpath':
+            return match_xpath(elements, value)
+        if using == 'tag name':
+            return [e for e in elements if e.tag == value]
+        if using in ('link text', 'partial link text'):
+            return [e for e in elements if e.tag == 'a' and (
+                e.text == value if using == 'link text' else value in e.text)]
+        if using == 'id':
+            return [e for e in elements if e.attrs.get('id') == value]
+        if using in ('-android uiautomator', 'accessibility id'):
+            return [e for e in elements if e.attrs.get('content-desc') == value]
+        raise FakeWebDriverError('invalid argument', f"Unsupported locator strategy: {using}", 400)
+
+    def click(self, element: FakeElement) -> None:
+        if not self.is_displayed(element):
+            raise FakeWebDriverError('element not interactable', 'Element is not displayed.', 400)
+        if element.fail_clicks > 0:
+            element.fail_clicks -= 1
+            raise FakeWebDriverError(element.click_error, element.click_error, 400)
+        if element.on_click is not None:
+            element.on_click(self, element)
+        elif element.attrs.get('href') and element.tag == 'a':
+            self.navigate(element.attrs['href'])
+
+    # ---------- Scripts ----------
+
+    def decode(self, value: Any) -> Any:
+        if isinstance(value, dict) and ELEMENT_KEY in value:
+            return self.element(value[ELEMENT_KEY])
+        if isinstance(value, list):
+            return [self.decode(v) for v in value]
+        return value
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, FakeElement):
+            return {ELEMENT_KEY: self.element_id(value)}
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        return value
+
+    def execute_script(self, script: str, args: List[Any]) -> Any:
+        args = self.decode(args)
+        for fragment, handler in self.script_handlers:
+            if fragment in script:
+                return handler(self, args)
+        if script.startswith('mobile:'):
+            return self.mobile_command(script[len('mobile:'):].strip(), args[0] if args else {})
+        if script.startswith('/* isDisplayed */'):
+            return self.is_displayed(args[0])
+        if script.startswith('/* getAttribute */'):
+            element, name = args[0], args[1]
+            if name == 'value':
+                return element.value or element.attrs.get('value')
+            return element.attrs.get(name)
+        if '__uiatf_idle' in script:
+            now = time.monotonic()
+            last_activity = max(self.loaded_at, min(now, self.network_idle_at))
+            return [self.current.ready_state, int(now < self.network_idle_at), (now - last_activity) * 1000]
+        if '__uiatf_dom_gen' in script:
+            return [f'doc-{self.generation}', self.dom_generation, self.current.url]
+        if 'document.readyState' in script:
+            return self.current.ready_state
+        if 'jQuery' in script:
+            return True
+        if 'document.title' in script:
+            return self.current.title
+        if 'arguments[0].click()' in script:
+            element = args[0]
+            if element.on_click is not None:
+                element.on_click(self, element)
+            return None
+        return None
+
+    def mobile_command(self, name: str, params: Dict[str, Any]) -> Any:
+        """ Answer the Appium 'mobile:' execute methods used by BaseCase. """
+        state = self.app_state
+        app_id = params.get('appId') or params.get('bundleId')
+        if name == 'activateApp':
+            state['current_package'] = app_id
+        elif name == 'isAppInstalled':
+            return app_id in state['installed']
+        elif name == 'installApp':
+            state['installed'].add(params.get('app') or params.get('appPath'))
+        elif name == 'removeApp':
+            removed = app_id in state['installed']
+            state['installed'].discard(app_id)
+            return removed
+        elif name == 'terminateApp':
+            return True
+        elif name == 'getCurrentPackage':
+            return state['current_package']
+        elif name == 'getCurrentActivity':
+            return state['current_activity']
+        elif name == 'getConnectivity':
+            mask = state['network_connection']
+            return {'airplaneMode': bool(mask & 1), 'wifi': bool(mask & 2), 'data': bool(mask & 4)}
+        elif name == 'setConnectivity':
+            mask = state['network_connection']
+            for key, bit in (('airplaneMode', 1), ('wifi', 2), ('data', 4)):
+                if key in params:
+                    mask = mask | bit if params[key] else mask & ~bit
+            state['network_connection'] = mask
+        return None
+
+
+class FakeWebDriverServer:
+    """
+    In-process W3C WebDriver stub server.
+
+    :Usage:
+        server = FakeWebDriverServer().start()
+        server.browser.add_page("http://fake/login", "Login", [FakeElement("button", {"id": "submit"})])
+        driver = webdriver.Remote(command_executor=server.url, options=webdriver.ChromeOptions())
+        ...
+        server.stop()
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, browser: Optional[FakeBrowser] = None):
+        self.browser = browser or FakeBrowser()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self._routes = self._build_routes()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeWebDriverServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-webdriver', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> FakeBrowser:
+        """ Replace the browser model with a fresh one, e.g.: between tests. """
+        self.browser = FakeBrowser()
+        return self.browser
+
+    # ---------- Routing ----------
+
+    def _build_routes(self) -> List[Tuple[str, re.Pattern, str, Callable]]:
+        b = lambda: self.browser  # noqa: E731, the browser may be replaced by reset().
+        el = r'/session/[^/]+/element/([^/]+)'
+        routes = [
+            ('POST', r'/session', 'newSession', self._new_session),
+            ('DELETE', r'/session/[^/]+', 'quit', lambda body: None),
+            ('GET', r'/status', 'status', lambda body: {'ready': True, 'message': 'fake webdriver'}),
+            ('POST', r'/session/[^/]+/timeouts', 'setTimeouts', lambda body: None),
+            ('POST', r'/session/[^/]+/url', 'get', lambda body: b().navigate(body['url'])),
+            ('GET', r'/session/[^/]+/url', 'getCurrentUrl', lambda body: b().current.url),
+            ('POST', r'/session/[^/]+/back', 'goBack', lambda body: b().go(-1)),
+            ('POST', r'/session/[^/]+/forward', 'goForward', lambda body: b().go(1)),
+            ('POST', r'/session/[^/]+/refresh', 'refresh', lambda body: b().navigate(b().current.url, False)),
+            ('GET', r'/session/[^/]+/title', 'getTitle', lambda body: b().current.title),
+            ('GET', r'/session/[^/]+/source', 'getPageSource', lambda body: self._page_source()),
+            ('POST', r'/session/[^/]+/execute/(?:sync|async)', 'executeScript',
+             lambda body: b().encode(b().execute_script(body.get('script', ''), body.get('args', [])))),
+            ('GET', r'/session/[^/]+/screenshot', 'screenshot', lambda body: BLANK_PNG_BASE64),
+            ('GET', r'/session/[^/]+/window', 'getCurrentWindowHandle', lambda body: 'fake-window'),
+            ('GET', r'/session/[^/]+/window/handles', 'getWindowHandles', lambda body: ['fake-window']),
+            ('DELETE', r'/session/[^/]+/window', 'closeWindow', lambda body: []),
+            ('GET', r'/session/[^/]+/window/rect', 'getWindowRect', lambda body: b().window_rect),
+            ('POST', r'/session/[^/]+/window/rect', 'setWindowRect', lambda body: b().window_rect),
+            ('POST', r'/session/[^/]+/window/(?:maximize|minimize|fullscreen)', 'setWindowState',
+             lambda body: b().window_rect),
+            ('POST', r'/session/[^/]+/frame', 'switchToFrame', lambda body: None),
+            ('POST', r'/session/[^/]+/frame/parent', 'switchToParentFrame', lambda body: None),
+            ('POST', r'/session/[^/]+/actions', 'actions', lambda body: b().actions_log.append(body)),
+            ('DELETE', r'/session/[^/]+/actions', 'releaseActions', lambda body: None),
+            ('GET', r'/session/[^/]+/cookie', 'getAllCookies', lambda body: []),
+            ('POST', r'/session/[^/]+/goog/cdp/execute', 'executeCdpCommand',
+             lambda body: b().cdp_command(body.get('cmd'), body.get('params', {}))),
+            ('POST', r'/session/[^/]+/se/log', 'getLog', lambda body: b().get_log(body.get('type'))),
+            ('POST', r'/session/[^/]+/cookie', 'addCookie', lambda body: None),
+            ('POST', r'/session/[^/]+/element', 'findElement', lambda body: self._find(body, single=True)),
+            ('POST', r'/session/[^/]+/elements', 'findElements', lambda body: self._find(body, single=False)),
+            ('POST', el + r'/element', 'findChildElement', lambda body, i: self._find(body, True, i)),
+            ('POST', el + r'/elements', 'findChildElements', lambda body, i: self._find(body, False, i)),
+            ('POST', el + r'/click', 'clickElement', lambda body, i: b().click(b().element(i))),
+            ('POST', el + r'/clear', 'clearElement', lambda body, i: setattr(b().element(i), 'value', '')),
+            ('POST', el + r'/value', 'sendKeysToElement', lambda body, i: self._send_keys(i, body)),
+            ('GET', el + r'/text', 'getElementText', lambda body, i: b().element(i).text),
+            ('GET', el + r'/name', 'getElementTagName', lambda body, i: b().element(i).tag),
+            ('GET', el + r'/enabled', 'isElementEnabled', lambda body, i: b().element(i).enabled),
+            ('GET', el + r'/selected', 'isElementSelected', lambda body, i: False),
+            ('GET', el + r'/displayed', 'isElementDisplayed', lambda body, i: b().is_displayed(b().element(i))),
+            ('GET', el + r'/rect', 'getElementRect', lambda body, i: b().element(i).rect),
+            ('GET', el + r'/attribute/([^/]+)', 'getElementAttribute',
+             lambda body, i, n: b().element(i).attrs.get(n)),
+            ('GET', el + r'/property/([^/]+)', 'getElementProperty',
+             lambda body, i, n: b().element(i).value if n == 'value' else b().element(i).attrs.get(n)),
+            ('GET', el + r'/css/([^/]+)', 'getElementValueOfCssProperty', lambda body, i, n: ''),
+            ('GET', el + r'/screenshot', 'elementScreenshot', lambda body, i: BLANK_PNG_BASE64),
+            # Appium extension commands.
+            ('POST', r'/session/[^/]+/appium/device/activate_app', 'activateApp',
+             lambda body: b().app_state.update(current_package=body.get('appId') or body.get('bundleId'))),
+            ('POST', r'/session/[^/]+/appium/device/terminate_app', 'terminateApp', lambda body: True),
+            ('POST', r'/session/[^/]+/appium/device/app_installed', 'isAppInstalled',
+             lambda body: (body.get('appId') or body.get('bundleId')) in b().app_state['installed']),
+            ('POST', r'/session/[^/]+/appium/device/install_app', 'installApp',
+             lambda body: b().app_state['installed'].add(body.get('appPath'))),
+            ('POST', r'/session/[^/]+/appium/device/remove_app', 'removeApp',
+             lambda body: b().app_state['installed'].discard(body.get('appId') or body.get('bundleId'))),
+            ('GET', r'/session/[^/]+/appium/device/current_package', 'getCurrentPackage',
+             lambda body: b().app_state['current_package']),
+            ('GET', r'/session/[^/]+/appium/device/current_activity', 'getCurrentActivity',
+             lambda body: b().app_state['current_activity']),
+            ('GET', r'/session/[^/]+/network_connection', 'getNetworkConnection',
+             lambda body: b().app_state['network_connection']),
+            ('POST', r'/session/[^/]+/network_connection', 'setNetworkConnection',
+             lambda body: b().app_state.update(network_connection=body.get('parameters', {}).get('type'))),
+            ('GET', r'/session/[^/]+/contexts', 'getContexts', lambda body: b().app_state['contexts']),
+            ('GET', r'/session/[^/]+/context', 'getCurrentContext', lambda body: b().app_state['context']),
+            ('POST', r'/session/[^/]+/context', 'switchToContext',
+             lambda body: b().app_state.update(context=body.get('name'))),
+            ('POST', r'/session/[^/]+/appium/[\w/]+', 'appiumCommand', lambda body: None),
+        ]
+        return [(method, re.compile(pattern + '$'), name, handler) for method, pattern, name, handler in routes]
+
+    @staticmethod
+    def _new_session(body: Dict[str, Any]) -> Dict[str, Any]:
+        """ Echo the requested browser, App sessions have no 'browserName' like a real Appium server. """
+        requested = body.get('capabilities', {}).get('alwaysMatch', {})
+        capabilities = {'platformName': requested.get('platformName', 'linux')}
+        if requested.get('browserName'):
+            capabilities.update(browserName=requested['browserName'], browserVersion='1.0')
+        return {'sessionId': uuid.uuid4().hex, 'capabilities': capabilities}
+
+    def _find(self, body: Dict[str, Any], single: bool, root_id: Optional[str] = None) -> Any:
+        root = self.browser.element(root_id) if root_id else None
+        elements = self.browser.find(body.get('using'), body.get('value'), root)
+        if single:
+            if not elements:
+                raise FakeWebDriverError('no such element', f"Unable to locate element: {body.get('value')}")
+            return self.browser.encode(elements[0])
+        return self.browser.encode(elements)
+
+    def _send_keys(self, element_id: str, body: Dict[str, Any]) -> None:
+        element = self.browser.element(element_id)
+        element.value += body.get('text', '')
+
+    def _page_source(self) -> str:
+        items = ''.join(f"<{e.tag}>{e.text}</{e.tag}>" for e in self.browser.current.elements)
+        return f"<html><head><title>{self.browser.current.title}</title></head><body>{items}</body></html>"
+
+    def dispatch(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Any]:
+        """ Route a request, return the HTTP status and the 'value' of the response. """
+        for route_method, pattern, name, handler in self._routes:
+            if route_method != method:
+                continue
+            match = pattern.match(path)
+            if not match:
+                continue
+            browser = self.browser
+            browser.command_log.append(name)
+            delay = browser.latency + browser.command_latency.get(name, 0.0)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                return 200, handler(body, *match.groups())
+            except FakeWebDriverError as e:
+                return e.status, {'error': e.error, 'message': e.message, 'stacktrace': ''}
+        return 404, {'error': 'unknown command', 'message': f"{method} {path}", 'stacktrace': ''}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # Avoid the 40ms delayed-ACK stall on keep-alive connections.
+
+            def _handle(self, method: str) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                raw = self.rfile.read(length) if length else b''
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    body = {}
+                status, value = server.dispatch(method, self.path.rstrip('/') or '/', body or {})
+                payload = json.dumps({'value': value}).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._handle('GET')
+
+            def do_POST(self):
+                self._handle('POST')
+
+            def do_DELETE(self):
+                self._handle('DELETE')
+
+            def log_message(self, format, *args):
+                pass  # Keep the test output clean.
+
+        return Handler
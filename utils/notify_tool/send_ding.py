@@ -118,7 +118,7 @@ class DingTalkSendMsg:
                f")\n" \
                f" > ###### 测试报告 [详情](http://172.25.48.1:53230/) \n"
         # f" > ###### 测试报告 [详情](http://{get_host_ip()}:53230/index.html#) \n"
-        DingTalkSendMsg(AllureFileClean().get_case_count()).send_markdown(
+        self.send_markdown(
             title="【UI自动化通知】", msg=text, is_at_all=is_at_all)
 
 
@@ -78,7 +78,7 @@ class SendEmail:
             跳过数量: {self.metrics.skipped} 个
             成 功 率: {self.metrics.pass_rate} %
 
-        {self.allure_data.get_failed_cases_detail()}
+        {self.CaseDetail}
 
         **********************************
         jenkins地址：https://121.xx.xx.47:8989/login
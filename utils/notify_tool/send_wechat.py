@@ -103,7 +103,7 @@ class WeChatSend:
                                     >非相关负责人员可忽略此消息。
                                     >测试报告，点击查看>>[测试报告入口](http://{get_host_ip()}:9999/index.html)"""
 
-        WeChatSend(AllureFileClean().get_case_count()).send_markdown(text)
+        self.send_markdown(text)
 
 
 if __name__ == '__main__':
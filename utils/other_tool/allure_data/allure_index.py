@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 2026/10/20 上午1:10
+@ Author      : Poco Ray
+@ File        : allure_index.py
+@ Description : Allure 用例结果索引.
+                逐个解析用例文件, 只保留status、name、fullName及起止时间, 写入SQLite索引, 不在内存中保留完整用例数据.
+                支持 allure generate 生成的 data/test-cases 目录, 及 pytest 直接写出的 allure-results(*-result.json).
+                刷新时只解析新增或修改的文件, 文件较多时分块交给多进程解析(JSON解析受GIL限制).
+"""
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 用例行: (uid, status, name, fullName, start毫秒, stop毫秒, duration毫秒)
+CaseRow = Tuple[str, str, str, str, int, int, int]
+
+SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    uid TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    stop INTEGER NOT NULL,
+    duration INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cases_status ON cases (status);
+CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL NOT NULL);
+"""
+# 同一用例重试时保留最后一次结果
+_UPSERT = """
+INSERT INTO cases VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (uid) DO UPDATE SET status = excluded.status, name = excluded.name, full_name = excluded.full_name,
+    start = excluded.start, stop = excluded.stop, duration = excluded.duration
+WHERE excluded.stop >= cases.stop
+"""
+
+
+def extract_case(path: str) -> Optional[CaseRow]:
+    """
+    解析一个用例文件, 只提取索引字段. 报告用例的时间在'time'中, 原始结果的时间在顶层'start'、'stop'
+
+    :param path: 用例文件路径
+    :return: 用例行, 非用例文件返回None
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or 'status' not in data:
+        return None
+    timing = data.get('time') or data
+    start, stop = int(timing.get('start') or 0), int(timing.get('stop') or 0)
+    duration = int(timing.get('duration') or max(0, stop - start))
+    uid = data.get('historyId') or data.get('uid') or data.get('uuid') or os.path.basename(path)
+    return str(uid), data['status'], data.get('name', ''), data.get('fullName', ''), start, stop, duration
+
+
+def extract_cases(paths: Sequence[str]) -> List[CaseRow]:
+    """ 子进程中解析一块文件 """
+    return [row for row in map(extract_case, paths) if row is not None]
+
+
+def scan_files(source_dir: str, suffix: str = '.json') -> Dict[str, float]:
+    """ :return: 目录下所有用例文件的路径 -> 修改时间 """
+    files, stack = {}, [source_dir]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stack.append(entry.path)
+                elif entry.name.endswith(suffix):
+                    files[entry.path] = entry.stat().st_mtime
+    return files
+
+
+class AllureIndex:
+    """
+    Allure 用例结果的SQLite索引
+
+    :Usage:
+        index = AllureIndex(ensure_path_sep("\\report\\tmp"), suffix='-result.json')
+        index.refresh()
+        index.status_counts()  # {'passed': 95, 'failed': 5}
+        index.failed_cases()  # [(name, fullName), ...]
+    """
+
+    def __init__(self, source_dir: str, db_path: str = ':memory:', suffix: str = '.json',
+                 workers: Optional[int] = None, parallel_threshold: int = 1000, chunk_size: int = 256):
+        """
+        :param source_dir: 用例文件目录, 如：report/html/data/test-cases 或 report/tmp
+        :param db_path: 索引文件路径, ':memory:'为内存索引
+        :param suffix: 用例文件后缀, 原始结果为'-result.json'
+        :param workers: 解析进程数, 默认为CPU核数
+        :param parallel_threshold: 待解析文件数达到该值时使用多进程解析
+        :param chunk_size: 每个解析任务的文件数
+        """
+        self.source_dir = source_dir
+        self.db_path = db_path
+        self.suffix = suffix
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.chunk_size = chunk_size
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self._connection.executescript("DROP TABLE IF EXISTS cases; DROP TABLE IF EXISTS files; DROP TABLE IF "
+                                           f"EXISTS meta; PRAGMA user_version = {SCHEMA_VERSION};")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _parse(self, paths: List[str]) -> Iterator[List[CaseRow]]:
+        """ 按块产出解析结果, 文件较多时多进程并行 """
+        chunks = [paths[i:i + self.chunk_size] for i in range(0, len(paths), self.chunk_size)]
+        if len(paths) < self.parallel_threshold or self.workers < 2:
+            yield from map(extract_cases, chunks)
+            return
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            yield from executor.map(extract_cases, chunks)
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        解析新增或修改的用例文件, 有文件被删除(含切换目录)或强制时重建索引
+
+        :param force: 是否强制重建
+        :return: 本次解析的文件数
+        """
+        files = scan_files(self.source_dir, self.suffix)
+        with self._lock:
+            indexed = dict(self._connection.execute("SELECT path, mtime FROM files"))
+            rebuild = force or not indexed.keys() <= files.keys()
+            if rebuild:
+                indexed = {}
+            changed = [path for path, mtime in files.items() if indexed.get(path) != mtime]
+            if not rebuild and not changed:
+                return 0
+            with self._connection:
+                if rebuild:
+                    self._connection.execute("DELETE FROM cases")
+                    self._connection.execute("DELETE FROM files")
+                for rows in self._parse(changed):
+                    self._connection.executemany(_UPSERT, rows)
+                self._connection.executemany("INSERT OR REPLACE INTO files VALUES (?, ?)",
+                                             [(path, files[path]) for path in changed])
+            return len(changed)
+
+    def query(self, sql: str, parameters: Sequence = ()) -> List[tuple]:
+        """ 在索引上执行查询, 表为 cases(uid, status, name, full_name, start, stop, duration) """
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def status_counts(self) -> Dict[str, int]:
+        """ :return: 各状态的用例数 """
+        return dict(self.query("SELECT status, COUNT(*) FROM cases GROUP BY status"))
+
+    def failed_cases(self, statuses: Sequence[str] = ('failed', 'broken')) -> List[Tuple[str, str]]:
+        """ :return: 失败用例的标题和代码路径 """
+        placeholders = ', '.join('?' * len(statuses))
+        return self.query(f"SELECT name, full_name FROM cases WHERE status IN ({placeholders}) ORDER BY full_name",
+                          tuple(statuses))
+
+    def total_duration(self) -> int:
+        """ :return: 用例耗时之和(毫秒) """
+        return self.query("SELECT COALESCE(SUM(duration), 0) FROM cases")[0][0]
+
+    def wall_time(self) -> int:
+        """ :return: 从第一个用例开始到最后一个用例结束的耗时(毫秒), 与 allure 报告的运行时长一致 """
+        return self.query("SELECT COALESCE(MAX(stop) - MIN(start), 0) FROM cases WHERE start > 0")[0][0]
+
+    def slowest(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """ :return: 耗时最长的用例代码路径及耗时(毫秒) """
+        return self.query("SELECT full_name, duration FROM cases ORDER BY duration DESC LIMIT ?", (limit,))
@@ -7,33 +7,54 @@
 @ Description : Allure 报告数据清洗
 """
 import json
-from typing import List, Text
-from common.setting import ensure_path_sep
-from utils.read_tool.get_file import get_all_files
+import os
+from typing import Dict, List, Text
+from common.setting import ensure_path_sep, Settings
+from utils.other_tool.allure_data.allure_index import AllureIndex
 from utils.other_tool.models import TestMetrics
 
 
 class AllureFileClean:
-    """allure 报告数据清洗，提取业务需要得数据"""
+    """
+    allure 报告数据清洗，提取业务需要得数据.
+    优先读取 pytest 写出的原始结果(report/tmp/*-result.json), 无需等待 allure generate; 没有原始结果时读取html报告
+    """
+    _indexes: Dict[str, AllureIndex] = {}  # 用例目录 -> 索引, 进程内复用
+
+    @staticmethod
+    def has_results(results_dir: str) -> bool:
+        """ 判断目录中是否有 allure 原始结果 """
+        try:
+            with os.scandir(results_dir) as entries:
+                return any(entry.name.endswith('-result.json') for entry in entries)
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def index(cls) -> AllureIndex:
+        """ 获取用例结果的索引, 只解析新增或修改的文件 """
+        results_dir = ensure_path_sep("\\report\\tmp")
+        if cls.has_results(results_dir):
+            source_dir, suffix, db_name = results_dir, '-result.json', 'allure-results.sqlite'
+        else:
+            source_dir, suffix, db_name = ensure_path_sep("\\report\\html\\data\\test-cases"), '.json', 'allure-cases.sqlite'
+        index = cls._indexes.get(source_dir)
+        if index is None:
+            db_path = os.path.join(Settings().global_config['report_index_dir'], db_name)
+            index = cls._indexes[source_dir] = AllureIndex(source_dir, db_path, suffix)
+        index.refresh()
+        return index
 
     @classmethod
     def get_testcases(cls) -> List:
-        """ 获取所有 allure 报告中执行用例的情况"""
-        # 将所有数据都收集到files中
-        files = []
-        for i in get_all_files(ensure_path_sep("\\report\\html\\data\\test-cases")):
-            with open(i, 'r', encoding='utf-8') as file:
-                date = json.load(file)
-                files.append(date)
-        return files
+        """ 获取所有 allure 报告中执行用例的情况, 只包含 status、name、fullName、duration """
+        return [{'status': status, 'name': name, 'fullName': full_name, 'duration': duration}
+                for status, name, full_name, duration in
+                cls.index().query("SELECT status, name, full_name, duration FROM cases")]
 
     def get_failed_case(self) -> List:
         """ 获取到所有失败的用例标题和用例代码路径"""
-        error_case = []
-        for i in self.get_testcases():
-            if i['status'] == 'failed' or i['status'] == 'broken':
-                error_case.append((i['name'], i['fullName']))
-        return error_case
+        return self.index().failed_cases()
 
     def get_failed_cases_detail(self) -> Text:
         """ 返回所有失败的测试用例相关内容 """
@@ -47,9 +68,23 @@ class AllureFileClean:
                 values += "        " + i[0] + ":" + i[1] + "\n"
         return values
 
+    @staticmethod
+    def metrics_from_index(index: AllureIndex) -> "TestMetrics":
+        """ 由用例索引计算用例指标, 与 allure 报告 widgets/summary.json 的统计口径一致 """
+        counts = index.status_counts()
+        run_case_data = {k: counts.get(k, 0) for k in ("passed", "failed", "broken", "skipped")}
+        run_case_data["total"] = sum(counts.values())
+        run_case_data["pass_rate"] = round(
+            (run_case_data["passed"] + run_case_data["skipped"]) / run_case_data["total"] * 100, 2
+        ) if run_case_data["total"] > 0 else 0.0
+        run_case_data["time"] = round(index.wall_time() / 1000, 2)
+        return TestMetrics(**run_case_data)
+
     @classmethod
     def get_case_count(cls) -> "TestMetrics":
-        """ 统计用例数量 """
+        """ 统计用例数量, 优先由原始结果计算 """
+        if cls.has_results(ensure_path_sep("\\report\\tmp")):
+            return cls.metrics_from_index(cls.index())
         try:
             file_name = ensure_path_sep("\\report\\html\\widgets\\summary.json")
             with open(file_name, 'r', encoding='utf-8') as file:
@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 9:30 AM
+@ Author      : Poco Ray
+@ File        : __init__.py
+@ Description : Performance instrumentation tools.
+"""
@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 9:30 AM
+@ Author      : Poco Ray
+@ File        : action_metrics.py
+@ Description : Per-action timing instrumentation for BaseCase.
+"""
+import functools
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import allure
+from common.setting import Settings
+from utils.log_tool.log_control import ERROR
+from selenium.webdriver.support.ui import WebDriverWait
+
+_settings = Settings()
+
+
+@dataclass
+class ActionRecord:
+    """ Timing data of a single BaseCase action. """
+    action: str  # Action name, e.g.: click.
+    selector: Optional[str] = None  # Element selector, if the action has one.
+    test_id: Optional[str] = None  # Test node id.
+    worker: str = 'master'  # xdist worker id.
+    wall_time: float = 0.0  # Wall time (seconds).
+    round_trips: int = 0  # Number of WebDriver commands sent.
+    retries: int = 0  # Number of retries.
+    wait_time: float = 0.0  # Time spent in explicit waits (seconds).
+    status: str = 'passed'  # 'passed' or 'failed'.
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """
+    Calculate the percentile with linear interpolation.
+
+    :param values: Sample values.
+    :param pct: Percentile, between 0 and 100.
+    :return: Percentile value, 0.0 if there is no sample.
+    :Usage:
+        p95 = percentile([0.1, 0.2, 0.3], 95)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[int(rank)]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(records: Sequence[ActionRecord]) -> Dict[str, float]:
+    """
+    Aggregate a group of action records.
+
+    :param records: Action records.
+    :return: Count, p50/p95/p99/max wall time and the totals of round trips, retries and wait time.
+    """
+    wall_times = [r.wall_time for r in records]
+    return {
+        'count': len(records),
+        'failed': sum(1 for r in records if r.status != 'passed'),
+        'sum': round(sum(wall_times), 6),
+        'p50': round(percentile(wall_times, 50), 6),
+        'p95': round(percentile(wall_times, 95), 6),
+        'p99': round(percentile(wall_times, 99), 6),
+        'max': round(max(wall_times, default=0.0), 6),
+        'round_trips': sum(r.round_trips for r in records),
+        'retries': sum(r.retries for r in records),
+        'wait_time': round(sum(r.wait_time for r in records), 6),
+    }
+
+
+class ActionMetrics:
+    """ Process-wide collector of BaseCase action timings. """
+
+    def __init__(self):
+        self.enabled: bool = _settings.global_config.get('action_metrics', True)
+        self.current_test: Optional[str] = None
+        self.worker: str = os.environ.get('PYTEST_XDIST_WORKER', 'master')
+        self._records: List[ActionRecord] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def _stack(self) -> List[ActionRecord]:
+        """ Actions currently open on this thread, outermost first. """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def measure(self, action: str, selector: Optional[str] = None) -> Iterator[ActionRecord]:
+        """
+        Measure an action. Nested actions are recorded separately and also count toward the outer action.
+
+        :param action: Action name.
+        :param selector: Element selector.
+        :Usage:
+            with action_metrics.measure("click", "#submit"):
+                ...
+        """
+        record = ActionRecord(action=action, selector=selector, test_id=self.current_test, worker=self.worker)
+        stack = self._stack
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record.status = 'failed'
+            raise
+        finally:
+            record.wall_time = time.perf_counter() - start
+            stack.pop()
+            with self._lock:
+                self._records.append(record)
+
+    def add_round_trip(self, count: int = 1) -> None:
+        """ Count WebDriver commands toward every open action. """
+        for record in self._stack:
+            record.round_trips += count
+
+    def add_retry(self, count: int = 1) -> None:
+        """ Count a retry toward the innermost open action. """
+        if self._stack:
+            self._stack[-1].retries += count
+
+    def add_wait(self, seconds: float) -> None:
+        """ Count explicit wait time toward every open action. """
+        for record in self._stack:
+            record.wait_time += seconds
+
+    def current_stack(self) -> Tuple[str, ...]:
+        """ :return: Names of the actions currently open on this thread, outermost first. """
+        return tuple(r.action for r in self._stack)
+
+    def records(self, test_id: Optional[str] = None) -> List[ActionRecord]:
+        """
+        :param test_id: Only return the records of this test when given.
+        :return: Collected action records.
+        """
+        with self._lock:
+            return [r for r in self._records if test_id is None or r.test_id == test_id]
+
+    def pop_records(self, test_id: Optional[str]) -> List[ActionRecord]:
+        """ Return and drop the records of a test. """
+        with self._lock:
+            records = [r for r in self._records if r.test_id == test_id]
+            self._records = [r for r in self._records if r.test_id != test_id]
+        return records
+
+    def reset(self) -> None:
+        """ Drop all collected records. """
+        with self._lock:
+            self._records.clear()
+
+    def _append_records(self, output_dir: str, records: Sequence[ActionRecord]) -> str:
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, f"action-metrics-{self.worker}.jsonl")
+        with open(file_path, 'a', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(asdict(record), ensure_ascii=False) + '\n')
+        return file_path
+
+    def flush_test(self, test_id: str, output_dir: Optional[str] = None) -> None:
+        """
+        Append the records of a finished test to 'action-metrics-<worker>.jsonl' and drop them from memory,
+        so that the collector does not grow for the life of the worker.
+
+        :param test_id: Test node id.
+        :param output_dir: Output directory, defaults to 'perf_dir'.
+        """
+        records = self.pop_records(test_id)
+        if not records:
+            return
+        try:
+            self._append_records(output_dir or _settings.get_global_config('perf_dir'), records)
+        except Exception as e:
+            ERROR.logger.error(f"Failed to export the action timings: {str(e)}")
+
+    @staticmethod
+    def aggregate(records: Sequence[ActionRecord]) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Aggregate records per action and per selector.
+
+        :param records: Action records.
+        :return: {'actions': {action: stats}, 'selectors': {"action selector": stats}}
+        """
+        by_action: Dict[str, List[ActionRecord]] = {}
+        by_selector: Dict[str, List[ActionRecord]] = {}
+        for record in records:
+            by_action.setdefault(record.action, []).append(record)
+            if record.selector is not None:
+                by_selector.setdefault(f"{record.action} {record.selector}", []).append(record)
+        return {
+            'actions': {k: summarize(v) for k, v in sorted(by_action.items())},
+            'selectors': {k: summarize(v) for k, v in sorted(by_selector.items())},
+        }
+
+    def attach_to_allure(self, test_id: str) -> None:
+        """
+        Attach the action timings of a test to the Allure report.
+
+        :param test_id: Test node id.
+        """
+        records = self.records(test_id)
+        if not records:
+            return
+        body = {
+            'summary': self.aggregate(records),
+            'records': [asdict(r) for r in records],
+        }
+        try:
+            allure.attach(json.dumps(body, ensure_ascii=False, indent=2), name="action timings",
+                          attachment_type=allure.attachment_type.JSON)
+        except Exception as e:
+            ERROR.logger.error(f"Failed to attach action timings to Allure: {str(e)}")
+
+    def export_records(self, output_dir: str) -> str:
+        """
+        Append the records not flushed by a test yet, e.g.: of session fixtures, to 'action-metrics-<worker>.jsonl'.
+
+        :param output_dir: Output directory.
+        :return: Output file path.
+        """
+        with self._lock:
+            records, self._records = self._records, []
+        return self._append_records(output_dir, records)
+
+    @staticmethod
+    def load_records(output_dir: str) -> List[ActionRecord]:
+        """
+        Load the records written by every worker.
+
+        :param output_dir: Output directory.
+        :return: Action records of the whole run.
+        """
+        records = []
+        if not os.path.isdir(output_dir):
+            return records
+        for filename in sorted(os.listdir(output_dir)):
+            if filename.startswith('action-metrics-') and filename.endswith('.jsonl'):
+                with open(os.path.join(output_dir, filename), 'r', encoding='utf-8') as file:
+                    records.extend(ActionRecord(**json.loads(line)) for line in file if line.strip())
+        return records
+
+    @classmethod
+    def export_summary(cls, output_dir: str, openmetrics: bool = False) -> str:
+        """
+        Aggregate the records of all workers into 'action-metrics-summary.json',
+        and optionally 'action-metrics.prom' in OpenMetrics text format.
+
+        :param output_dir: Output directory.
+        :param openmetrics: Whether to write the OpenMetrics text file.
+        :return: Summary file path.
+        """
+        summary = cls.aggregate(cls.load_records(output_dir))
+        file_path = os.path.join(output_dir, 'action-metrics-summary.json')
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        if openmetrics:
+            with open(os.path.join(output_dir, 'action-metrics.prom'), 'w', encoding='utf-8') as file:
+                file.write(cls.to_openmetrics(summary))
+        return file_path
+
+    @staticmethod
+    def to_openmetrics(summary: Dict[str, Dict[str, Dict[str, float]]]) -> str:
+        """
+        Render an aggregated summary in OpenMetrics text format.
+
+        :param summary: Return value of 'aggregate'.
+        :return: OpenMetrics text.
+        """
+
+        def escape(value: str) -> str:
+            return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        series = []
+        for action, stats in summary['actions'].items():
+            series.append((f'action="{escape(action)}"', stats))
+        for key, stats in summary['selectors'].items():
+            action, selector = key.split(' ', 1)
+            series.append((f'action="{escape(action)}",selector="{escape(selector)}"', stats))
+
+        lines = [
+            "# TYPE uiatf_action_duration_seconds summary",
+            "# UNIT uiatf_action_duration_seconds seconds",
+            "# HELP uiatf_action_duration_seconds Wall time of BaseCase actions.",
+        ]
+        for labels, stats in series:
+            for quantile in ('p50', 'p95', 'p99'):
+                lines.append(f'uiatf_action_duration_seconds{{{labels},quantile="0.{quantile[1:]}"}} {stats[quantile]}')
+            lines.append(f'uiatf_action_duration_seconds_sum{{{labels}}} {stats["sum"]}')
+            lines.append(f'uiatf_action_duration_seconds_count{{{labels}}} {stats["count"]}')
+        for name, key, help_text in (
+                ('uiatf_action_round_trips', 'round_trips', 'WebDriver commands sent by BaseCase actions.'),
+                ('uiatf_action_retries', 'retries', 'Retries performed by BaseCase actions.'),
+                ('uiatf_action_wait_seconds', 'wait_time', 'Explicit wait time of BaseCase actions.')):
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"# HELP {name} {help_text}")
+            for labels, stats in series:
+                lines.append(f'{name}_total{{{labels}}} {stats[key]}')
+        lines.append("# EOF")
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide collector instance.
+action_metrics = ActionMetrics()
+
+
+def timed_action(func: Callable) -> Callable:
+    """
+    Decorator that records a BaseCase method as an action.
+    The 'selector' argument, if the method has one, is recorded along with the timing.
+
+    :Usage:
+        @timed_action
+        def click(self, selector, by='css_selector'):
+            ...
+    """
+    params = list(inspect.signature(func).parameters)
+    selector_index = params.index('selector') if 'selector' in params else None
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not action_metrics.enabled:
+            return func(*args, **kwargs)
+        selector = None
+        if selector_index is not None:
+            selector = kwargs.get('selector', args[selector_index] if len(args) > selector_index else None)
+        with action_metrics.measure(func.__name__, selector):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class TimedWebDriverWait(WebDriverWait):
+    """ WebDriverWait that reports the time spent waiting to the action metrics. """
+
+    def until(self, method, message: str = ""):
+        start = time.perf_counter()
+        try:
+            return super().until(method, message)
+        finally:
+            action_metrics.add_wait(time.perf_counter() - start)
+
+    def until_not(self, method, message: str = ""):
+        start = time.perf_counter()
+        try:
+            return super().until_not(method, message)
+        finally:
+            action_metrics.add_wait(time.perf_counter() - start)
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 3:20 PM
+@ Author      : Poco Ray
+@ File        : benchmark.py
+@ Description : Micro-benchmark runner with stored baselines and regression gates.
+@ Usage       : python -m utils.perf_tool.benchmark compare <baseline.json> <current.json> [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+from utils.perf_tool.action_metrics import percentile
+
+
+@dataclass
+class BenchmarkResult:
+    """ Timing statistics of a benchmark (seconds per call). """
+    name: str
+    rounds: int
+    min: float
+    median: float
+    mean: float
+    stddev: float
+    p95: float
+
+
+@dataclass
+class Regression:
+    """ A benchmark whose median got slower than the baseline beyond the threshold. """
+    name: str
+    baseline: float
+    current: float
+    ratio: float
+
+    def __str__(self):
+        return (f"{self.name}: median {self.current * 1000:.3f}ms vs baseline {self.baseline * 1000:.3f}ms "
+                f"(+{(self.ratio - 1) * 100:.1f}%)")
+
+
+def run_benchmark(name: str, func: Callable[[], object], rounds: int = 50, warmup: int = 3,
+                  max_time: Optional[float] = None) -> BenchmarkResult:
+    """
+    Call the function repeatedly and collect timing statistics.
+
+    :param name: Benchmark name, the key in the baseline file.
+    :param func: Function without arguments.
+    :param rounds: Number of measured calls.
+    :param warmup: Number of unmeasured calls before measuring.
+    :param max_time: Stop early once the measured calls exceed this many seconds.
+    :return: Benchmark result.
+    :Usage:
+        result = run_benchmark("selector", lambda: SelectorUtil.get_selenium_locator("#id"))
+    """
+    for _ in range(warmup):
+        func()
+    samples: List[float] = []
+    started = time.perf_counter()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+        if max_time is not None and time.perf_counter() - started > max_time:
+            break
+    return BenchmarkResult(
+        name=name,
+        rounds=len(samples),
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+        stddev=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        p95=percentile(samples, 95),
+    )
+
+
+def load_results(file_path: str) -> Dict[str, BenchmarkResult]:
+    """
+    :param file_path: Benchmark result file.
+    :return: {name: result}, empty if the file does not exist.
+    """
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return {name: BenchmarkResult(**item) for name, item in json.load(file).items()}
+
+
+def save_results(file_path: str, results: Dict[str, BenchmarkResult]) -> None:
+    """
+    Write benchmark results, merged into the existing file so that partial runs keep the other entries.
+
+    :param file_path: Benchmark result file.
+    :param results: {name: result}
+    """
+    merged = load_results(file_path)
+    merged.update(results)
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump({k: asdict(v) for k, v in sorted(merged.items())}, file, indent=2)
+
+
+def check_regression(current: BenchmarkResult, baseline: Optional[BenchmarkResult],
+                     threshold: float) -> Optional[Regression]:
+    """
+    Compare the medians of a benchmark.
+
+    :param current: Current result.
+    :param baseline: Baseline result, None if there is no baseline yet.
+    :param threshold: Allowed slowdown, e.g.: 0.25 allows the median to be 25% slower.
+    :return: Regression, or None if within the threshold.
+    """
+    if baseline is None or baseline.median <= 0:
+        return None
+    ratio = current.median / baseline.median
+    if ratio > 1 + threshold:
+        return Regression(current.name, baseline.median, current.median, ratio)
+    return None
+
+
+def compare(baseline: Dict[str, BenchmarkResult], current: Dict[str, BenchmarkResult],
+            threshold: float) -> List[Regression]:
+    """
+    :return: Regressions of the benchmarks present in both result sets.
+    """
+    regressions = []
+    for name, result in sorted(current.items()):
+        regression = check_regression(result, baseline.get(name), threshold)
+        if regression is not None:
+            regressions.append(regression)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    compare_parser = subparsers.add_parser('compare', help="Compare two benchmark result files.")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    for name, result in sorted(current.items()):
+        base = baseline.get(name)
+        change = f"{(result.median / base.median - 1) * 100:+.1f}%" if base and base.median > 0 else "new"
+        print(f"{name:<50} {result.median * 1000:>10.3f}ms  {change}")
+    regressions = compare(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
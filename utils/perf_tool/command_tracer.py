@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 11:05 AM
+@ Author      : Poco Ray
+@ File        : command_tracer.py
+@ Description : WebDriver command-level tracing via a RemoteConnection hook.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, List, Optional, Tuple
+import allure
+from common.setting import Settings
+from utils.log_tool.log_control import INFO, WARNING, ERROR
+from utils.perf_tool.action_metrics import action_metrics
+
+_settings = Settings()
+
+
+@dataclass
+class CommandRecord:
+    """ A single WebDriver HTTP command. """
+    command: str  # Selenium command name, e.g.: findElement.
+    payload_size: int  # Request body size (bytes).
+    latency: float  # Round-trip latency (seconds).
+    status: str  # 'ok', or the W3C error name / HTTP status code.
+    test_id: Optional[str] = None  # Test node id.
+    stack: Tuple[str, ...] = field(default_factory=tuple)  # BaseCase actions open when the command was sent.
+
+
+def _response_status(response: Any) -> str:
+    """ Extract the status of a RemoteConnection response. """
+    if isinstance(response, dict):
+        value = response.get('value')
+        if isinstance(value, dict) and value.get('error'):
+            return str(value['error'])
+        status = response.get('status')
+        if isinstance(status, int) and status >= 400:
+            return str(status)
+        if isinstance(status, str) and status not in ('0', 'success'):
+            return status
+    return 'ok'
+
+
+class CommandTracer:
+    """ Traces every command sent through the Selenium/Appium command executor. """
+
+    def __init__(self):
+        self.enabled: bool = _settings.global_config.get('command_trace', True)
+        self.warn_threshold: int = _settings.global_config.get('command_trace_warn_threshold', 500)
+        self._records: List[CommandRecord] = []
+        self._lock = threading.Lock()
+
+    def install(self, driver: Any) -> None:
+        """
+        Hook the command executor of the driver. It is safe to call repeatedly.
+        The hook always counts round trips for the action metrics, the records are kept only when tracing is enabled.
+
+        :param driver: WebDriver or AppDriver object.
+        :Usage:
+            command_tracer.install(self.driver)
+        """
+        executor = getattr(driver, 'command_executor', None)
+        if executor is None or getattr(executor, '_uiatf_traced', False):
+            return
+        execute = executor.execute
+
+        @functools.wraps(execute)
+        def traced_execute(command, params=None):
+            action_metrics.add_round_trip()
+            if not self.enabled:
+                return execute(command, params)
+            payload_size = len(json.dumps(params, default=str)) if params else 0
+            start = time.perf_counter()
+            status = 'ok'
+            try:
+                response = execute(command, params)
+                status = _response_status(response)
+                return response
+            except Exception as e:
+                status = type(e).__name__
+                raise
+            finally:
+                record = CommandRecord(
+                    command=command,
+                    payload_size=payload_size,
+                    latency=time.perf_counter() - start,
+                    status=status,
+                    test_id=action_metrics.current_test,
+                    stack=action_metrics.current_stack(),
+                )
+                with self._lock:
+                    self._records.append(record)
+
+        executor.execute = traced_execute
+        executor._uiatf_traced = True
+
+    def records(self, test_id: Optional[str] = None) -> List[CommandRecord]:
+        """
+        :param test_id: Only return the records of this test when given.
+        :return: Traced commands.
+        """
+        with self._lock:
+            return [r for r in self._records if test_id is None or r.test_id == test_id]
+
+    def pop_records(self, test_id: Optional[str]) -> List[CommandRecord]:
+        """ Return and drop the records of a test. """
+        with self._lock:
+            records = [r for r in self._records if r.test_id == test_id]
+            self._records = [r for r in self._records if r.test_id != test_id]
+        return records
+
+    @staticmethod
+    def summarize(records: List[CommandRecord]) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate commands by name, the most time-consuming first.
+
+        :param records: Traced commands.
+        :return: {command: {'count', 'errors', 'total_latency', 'max_latency', 'payload_bytes'}}
+        """
+        summary: Dict[str, Dict[str, float]] = {}
+        for record in records:
+            item = summary.setdefault(record.command, {
+                'count': 0, 'errors': 0, 'total_latency': 0.0, 'max_latency': 0.0, 'payload_bytes': 0})
+            item['count'] += 1
+            item['errors'] += record.status != 'ok'
+            item['total_latency'] += record.latency
+            item['max_latency'] = max(item['max_latency'], record.latency)
+            item['payload_bytes'] += record.payload_size
+        for item in summary.values():
+            item['total_latency'] = round(item['total_latency'], 6)
+            item['max_latency'] = round(item['max_latency'], 6)
+        return dict(sorted(summary.items(), key=lambda kv: kv[1]['total_latency'], reverse=True))
+
+    @staticmethod
+    def to_folded(records: List[CommandRecord], test_id: Optional[str] = None) -> str:
+        """
+        Render the commands in folded stack format ('test;action;...;command latency_us'),
+        which can be fed to flamegraph.pl or speedscope.
+
+        :param records: Traced commands.
+        :param test_id: Root frame name, defaults to the test id of the records.
+        :return: Folded stack text.
+        """
+        weights: Counter = Counter()
+        for record in records:
+            root = (test_id or record.test_id or 'session').replace(';', ':')
+            frames = (root,) + record.stack + (record.command,)
+            weights[';'.join(frames)] += int(record.latency * 1_000_000)
+        return ''.join(f"{stack} {weight}\n" for stack, weight in weights.items())
+
+    def flush_test(self, test_id: str, output_dir: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Log the per-test command summary, attach the flamegraph data to Allure
+        and append the commands to 'commands-<worker>.jsonl' / '.folded' under output_dir.
+
+        :param test_id: Test node id.
+        :param output_dir: Output directory, defaults to 'perf_dir'.
+        :return: Command summary of the test.
+        """
+        records = self.pop_records(test_id)
+        if not records:
+            return {}
+        summary = self.summarize(records)
+        folded = self.to_folded(records, test_id)
+        total_latency = sum(r.latency for r in records)
+        INFO.logger.info(f"{test_id} issued {len(records)} WebDriver commands in {total_latency:.3f}s: "
+                         + ", ".join(f"{k}={int(v['count'])}" for k, v in list(summary.items())[:5]) + ".")
+        for command, item in summary.items():
+            if item['count'] >= self.warn_threshold:
+                WARNING.logger.warning(f"{test_id} issued {int(item['count'])} '{command}' commands, "
+                                       f"check for redundant calls.")
+
+        output_dir = output_dir or _settings.get_global_config('perf_dir')
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            base_name = os.path.join(output_dir, f"commands-{action_metrics.worker}")
+            with open(f"{base_name}.jsonl", 'a', encoding='utf-8') as file:
+                for record in records:
+                    file.write(json.dumps(asdict(record), ensure_ascii=False) + '\n')
+            with open(f"{base_name}.folded", 'a', encoding='utf-8') as file:
+                file.write(folded)
+            allure.attach(json.dumps(summary, indent=2), name="webdriver commands",
+                          attachment_type=allure.attachment_type.JSON)
+            allure.attach(folded, name="webdriver commands (folded stacks)",
+                          attachment_type=allure.attachment_type.TEXT)
+        except Exception as e:
+            ERROR.logger.error(f"Failed to export the WebDriver command trace: {str(e)}")
+        return summary
+
+
+# Process-wide tracer instance.
+command_tracer = CommandTracer()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 4:00 AM
+@ Author      : Poco Ray
+@ File        : duration_scheduler.py
+@ Description : Duration-aware xdist scheduling.
+                Tests are dispatched longest-first (LPT) by their median duration in the run history, a free
+                worker keeps taking tests of the session profile it already runs so its warm driver session is
+                reused, and only switches profile, to the longest pending test, once its profile is exhausted.
+                Workers hold two tests at a time, so the order adapts to the actual durations.
+                The predicted makespan of the plan is reported next to the actual one.
+"""
+import heapq
+import statistics
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+import pytest
+from xdist.scheduler import LoadScheduling
+from common.setting import Settings
+
+_settings = Settings()
+
+
+def default_profile(nodeid: str, profiles: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Session profile of a test: the longest matching prefix in 'profiles', otherwise its top test package,
+    e.g.: 'tests/test_web' or 'tests/test_app', which use different driver sessions.
+
+    :param nodeid: Test node id.
+    :param profiles: Node id prefix -> profile name, e.g.: {'tests/test_web/test_admin': 'admin'}.
+    :return: Profile name.
+    """
+    for prefix in sorted(profiles or {}, key=len, reverse=True):
+        if nodeid.startswith(prefix):
+            return profiles[prefix]
+    path = nodeid.split('::')[0].split('/')
+    return '/'.join(path[:2]) if len(path) > 2 else path[0]
+
+
+def predict(nodeids: Sequence[str], durations: Mapping[str, float], default: float) -> List[float]:
+    """ :return: Predicted duration of every test, tests without history get the median known duration. """
+    known = [durations[n] for n in nodeids if n in durations]
+    fallback = statistics.median(known) if known else default
+    return [durations.get(n, fallback) for n in nodeids]
+
+
+class DispatchQueue:
+    """ Pending tests per profile, each ordered longest first. """
+
+    def __init__(self, indices: Sequence[int], predicted: Sequence[float], profiles: Sequence[str]):
+        self.predicted = predicted
+        self.profiles = profiles
+        self._queues: Dict[str, Deque[int]] = {}
+        for index in sorted(indices, key=lambda i: -predicted[i]):
+            self._queues.setdefault(profiles[index], deque()).append(index)
+
+    def __bool__(self) -> bool:
+        return bool(self._queues)
+
+    def pop(self, profile: Optional[str] = None) -> int:
+        """ :return: The longest pending test of the profile, or the longest pending test if none is left. """
+        if profile not in self._queues:
+            profile = max(self._queues, key=lambda p: self.predicted[self._queues[p][0]])
+        queue = self._queues[profile]
+        index = queue.popleft()
+        if not queue:
+            del self._queues[profile]
+        return index
+
+
+def plan_makespan(predicted: Sequence[float], profiles: Sequence[str], workers: int) -> float:
+    """
+    Simulate the dispatch with the predicted durations.
+
+    :return: Predicted makespan (seconds).
+    """
+    queue = DispatchQueue(range(len(predicted)), predicted, profiles)
+    free: List[Tuple[float, int]] = [(0.0, worker) for worker in range(workers)]
+    current: Dict[int, Optional[str]] = {}
+    makespan = 0.0
+    while queue:
+        now, worker = heapq.heappop(free)
+        index = queue.pop(current.get(worker))
+        current[worker] = profiles[index]
+        makespan = max(makespan, now + predicted[index])
+        heapq.heappush(free, (now + predicted[index], worker))
+    return makespan
+
+
+class DurationScheduling(LoadScheduling):
+    """ LoadScheduling that dispatches the longest tests first, keeping each worker on one session profile. """
+
+    def __init__(self, config, log=None, durations: Optional[Mapping[str, float]] = None,
+                 profile_of: Callable[[str], str] = default_profile, default_duration: float = 10.0,
+                 lookahead: int = 2):
+        """
+        :param durations: Historical duration of the tests (seconds).
+        :param profile_of: Session profile of a node id.
+        :param default_duration: Predicted duration when there is no history at all (seconds).
+        :param lookahead: Tests held by a worker, at least 2 since a worker needs the next test to run one.
+        """
+        super().__init__(config, log)
+        self.durations = durations or {}
+        self.profile_of = profile_of
+        self.default_duration = default_duration
+        self.lookahead = max(2, lookahead)
+        self.predicted: List[float] = []
+        self.profiles: List[str] = []
+        self.predicted_makespan: Optional[float] = None
+        self.workers = 0  # Workers at the time of the plan.
+        self.started: Optional[float] = None
+        self.last_completed: Optional[float] = None
+        self._queue: Optional[DispatchQueue] = None
+        self._node_profile: Dict[object, str] = {}
+
+    @property
+    def actual_makespan(self) -> Optional[float]:
+        """ :return: Seconds from the first dispatch to the last completed test. """
+        if self.started is None or self.last_completed is None:
+            return None
+        return self.last_completed - self.started
+
+    def schedule(self) -> None:
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+        self.collection = next(iter(self.node2collection.values()))
+        self.pending[:] = range(len(self.collection))
+        if not self.collection:
+            return
+        self.predicted = predict(self.collection, self.durations, self.default_duration)
+        self.profiles = [self.profile_of(nodeid) for nodeid in self.collection]
+        self.workers = len(self.nodes)
+        self.predicted_makespan = plan_makespan(self.predicted, self.profiles, self.workers)
+        self._queue = DispatchQueue(self.pending, self.predicted, self.profiles)
+        self.started = time.time()
+        for node in self.nodes:
+            self.check_schedule(node)
+
+    def _requeue(self) -> None:
+        """ Rebuild the queues after xdist put tests back into 'pending' (crashed worker or unscheduled tests). """
+        self._queue = DispatchQueue(self.pending, self.predicted, self.profiles)
+
+    def mark_test_complete(self, node, item_index: int, duration: float = 0) -> None:
+        self.last_completed = time.time()
+        super().mark_test_complete(node, item_index, duration)
+
+    def mark_test_pending(self, item: str) -> None:
+        super().mark_test_pending(item)
+        self._requeue()
+        for node in self.nodes:
+            self.check_schedule(node)
+
+    def remove_node(self, node) -> Optional[str]:
+        self._node_profile.pop(node, None)
+        crashitem = super().remove_node(node)
+        self._requeue()
+        for other in self.nodes:
+            self.check_schedule(other)
+        return crashitem
+
+    def check_schedule(self, node, duration: float = 0) -> None:
+        if node.shutting_down or self._queue is None:
+            return
+        if self.pending:
+            missing = self.lookahead - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+
+    def _send_tests(self, node, num: int) -> None:
+        indices = []
+        while self._queue and len(indices) < num:
+            index = self._queue.pop(self._node_profile.get(node))
+            self._node_profile[node] = self.profiles[index]
+            indices.append(index)
+        if indices:
+            taken = set(indices)
+            self.pending[:] = [i for i in self.pending if i not in taken]
+            self.node2pending[node].extend(indices)
+            node.send_runtest_some(indices)
+
+
+class DurationSchedulerPlugin:
+    """
+    pytest plugin replacing the '--dist load' scheduler, registered on the controller only.
+
+    :Usage:
+        config.pluginmanager.register(DurationSchedulerPlugin(RunHistory().durations()), 'duration_scheduler')
+    """
+
+    def __init__(self, durations: Mapping[str, float]):
+        self.durations = durations
+        self.scheduler: Optional[DurationScheduling] = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log) -> Optional[DurationScheduling]:
+        if config.getvalue('dist') != 'load':
+            return None
+        profiles = _settings.global_config.get('schedule_profiles') or {}
+        self.scheduler = DurationScheduling(
+            config, log, self.durations, lambda nodeid: default_profile(nodeid, profiles),
+            _settings.global_config.get('schedule_default_duration', 10.0),
+            _settings.global_config.get('schedule_lookahead', 2))
+        return self.scheduler
+
+    def makespan(self) -> Dict[str, Optional[float]]:
+        """ :return: Predicted and actual makespan (seconds), None before the scheduler ran. """
+        scheduler = self.scheduler
+        return {'predicted_makespan': scheduler.predicted_makespan if scheduler else None,
+                'actual_makespan': scheduler.actual_makespan if scheduler else None}
+
+    def pytest_sessionfinish(self, session) -> None:
+        recorder = session.config.pluginmanager.getplugin('run_recorder')
+        if recorder is not None and self.scheduler is not None:
+            recorder.meta.update(self.makespan(), scheduler='duration')
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        makespan = self.makespan()
+        if makespan['predicted_makespan'] is None or makespan['actual_makespan'] is None:
+            return
+        collection = self.scheduler.collection
+        known = sum(1 for nodeid in collection if nodeid in self.durations)
+        terminalreporter.write_sep('-', 'duration scheduler')
+        terminalreporter.write_line(
+            f"predicted makespan {makespan['predicted_makespan']:.1f}s, actual {makespan['actual_makespan']:.1f}s "
+            f"({self.scheduler.workers} workers, {known}/{len(collection)} tests with history).")
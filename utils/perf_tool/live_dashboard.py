@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 2:00 AM
+@ Author      : Poco Ray
+@ File        : live_dashboard.py
+@ Description : Live run dashboard, a pytest plugin on the controller process.
+                xdist forwards the reports of every worker to the controller, so the counters, the slowest tests
+                and the per-worker stats are aggregated in one place while the run is going. The snapshot is
+                rewritten to 'live-dashboard.json' every interval, and optionally served over HTTP with
+                Server-Sent Events on 127.0.0.1. Aborting the run needs the per-run token sent in the
+                'X-Abort-Token' header, so a page opened in the driven browser cannot stop the run.
+                Usage: pytest -n 4 --live-dashboard [--live-dashboard-port 53231]
+"""
+import heapq
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+import pytest
+from common.setting import Settings
+
+_settings = Settings()
+
+OUTCOMES = ('passed', 'failed', 'error', 'skipped', 'xfailed', 'xpassed')
+
+
+def worker_of(report) -> str:
+    """ :return: xdist worker id of a report received by the controller, 'master' without xdist. """
+    node = getattr(report, 'node', None)
+    return getattr(getattr(node, 'gateway', None), 'id', None) or 'master'
+
+
+def is_rerun(reports: List[Any]) -> bool:
+    """ :return: Whether the reports are an attempt that pytest-rerunfailures will run again. """
+    return any(getattr(report, 'outcome', None) == 'rerun' for report in reports)
+
+
+def final_outcome(reports: List[Any]) -> str:
+    """
+    :param reports: setup, call and teardown reports of one test.
+    :return: Final outcome, with the same precedence as the terminal summary.
+    """
+    for report in reports:
+        if report.when != 'call' and report.failed:
+            return 'error'
+    for report in reports:
+        if hasattr(report, 'wasxfail'):
+            return 'xfailed' if report.skipped else 'xpassed'
+    for report in reports:
+        if report.failed:
+            return 'failed'
+        if report.skipped:
+            return 'skipped'
+    return 'passed'
+
+
+@dataclass
+class WorkerStats:
+    """ Progress of one xdist worker. """
+    tests: int = 0
+    failed: int = 0
+    busy: float = 0.0  # Sum of the test durations (seconds).
+    last_seen: float = 0.0  # time.time() of the last finished test.
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {'tests': self.tests, 'failed': self.failed, 'busy': round(self.busy, 3),
+                'mean': round(self.busy / self.tests, 3) if self.tests else 0.0,
+                'idle_for': round(now - self.last_seen, 1) if self.last_seen else None}
+
+
+class RunState:
+    """ Thread-safe aggregate of the finished tests, fed by the report hook and read by the writer and server. """
+
+    def __init__(self, slowest: int = 10):
+        """
+        :param slowest: Number of slowest tests to keep.
+        """
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.total = 0  # Collected tests, 0 until the collection is known.
+        self.counts: Dict[str, int] = dict.fromkeys(OUTCOMES, 0)
+        self.duration = 0.0
+        self.workers: Dict[str, WorkerStats] = {}
+        self.failures: List[str] = []
+        self.stop_reason: Optional[str] = None
+        self.version = 0  # Incremented on every change, used by the SSE stream.
+        self._slowest_size = slowest
+        self._slowest: List[Tuple[float, str]] = []  # Min-heap of the slowest tests.
+        self._phases: Dict[str, List[Any]] = {}
+        self.changed = threading.Condition()
+
+    def _touch(self) -> None:
+        self.version += 1
+        self.changed.notify_all()
+
+    def set_total(self, total: int) -> None:
+        with self.changed:
+            self.total = total
+            self._touch()
+
+    def add_report(self, report) -> Optional[str]:
+        """
+        Record a report, a test is counted once the teardown report of its last attempt arrives.
+
+        :return: Final outcome of the test, None while the test is still running.
+        """
+        with self.changed:
+            phases = self._phases.setdefault(report.nodeid, [])
+            phases.append(report)
+            if report.when != 'teardown':
+                return None
+            del self._phases[report.nodeid]
+            if is_rerun(phases):
+                return None
+            outcome = final_outcome(phases)
+            duration = sum(r.duration for r in phases)
+            self.counts[outcome] += 1
+            self.duration += duration
+            worker = self.workers.setdefault(worker_of(report), WorkerStats())
+            worker.tests += 1
+            worker.busy += duration
+            worker.last_seen = time.time()
+            if outcome in ('failed', 'error'):
+                worker.failed += 1
+                self.failures.append(report.nodeid)
+            if len(self._slowest) < self._slowest_size:
+                heapq.heappush(self._slowest, (duration, report.nodeid))
+            elif duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, (duration, report.nodeid))
+            self._touch()
+            return outcome
+
+    def finish(self, stop_reason: Optional[str] = None) -> None:
+        with self.changed:
+            self.finished = time.time()
+            self.stop_reason = self.stop_reason or stop_reason
+            self._touch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """ :return: JSON-serializable state of the run. """
+        with self.changed:
+            now = self.finished or time.time()
+            done = sum(self.counts.values())
+            elapsed = now - self.started
+            remaining = max(self.total - done, 0)
+            return {
+                'version': self.version,
+                'status': 'finished' if self.finished else 'running',
+                'stop_reason': self.stop_reason,
+                'started': self.started,
+                'elapsed': round(elapsed, 1),
+                'total': self.total,
+                'done': done,
+                'counts': dict(self.counts),
+                'duration': round(self.duration, 3),
+                'eta': round(elapsed / done * remaining, 1) if done and self.total and not self.finished else None,
+                'running': sorted(self._phases),
+                'slowest': [{'nodeid': n, 'duration': round(d, 3)} for d, n in sorted(self._slowest, reverse=True)],
+                'workers': {k: w.to_dict(now) for k, w in sorted(self.workers.items())},
+                'failures': self.failures[-20:],
+            }
+
+
+_PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>Live run</title>
+<style>body{font:14px monospace;margin:2em}td,th{padding:2px 12px;text-align:left}</style></head><body>
+<h3 id="head">connecting...</h3><button onclick="fetch('/abort',{method:'POST',headers:{'X-Abort-Token':'__ABORT_TOKEN__'}})">Abort run</button>
+<h4>Workers</h4><table id="workers"></table><h4>Slowest</h4><table id="slowest"></table>
+<h4>Failures</h4><pre id="failures"></pre>
+<script>
+const esc = v => String(v).replace(/[&<>]/g, ch => ({'&': '&amp;', '<': '&lt;', '>': '&gt;'})[ch]);
+const rows = (id, items) => document.getElementById(id).innerHTML =
+  items.map(r => '<tr>' + r.map(c => '<td>' + esc(c) + '</td>').join('') + '</tr>').join('');
+new EventSource('/events').onmessage = e => {
+  const s = JSON.parse(e.data), c = s.counts;
+  document.getElementById('head').textContent = `${s.status} ${s.done}/${s.total || '?'} in ${s.elapsed}s` +
+    ` | passed ${c.passed} failed ${c.failed} error ${c.error} skipped ${c.skipped}` +
+    (s.eta !== null ? ` | eta ${s.eta}s` : '') + (s.stop_reason ? ` | ${s.stop_reason}` : '');
+  rows('workers', Object.entries(s.workers).map(([k, w]) => [k, w.tests + ' tests', w.failed + ' failed',
+    'mean ' + w.mean + 's', 'idle ' + w.idle_for + 's']));
+  rows('slowest', s.slowest.map(t => [t.duration + 's', t.nodeid]));
+  document.getElementById('failures').textContent = s.failures.join('\\n');
+};
+</script></body></html>"""
+
+
+class _DashboardHandler(BaseHTTPRequestHandler):
+    """
+    '/' page, '/status.json' snapshot, '/events' SSE stream, POST '/abort' stops the run.
+    A cross-origin page can neither read the token off '/' nor send a custom header without a CORS preflight,
+    which is never answered, so '/abort' also rejects any request from a foreign Origin.
+    """
+    server: 'DashboardServer'
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _send(self, body: bytes, content_type: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == '/':
+            page = _PAGE.replace('__ABORT_TOKEN__', self.server.abort_token)
+            self._send(page.encode('utf-8'), 'text/html; charset=utf-8')
+        elif self.path == '/status.json':
+            self._send(json.dumps(self.server.state.snapshot()).encode('utf-8'), 'application/json')
+        elif self.path == '/events':
+            self._stream()
+        else:
+            self._send(b'not found', 'text/plain', 404)
+
+    def do_POST(self) -> None:
+        if self.path == '/abort':
+            if not self._abort_allowed():
+                self._send(b'forbidden', 'text/plain', 403)
+                return
+            self.server.on_abort('aborted from the live dashboard')
+            self._send(b'{"aborted": true}', 'application/json')
+        else:
+            self._send(b'not found', 'text/plain', 404)
+
+    def _abort_allowed(self) -> bool:
+        """ Token must match, and a browser request must come from the dashboard's own origin. """
+        origin = self.headers.get('Origin')
+        if origin is not None and origin.rstrip('/') not in self.server.origins:
+            return False
+        return secrets.compare_digest(self.headers.get('X-Abort-Token', ''), self.server.abort_token)
+
+    def _stream(self) -> None:
+        state = self.server.state
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        version = -1
+        try:
+            while not self.server.closed:
+                with state.changed:
+                    state.changed.wait_for(lambda: state.version != version or self.server.closed, timeout=1.0)
+                snapshot = state.snapshot()
+                version = snapshot['version']
+                self.wfile.write(f"data: {json.dumps(snapshot)}\n\n".encode('utf-8'))
+                self.wfile.flush()
+                if snapshot['status'] == 'finished':
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DashboardServer(ThreadingHTTPServer):
+    """ Local HTTP server of the live dashboard, on a daemon thread. """
+    daemon_threads = True
+
+    def __init__(self, state: RunState, on_abort, port: int = 0, host: str = '127.0.0.1'):
+        super().__init__((host, port), _DashboardHandler)
+        self.state = state
+        self.on_abort = on_abort
+        self.abort_token = secrets.token_urlsafe(16)
+        self.closed = False
+        self._thread = threading.Thread(target=self.serve_forever, name='live-dashboard', daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/"
+
+    @property
+    def origins(self) -> Tuple[str, ...]:
+        """ Origins of the dashboard page, opened on the bound host or on a loopback alias. """
+        host, port = self.server_address[:2]
+        hosts = dict.fromkeys((host, '127.0.0.1', 'localhost', '[::1]'))
+        return tuple(f"http://{h}:{port}" for h in hosts)
+
+    def start(self) -> 'DashboardServer':
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.closed = True
+        with self.state.changed:
+            self.state.changed.notify_all()
+        self.shutdown()
+        self.server_close()
+
+
+class LiveDashboard:
+    """
+    pytest plugin aggregating the test reports of all workers, registered on the controller only.
+
+    :Usage:
+        config.pluginmanager.register(LiveDashboard(config), 'live_dashboard')
+    """
+
+    def __init__(self, config, output_path: Optional[str] = None, port: Optional[int] = None,
+                 interval: Optional[float] = None):
+        """
+        :param config: pytest config.
+        :param output_path: JSON snapshot path, defaults to 'perf_dir/live-dashboard.json'.
+        :param port: HTTP port, None to only write the JSON file, 0 for any free port.
+        :param interval: Seconds between two rewrites of the JSON file, defaults to 'live_dashboard_interval'.
+        """
+        self.config = config
+        self.output_path = output_path or os.path.join(_settings.global_config['perf_dir'], 'live-dashboard.json')
+        self.interval = interval or _settings.global_config.get('live_dashboard_interval', 1.0)
+        self.abort_rate: Optional[float] = _settings.global_config.get('live_dashboard_abort_rate')
+        self.abort_min_tests: int = _settings.global_config.get('live_dashboard_abort_min_tests', 20)
+        self.state = RunState(_settings.global_config.get('live_dashboard_slowest', 10))
+        self.session = None
+        self.server = DashboardServer(self.state, self.request_stop, port) if port is not None else None
+        self._stop_writer = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name='live-dashboard-writer', daemon=True)
+
+    def write(self) -> None:
+        """ Atomically rewrite the JSON snapshot, readers never see a partial file. """
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        tmp_path = f"{self.output_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.state.snapshot(), file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.output_path)
+
+    def _write_loop(self) -> None:
+        while not self._stop_writer.wait(self.interval):
+            self.write()
+
+    def request_stop(self, reason: str) -> None:
+        """ Stop the run after the running tests, as --maxfail does. """
+        with self.state.changed:
+            self.state.stop_reason = self.state.stop_reason or reason
+        if self.session is not None:
+            self.session.shouldstop = reason
+        dsession = self.config.pluginmanager.getplugin('dsession')
+        if dsession is not None and not dsession.shouldstop:
+            dsession.shouldstop = reason
+
+    def pytest_sessionstart(self, session) -> None:
+        self.session = session
+        self._writer.start()
+        if self.server is not None:
+            self.server.start()
+            session.config.get_terminal_writer().line(
+                f"live dashboard: {self.server.url} (abort token: {self.server.abort_token})")
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node, ids) -> None:
+        self.state.set_total(len(ids))
+
+    def pytest_collection_finish(self, session) -> None:
+        if session.testscollected:
+            self.state.set_total(session.testscollected)
+
+    def pytest_runtest_logreport(self, report) -> None:
+        outcome = self.state.add_report(report)
+        if outcome is None or not self.abort_rate:
+            return
+        counts = self.state.counts
+        done = sum(counts.values())
+        failed = counts['failed'] + counts['error']
+        if done >= self.abort_min_tests and failed / done > self.abort_rate:
+            self.request_stop(f"failure rate {failed / done:.0%} above {self.abort_rate:.0%} after {done} tests")
+
+    def pytest_sessionfinish(self, session) -> None:
+        self._stop_writer.set()
+        self.state.finish(str(session.shouldstop) if session.shouldstop else None)
+        self.write()
+        if self.server is not None:
+            self.server.close()
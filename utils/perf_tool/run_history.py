@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/20/2026 3:00 AM
+@ Author      : Poco Ray
+@ File        : run_history.py
+@ Description : Run history store (SQLite) kept outside the report directories, which every run wipes.
+                Records the outcome, duration, worker and retries of every test and its action timings per run,
+                answers flakiness, duration trend and slowest-growing queries, and writes the Allure trend widgets.
+                Usage: python -m utils.perf_tool.run_history {flaky,growing,trend} [--window 20]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import pytest
+from common.setting import Settings
+from utils.perf_tool.action_metrics import ActionRecord, action_metrics
+from utils.perf_tool.live_dashboard import worker_of, final_outcome, is_rerun
+
+_settings = Settings()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    finished REAL NOT NULL,
+    label TEXT NOT NULL DEFAULT '',
+    workers INTEGER NOT NULL DEFAULT 1,
+    meta TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    worker TEXT NOT NULL,
+    retries INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, nodeid)
+);
+CREATE INDEX IF NOT EXISTS results_nodeid ON results (nodeid, run_id);
+CREATE TABLE IF NOT EXISTS actions (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    nodeid TEXT NOT NULL,
+    action TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    wall_time REAL NOT NULL,
+    round_trips INTEGER NOT NULL,
+    retries INTEGER NOT NULL,
+    wait_time REAL NOT NULL,
+    PRIMARY KEY (run_id, nodeid, action)
+);
+"""
+# Outcomes counted as a failure by the flakiness score and the Allure trend.
+FAILED_OUTCOMES = ('failed', 'error')
+
+
+@dataclass
+class CaseResult:
+    """ Final result of one test in one run. """
+    nodeid: str
+    outcome: str  # 'passed', 'failed', 'error', 'skipped', 'xfailed' or 'xpassed'.
+    duration: float  # setup + call + teardown of the last attempt (seconds).
+    worker: str = 'master'
+    retries: int = 0  # Attempts rerun by pytest-rerunfailures.
+
+
+def slope(values: Sequence[float]) -> float:
+    """ :return: Least-squares slope of the values against their index. """
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x, mean_y = (n - 1) / 2, statistics.fmean(values)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    return numerator / sum((x - mean_x) ** 2 for x in range(n))
+
+
+class RunHistory:
+    """
+    Run history store.
+
+    :Usage:
+        history = RunHistory()
+        history.flakiness(window=20)  # [(nodeid, score, runs), ...]
+        history.slowest_growing(limit=10)  # [(nodeid, seconds per run, first, last), ...]
+        history.export_allure_history(os.path.join(report_tmp, 'history'))
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        :param db_path: Database path, defaults to 'run_history_db', ':memory:' for an in-memory store.
+        """
+        self.db_path = db_path or _settings.global_config['run_history_db']
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def query(self, sql: str, parameters: Sequence = ()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def record_run(self, started: float, results: Sequence[CaseResult], actions: Sequence[ActionRecord] = (),
+                   label: str = '', meta: Optional[Dict[str, Any]] = None, finished: Optional[float] = None) -> int:
+        """
+        Store one run in a single transaction.
+
+        :param started: Start time of the run (time.time()).
+        :param results: Final result of every test.
+        :param actions: Action records of the run, aggregated per test and action.
+        :param label: Free text, e.g.: branch or environment.
+        :param meta: Extra run information, e.g.: the predicted makespan.
+        :param finished: End time of the run, defaults to now.
+        :return: Run id.
+        """
+        per_action: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0, 0, 0.0])
+        for record in actions:
+            if record.test_id is None:
+                continue
+            totals = per_action[(record.test_id, record.action)]
+            totals[0] += 1
+            totals[1] += record.wall_time
+            totals[2] += record.round_trips
+            totals[3] += record.retries
+            totals[4] += record.wait_time
+        workers = len({r.worker for r in results}) or 1
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (started, finished, label, workers, meta) VALUES (?, ?, ?, ?, ?)",
+                (started, finished or time.time(), label, workers, json.dumps(meta or {})))
+            run_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, r.nodeid, r.outcome, r.duration, r.worker, r.retries) for r in results])
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO actions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, nodeid, action, *totals) for (nodeid, action), totals in per_action.items()])
+        return run_id
+
+    def prune(self, keep: int) -> None:
+        """ Delete all but the last 'keep' runs. """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM runs WHERE id NOT IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)", (keep,))
+
+    def _window(self, window: int) -> List[tuple]:
+        """ :return: (nodeid, run id, outcome, duration, retries) of the last 'window' runs, by test and run. """
+        return self.query("SELECT nodeid, run_id, outcome, duration, retries FROM results WHERE run_id IN "
+                          "(SELECT id FROM runs ORDER BY id DESC LIMIT ?) ORDER BY nodeid, run_id", (window,))
+
+    def runs(self, limit: int = 20, before: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        :param limit: Number of runs returned.
+        :param before: Only the runs started before this time (time.time()), None for all runs.
+        :return: The last runs with their outcome counts and wall time, newest first.
+        """
+        rows = self.query("SELECT id, started, finished, label, workers, meta FROM runs WHERE started < ? "
+                          "ORDER BY id DESC LIMIT ?", (float('inf') if before is None else before, limit))
+        runs = []
+        for run_id, started, finished, label, workers, meta in rows:
+            counts = dict(self.query("SELECT outcome, COUNT(*) FROM results WHERE run_id = ? GROUP BY outcome",
+                                     (run_id,)))
+            retries = self.query("SELECT COALESCE(SUM(retries), 0) FROM results WHERE run_id = ?", (run_id,))[0][0]
+            runs.append({'id': run_id, 'started': started, 'wall_time': finished - started, 'label': label,
+                         'workers': workers, 'counts': counts, 'retries': retries, 'meta': json.loads(meta)})
+        return runs
+
+    def flakiness(self, window: int = 20, min_runs: int = 3,
+                  limit: Optional[int] = None) -> List[Tuple[str, float, int]]:
+        """
+        Flakiness score: pass/fail flips between consecutive runs, plus runs passed only after a retry,
+        divided by the number of run pairs. 0 is stable (always passing or always failing), 1 flips every run.
+
+        :param window: Number of recent runs considered.
+        :param min_runs: Tests with fewer runs in the window are ignored.
+        :param limit: Number of tests returned, None for all flaky tests.
+        :return: [(nodeid, score, runs)], most flaky first, tests with a score of 0 left out.
+        """
+        per_test: Dict[str, List[Tuple[bool, int]]] = defaultdict(list)
+        for nodeid, _, outcome, _, retries in self._window(window):
+            if outcome in ('passed', *FAILED_OUTCOMES):
+                per_test[nodeid].append((outcome in FAILED_OUTCOMES, retries))
+        scores = []
+        for nodeid, runs in per_test.items():
+            if len(runs) < min_runs:
+                continue
+            flips = sum(a[0] != b[0] for a, b in zip(runs, runs[1:]))
+            retried_passes = sum(1 for failed, retries in runs if not failed and retries)
+            score = min(1.0, (flips + retried_passes) / (len(runs) - 1))
+            if score > 0:
+                scores.append((nodeid, round(score, 3), len(runs)))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:limit] if limit else scores
+
+    def duration_trend(self, nodeid: str, window: int = 20) -> List[Tuple[int, float, float]]:
+        """ :return: [(run id, run start, duration)] of a test over the last runs, oldest first. """
+        return self.query("SELECT r.id, r.started, t.duration FROM results t JOIN runs r ON r.id = t.run_id "
+                          "WHERE t.nodeid = ? AND r.id IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?) "
+                          "ORDER BY r.id", (nodeid, window))
+
+    def durations(self, window: int = 10) -> Dict[str, float]:
+        """ :return: Median duration of every test over the last runs (seconds), skipped runs excluded. """
+        per_test: Dict[str, List[float]] = defaultdict(list)
+        for nodeid, _, outcome, duration, _ in self._window(window):
+            if outcome != 'skipped':
+                per_test[nodeid].append(duration)
+        return {nodeid: statistics.median(values) for nodeid, values in per_test.items()}
+
+    def slowest_growing(self, window: int = 20, min_runs: int = 5,
+                        limit: int = 10) -> List[Tuple[str, float, float, float]]:
+        """
+        :param window: Number of recent runs considered.
+        :param min_runs: Tests with fewer passing runs in the window are ignored.
+        :param limit: Number of tests returned.
+        :return: [(nodeid, growth in seconds per run, first duration, last duration)], fastest growing first.
+        """
+        per_test: Dict[str, List[float]] = defaultdict(list)
+        for nodeid, _, outcome, duration, _ in self._window(window):
+            if outcome == 'passed':  # Failures stop early or hit timeouts, they would skew the trend.
+                per_test[nodeid].append(duration)
+        growth = [(nodeid, round(slope(values), 4), values[0], values[-1])
+                  for nodeid, values in per_test.items() if len(values) >= min_runs]
+        growth = [item for item in growth if item[1] > 0]
+        growth.sort(key=lambda item: -item[1])
+        return growth[:limit]
+
+    def export_allure_history(self, history_dir: str, limit: int = 20, report_name: str = '',
+                              before: Optional[float] = None) -> List[str]:
+        """
+        Write the Allure trend widgets of the last runs, to be copied into the results before 'allure generate'.
+        Allure adds the current launch to the front of the trends itself, so a run already recorded by
+        RunRecorder must be left out with 'before', or the report shows it twice.
+
+        :param history_dir: e.g.: report/tmp/history.
+        :param limit: Number of runs shown.
+        :param report_name: Report name of the trend entries.
+        :param before: Only the runs started before this time, e.g.: the start of the current run.
+        :return: Written file paths.
+        """
+        runs = self.runs(limit, before)
+        history_trend, duration_trend, retry_trend = [], [], []
+        for run in runs:
+            counts = run['counts']
+            data = {'failed': counts.get('failed', 0), 'broken': counts.get('error', 0),
+                    'skipped': counts.get('skipped', 0) + counts.get('xfailed', 0),
+                    'passed': counts.get('passed', 0) + counts.get('xpassed', 0), 'unknown': 0}
+            data['total'] = sum(data.values())
+            entry = {'buildOrder': run['id'], 'reportName': report_name or run['label']}
+            history_trend.append({**entry, 'data': data})
+            duration_trend.append({**entry, 'data': {'duration': round(run['wall_time'] * 1000)}})
+            retry_trend.append({**entry, 'data': {'run': data['total'], 'retry': run['retries']}})
+        os.makedirs(history_dir, exist_ok=True)
+        paths = []
+        for filename, content in (('history-trend.json', history_trend), ('duration-trend.json', duration_trend),
+                                  ('retry-trend.json', retry_trend)):
+            path = os.path.join(history_dir, filename)
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(content, file, ensure_ascii=False)
+            paths.append(path)
+        return paths
+
+
+class RunRecorder:
+    """
+    pytest plugin storing the run in the history, registered on the controller only.
+    xdist forwards the reports of every worker, the action records are read from the exported files.
+
+    :Usage:
+        config.pluginmanager.register(RunRecorder(RunHistory()), 'run_recorder')
+    """
+
+    def __init__(self, history: RunHistory, label: str = ''):
+        self.history = history
+        self.label = label
+        self.started = time.time()
+        self.results: Dict[str, CaseResult] = {}
+        self.meta: Dict[str, Any] = {}  # Extra run information saved with the run.
+        self._phases: Dict[str, List[Any]] = {}
+        self._retries: Dict[str, int] = defaultdict(int)
+
+    def pytest_runtest_logreport(self, report) -> None:
+        phases = self._phases.setdefault(report.nodeid, [])
+        phases.append(report)
+        if report.when != 'teardown':
+            return
+        del self._phases[report.nodeid]
+        if is_rerun(phases):
+            self._retries[report.nodeid] += 1
+            return
+        self.results[report.nodeid] = CaseResult(report.nodeid, final_outcome(phases),
+                                                 sum(r.duration for r in phases), worker_of(report),
+                                                 self._retries.pop(report.nodeid, 0))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session) -> None:
+        """ Runs after the conftest exported the action records of every worker. """
+        if not self.results:
+            return
+        perf_dir = _settings.global_config['perf_dir']
+        actions = action_metrics.load_records(perf_dir) if action_metrics.enabled else []
+        self.history.record_run(self.started, list(self.results.values()), actions, self.label, self.meta)
+        self.history.prune(_settings.global_config.get('run_history_keep', 200))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the run history.")
+    parser.add_argument('--db', default=None, help="Database path, defaults to 'run_history_db'.")
+    parser.add_argument('--window', type=int, default=20, help="Number of recent runs considered.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('flaky', help="Tests by flakiness score.")
+    subparsers.add_parser('growing', help="Tests whose duration grows the fastest.")
+    trend_parser = subparsers.add_parser('trend', help="Duration trend of one test.")
+    trend_parser.add_argument('nodeid')
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.db)
+    if args.command == 'flaky':
+        for nodeid, score, runs in history.flakiness(args.window):
+            print(f"{score:6.2f}  {runs:>4} runs  {nodeid}")
+    elif args.command == 'growing':
+        for nodeid, growth, first, last in history.slowest_growing(args.window):
+            print(f"{growth * 1000:+8.1f}ms/run  {first:8.2f}s -> {last:8.2f}s  {nodeid}")
+    else:
+        for run_id, started, duration in history.duration_trend(args.nodeid, args.window):
+            print(f"#{run_id:<6} {time.strftime('%Y-%m-%d %H:%M', time.localtime(started))}  {duration:8.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
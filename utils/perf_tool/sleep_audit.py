@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+"""
+@ Date        : 10/19/2026 6:40 PM
+@ Author      : Poco Ray
+@ File        : sleep_audit.py
+@ Description : Records every fixed sleep with its call site, and optionally turns sleeps into idle waits.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from common.setting import root_path, Settings
+from utils.api_tool.deadline import current_deadline
+from utils.perf_tool.action_metrics import action_metrics
+
+_settings = Settings()
+
+# Frames inside the framework are skipped, so that the call site is the test, page or fixture that slept.
+_FRAMEWORK_DIR = os.path.join(root_path(), 'utils') + os.sep
+
+
+@dataclass
+class SleepRecord:
+    """ A single sleep. """
+    call_site: str  # 'path:line' relative to the project root.
+    function: str  # Function that slept.
+    requested: float  # Requested duration (seconds).
+    slept: float  # Actual duration (seconds).
+    mode: str = 'fixed'  # 'fixed' or 'idle'.
+    test_id: Optional[str] = None  # Test node id, None for session fixtures.
+    worker: str = 'master'  # xdist worker id.
+
+
+def _call_site() -> Tuple[str, str]:
+    """ :return: ('path:line', function) of the first caller outside the framework. """
+    frame = sys._getframe(2)
+    while frame.f_back is not None and frame.f_code.co_filename.startswith(_FRAMEWORK_DIR):
+        frame = frame.f_back
+    path = os.path.relpath(frame.f_code.co_filename, root_path())
+    return f"{path}:{frame.f_lineno}", frame.f_code.co_name
+
+
+class SleepAuditor:
+    """
+    Process-wide sleep auditor.
+    Mode 'fixed' sleeps as requested, mode 'idle' waits until the page is idle, capped at the requested
+    duration or 'sleep_idle_cap', whichever is shorter.
+    """
+
+    def __init__(self):
+        self.enabled: bool = _settings.global_config.get('sleep_audit', True)
+        self.mode: str = _settings.global_config.get('sleep_mode', 'fixed')
+        self.idle_cap: Optional[float] = _settings.global_config.get('sleep_idle_cap')
+        self.worker: str = os.environ.get('PYTEST_XDIST_WORKER', 'master')
+        self._records: List[SleepRecord] = []
+        self._lock = threading.Lock()
+
+    def sleep(self, seconds: float, idle_wait: Optional[Callable[[float], Any]] = None) -> float:
+        """
+        Sleep and record the call site, never beyond the current time budget.
+
+        :param seconds: Requested duration (seconds).
+        :param idle_wait: Waits until the page is idle within the given timeout, used in 'idle' mode.
+        :return: Actual duration (seconds).
+        :raise DeadlineExceeded: If the time budget is used up.
+        :Usage:
+            sleep_auditor.sleep(0.5)
+        """
+        deadline = current_deadline()
+        duration = seconds if deadline is None else min(seconds, deadline.remaining())
+        mode = 'idle' if self.mode == 'idle' and idle_wait is not None else 'fixed'
+        start = time.perf_counter()
+        if mode == 'idle':
+            timeout = duration if self.idle_cap is None else min(duration, self.idle_cap)
+            try:
+                idle_wait(timeout)
+            except Exception:
+                # Idle detection is not available (e.g.: native app context) or timed out, sleep the rest.
+                time.sleep(max(timeout - (time.perf_counter() - start), 0))
+        else:
+            time.sleep(duration)
+        slept = time.perf_counter() - start
+
+        if self.enabled:
+            call_site, function = _call_site()
+            record = SleepRecord(call_site=call_site, function=function, requested=seconds, slept=slept,
+                                 mode=mode, test_id=action_metrics.current_test, worker=self.worker)
+            with self._lock:
+                self._records.append(record)
+        if deadline is not None:
+            deadline.check('sleep')
+        return slept
+
+    def records(self, test_id: Optional[str] = None) -> List[SleepRecord]:
+        with self._lock:
+            records = list(self._records)
+        return records if test_id is None else [r for r in records if r.test_id == test_id]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+    def dead_time(self, test_id: Optional[str] = None) -> float:
+        """ :return: Total sleep time of a test, or of this process if test_id is None (seconds). """
+        return sum(r.slept for r in self.records(test_id))
+
+    @staticmethod
+    def aggregate(records: List[SleepRecord]) -> Dict[str, Any]:
+        """
+        :param records: Sleep records of the whole run.
+        :return: Total dead time, worker-hours, and dead time per test, per worker and per call site.
+        """
+        per_test, per_worker = defaultdict(float), defaultdict(float)
+        per_site: Dict[str, Dict[str, Any]] = {}
+        for r in records:
+            per_test[r.test_id or '<session>'] += r.slept
+            per_worker[r.worker] += r.slept
+            site = per_site.setdefault(r.call_site, {'function': r.function, 'count': 0, 'slept': 0.0})
+            site['count'] += 1
+            site['slept'] += r.slept
+        total = sum(per_test.values())
+        return {
+            'count': len(records),
+            'dead_time': round(total, 3),
+            'worker_hours': round(total / 3600, 4),
+            'tests': {k: round(v, 3) for k, v in sorted(per_test.items(), key=lambda i: -i[1])},
+            'workers': {k: round(v, 3) for k, v in sorted(per_worker.items())},
+            'call_sites': dict(sorted(per_site.items(), key=lambda i: -i[1]['slept'])),
+        }
+
+    def export_records(self, output_dir: str) -> str:
+        """
+        Write the records of this process to 'sleep-audit-<worker>.json'.
+
+        :param output_dir: Output directory.
+        :return: Output file path.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        file_path = os.path.join(output_dir, f"sleep-audit-{self.worker}.json")
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump([asdict(r) for r in self.records()], file, ensure_ascii=False)
+        return file_path
+
+    @staticmethod
+    def load_records(output_dir: str) -> List[SleepRecord]:
+        """ Load the records written by every worker. """
+        records = []
+        if not os.path.isdir(output_dir):
+            return records
+        for filename in sorted(os.listdir(output_dir)):
+            if filename.startswith('sleep-audit-') and filename.endswith('.json') \
+                    and filename != 'sleep-audit-summary.json':
+                with open(os.path.join(output_dir, filename), 'r', encoding='utf-8') as file:
+                    records.extend(SleepRecord(**item) for item in json.load(file))
+        return records
+
+    @classmethod
+    def export_summary(cls, output_dir: str) -> Dict[str, Any]:
+        """
+        Aggregate the records of all workers into 'sleep-audit-summary.json'.
+
+        :param output_dir: Output directory.
+        :return: Aggregated summary.
+        """
+        summary = cls.aggregate(cls.load_records(output_dir))
+        with open(os.path.join(output_dir, 'sleep-audit-summary.json'), 'w', encoding='utf-8') as file:
+            json.dump(summary, file, ensure_ascii=False, indent=2)
+        return summary
+
+
+sleep_auditor = SleepAuditor()